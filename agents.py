@@ -3,6 +3,12 @@ Módulo com definições dos agentes bilionários de tech
 """
 import os
 import sys
+import json
+import threading
+import time
+from functools import lru_cache
+from importlib import metadata as importlib_metadata
+from typing import Optional
 
 # ⚠️ CRÍTICO: Setar env vars ANTES de qualquer import
 # Usar assignment direto em vez de setdefault para garantir
@@ -21,6 +27,11 @@ from crewai import Agent
 from langchain_openai import ChatOpenAI
 from pathlib import Path
 from dotenv import load_dotenv
+from llm_scheduler import agendador_llm, chave_do_llm
+from log_utils import CREWAI_VERBOSE, campos, obter_logger
+from prompt_builder import compactar_template
+
+logger = obter_logger("agents")
 
 # Carregar .env da raiz do projeto
 env_path = Path(__file__).parent / '.env'
@@ -37,7 +48,8 @@ elif api_key:
     llm = ChatOpenAI(
         model="gpt-4",
         temperature=0.7,
-        api_key=api_key
+        api_key=api_key,
+        max_retries=0  # Retry em 429 fica com o agendador (llm_scheduler)
     )
 else:
     llm = None  # Será criado dinamicamente quando necessário
@@ -52,7 +64,7 @@ def criar_elon_musk():
         if api_key and api_key.lower().strip() in ["placeholder", "none", "", "null"]:
             api_key = None
         if api_key:
-            agent_llm = ChatOpenAI(model="gpt-4", temperature=0.7, api_key=api_key)
+            agent_llm = ChatOpenAI(model="gpt-4", temperature=0.7, api_key=api_key, max_retries=0)
     
     agent_params = {
         "role": "CEO da Tesla e SpaceX",
@@ -61,7 +73,7 @@ def criar_elon_musk():
         Você é direto, às vezes controverso, mas sempre focado em resolver grandes problemas da humanidade.
         Você acredita em inovação rápida, falhas rápidas e aprendizado contínuo. 
         Você gosta de desafiar o status quo e pensar em soluções que outros consideram impossíveis.""",
-        "verbose": True,
+        "verbose": CREWAI_VERBOSE,
         "allow_delegation": False
     }
     # Adicionar LLM se disponível
@@ -86,7 +98,7 @@ def criar_bill_gates():
         Você é estratégico, pensa em longo prazo e está profundamente comprometido com filantropia.
         Você valoriza dados, evidências e soluções baseadas em ciência.
         Você acredita que a tecnologia deve ser usada para melhorar a vida das pessoas e resolver problemas globais.""",
-        "verbose": True,
+        "verbose": CREWAI_VERBOSE,
         "allow_delegation": False
     }
     # Adicionar LLM se disponível
@@ -112,7 +124,7 @@ def criar_jeff_bezos():
         Você acredita em 'Day 1' - sempre manter a mentalidade de startup.
         Você valoriza experimentação, aceitação de falhas e aprendizado constante.
         Você pensa em décadas, não em trimestres.""",
-        "verbose": True,
+        "verbose": CREWAI_VERBOSE,
         "allow_delegation": False
     }
     # Adicionar LLM se disponível
@@ -138,7 +150,7 @@ def criar_mark_zuckerberg():
         Você está focado em construir o metaverso e a próxima geração de plataformas sociais.
         Você valoriza inovação rápida, iteração e construção de produtos que bilhões de pessoas usam.
         Você acredita que a tecnologia pode aproximar as pessoas e criar comunidades.""",
-        "verbose": True,
+        "verbose": CREWAI_VERBOSE,
         "allow_delegation": False
     }
     # Adicionar LLM se disponível
@@ -164,7 +176,7 @@ def criar_tim_cook():
         Você valoriza qualidade sobre quantidade, design cuidadoso e experiência do usuário.
         Você acredita que a tecnologia deve ser intuitiva, acessível e respeitar a privacidade dos usuários.
         Você é mais reservado que outros CEOs, mas é estratégico e focado em excelência.""",
-        "verbose": True,
+        "verbose": CREWAI_VERBOSE,
         "allow_delegation": False
     }
     # Adicionar LLM se disponível
@@ -172,13 +184,19 @@ def criar_tim_cook():
         agent_params["llm"] = llm
     else:
         # Se não há LLM disponível, logar warning mas continuar
-        print(f"[AGENTS] AVISO: Criando {agent_params['role']} sem LLM específico")
+        logger.warning("Criando %s sem LLM específico", agent_params['role'], extra=campos(agente=agent_params['role']))
         # CrewAI tentará criar LLM automaticamente (pode falhar)
     
     return Agent(**agent_params)
 
-def criar_facilitador():
-    """Cria agente facilitador para síntese de debates"""
+def criar_facilitador(modelo: str = "gpt-4.1", llm=None):
+    """
+    Cria agente facilitador para síntese de debates (modelo mais barato para os resumos da síntese hierárquica)
+    
+    Args:
+        llm: Modelo já criado por criar_llm_facilitador; quem chama o LLM
+            direto guarda essa referência, porque o Agent o converte para crewai.LLM
+    """
     agent_params = {
         "role": "Facilitador e Moderador de Debates",
         "goal": "Sintetizar debates de forma clara, objetiva e estruturada, reunindo todos os pontos discutidos e apresentando conclusões finais.",
@@ -187,10 +205,18 @@ def criar_facilitador():
         áreas de consenso e divergência, e criar sínteses claras e objetivas.
         Você é neutro, objetivo e focado em ajudar o público a entender as diferentes
         perspectivas apresentadas e chegar a conclusões úteis.""",
-        "verbose": True,
+        "verbose": CREWAI_VERBOSE,
         "allow_delegation": False
     }
     
+    agent_params["llm"] = llm if llm is not None else criar_llm_facilitador(modelo)
+    logger.debug("Facilitador criado com LLM (%s)", modelo)
+    
+    return Agent(**agent_params)
+
+
+def criar_llm_facilitador(modelo: str = "gpt-4.1"):
+    """Cria o modelo LangChain (OpenAI) do facilitador"""
     # Buscar API key para facilitador (prioridade: variável de ambiente específica, depois OPENAI_API_KEY)
     facilitador_api_key = os.getenv("OPENAI_API_KEY_FACILITADOR") or os.getenv("OPENAI_API_KEY")
     
@@ -199,22 +225,17 @@ def criar_facilitador():
     if not facilitador_api_key or str(facilitador_api_key).strip().lower() in VALORES_INVALIDOS:
         # Se não houver chave válida, lançar erro
         raise ValueError(
-            f"Não é possível criar {agent_params['role']} sem LLM. "
-            f"Configure OPENAI_API_KEY_FACILITADOR ou OPENAI_API_KEY no arquivo .env ou no Cloud Run"
+            "Não é possível criar Facilitador e Moderador de Debates sem LLM. "
+            "Configure OPENAI_API_KEY_FACILITADOR ou OPENAI_API_KEY no arquivo .env ou no Cloud Run"
         )
     
-    # Criar LLM para facilitador com gpt-4.1
     from langchain_openai import ChatOpenAI
-    facilitador_llm = ChatOpenAI(
-        model="gpt-4.1",
+    return ChatOpenAI(
+        model=modelo,
         temperature=0.7,
-        api_key=facilitador_api_key
+        api_key=facilitador_api_key,
+        max_retries=0  # As chamadas da síntese passam pelo agendador, que já faz o retry em 429
     )
-    
-    agent_params["llm"] = facilitador_llm
-    print("[AGENTS] ✅ Facilitador criado com LLM (gpt-4.1)", flush=True)
-    
-    return Agent(**agent_params)
 
 # Dicionário com todos os agentes disponíveis
 AGENTES_DISPONIVEIS = {
@@ -268,24 +289,272 @@ def validar_api_key(api_key, provider: str, agent_name: str) -> str:
     
     return api_key_str
 
-def criar_agente_dinamico(agent_data: dict, use_rag: bool = True, database=None) -> Agent:
-    """Cria um agente dinamicamente a partir de dados do banco"""
-    from langchain_anthropic import ChatAnthropic
-    from rag_manager import RAGManager
-    import os
-    from pathlib import Path
-    from dotenv import load_dotenv
+# ========== ESTRATÉGIAS DE CRIAÇÃO DO LLM GOOGLE (GEMINI) ==========
+#
+# Para o provider "google" existem várias formas de construir o LLM e nem todas
+# funcionam em todas as versões das bibliotecas. Em vez de repetir a sequência
+# completa de tentativas (imports, exceções e às vezes chamadas de rede) para
+# cada agente de cada debate, a estratégia vencedora é memorizada por
+# (modelo, versões das bibliotecas) em memória e persistida em disco.
+
+GEMINI_STRATEGY_CACHE_FILE = os.getenv(
+    "GEMINI_STRATEGY_CACHE_FILE",
+    str(Path(__file__).parent / ".gemini_strategy_cache.json")
+)
+
+_gemini_strategy_cache = None  # Carregado lazy do disco: chave -> nome da estratégia
+_gemini_strategy_lock = threading.Lock()
+
+
+def _versao_biblioteca(nome: str) -> str:
+    """Retorna a versão instalada de uma distribuição ou 'ausente'"""
+    try:
+        return importlib_metadata.version(nome)
+    except importlib_metadata.PackageNotFoundError:
+        return "ausente"
+
+
+@lru_cache(maxsize=1)
+def _versoes_estrategia_gemini() -> str:
+    # Uma vez por processo: importlib.metadata varre as distribuições instaladas a cada consulta
+    return ",".join(
+        f"{lib}={_versao_biblioteca(lib)}"
+        for lib in ("crewai", "langchain-google-genai")
+    )
+
+
+def _chave_estrategia_gemini(model_name: str) -> str:
+    """Chave do cache: modelo + versões das bibliotecas envolvidas na criação"""
+    return f"{model_name}|{_versoes_estrategia_gemini()}"
+
+
+def _carregar_cache_estrategias() -> dict:
+    """Carrega o cache persistido (uma vez por processo). Deve ser chamado com o lock."""
+    global _gemini_strategy_cache
+    if _gemini_strategy_cache is None:
+        _gemini_strategy_cache = {}
+        try:
+            with open(GEMINI_STRATEGY_CACHE_FILE, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            if isinstance(dados, dict):
+                _gemini_strategy_cache.update(dados)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(
+                "Cache de estratégias Gemini ilegível (%s), ignorando", e,
+                extra=campos(arquivo=GEMINI_STRATEGY_CACHE_FILE)
+            )
+    return _gemini_strategy_cache
+
+
+def _obter_estrategia_gemini(chave: str) -> Optional[str]:
+    with _gemini_strategy_lock:
+        return _carregar_cache_estrategias().get(chave)
+
+
+def _registrar_estrategia_gemini(chave: str, estrategia: Optional[str]) -> None:
+    """Grava (ou remove, se estrategia=None) a estratégia e persiste o cache em disco"""
+    with _gemini_strategy_lock:
+        cache = _carregar_cache_estrategias()
+        if estrategia is None:
+            if cache.pop(chave, None) is None:
+                return
+        elif cache.get(chave) == estrategia:
+            return
+        else:
+            cache[chave] = estrategia
+        try:
+            tmp_path = f"{GEMINI_STRATEGY_CACHE_FILE}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, GEMINI_STRATEGY_CACHE_FILE)
+        except Exception as e:
+            # Sistema de arquivos somente leitura (ex: Cloud Run) - manter apenas em memória
+            logger.warning(
+                "Não foi possível persistir cache de estratégias Gemini: %s", e,
+                extra=campos(arquivo=GEMINI_STRATEGY_CACHE_FILE)
+            )
+
+
+def _google_via_crewai_llm(
+    model_name: str, temperature: float, max_tokens: int, api_key: str, database=None, timeout: Optional[float] = None
+):
+    """Estratégia 1: CrewAI.LLM nativo (melhor compatibilidade)"""
+    from crewai import LLM
+    
+    # Formato esperado pelo CrewAI: "gemini/modelo"
+    if not model_name.startswith("gemini/"):
+        model_name = f"gemini/{model_name}"
+    
+    return LLM(
+        model=model_name,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        api_key=api_key,
+        timeout=timeout,
+        max_retries=0  # Retry em 429 fica com o agendador (llm_scheduler)
+    )
+
+
+def _google_via_langchain_google_api_key(
+    model_name: str, temperature: float, max_tokens: int, api_key: str, database=None, timeout: Optional[float] = None
+):
+    """Estratégia 2: ChatGoogleGenerativeAI com google_api_key (versões antigas)"""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    
+    return ChatGoogleGenerativeAI(
+        model=model_name,
+        temperature=temperature,
+        max_output_tokens=max_tokens,  # Google usa max_output_tokens
+        google_api_key=api_key,
+        timeout=timeout,
+        max_retries=0
+    )
+
+
+def _google_via_langchain_api_key(
+    model_name: str, temperature: float, max_tokens: int, api_key: str, database=None, timeout: Optional[float] = None
+):
+    """Estratégia 3: ChatGoogleGenerativeAI com api_key (versão 2.x)"""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    
+    return ChatGoogleGenerativeAI(
+        model=model_name,
+        temperature=temperature,
+        max_output_tokens=max_tokens,
+        api_key=api_key,
+        timeout=timeout,
+        max_retries=0
+    )
+
+
+def _google_via_openai_fallback(
+    model_name: str, temperature: float, max_tokens: int, api_key: str, database=None, timeout: Optional[float] = None
+):
+    """Estratégia 4: Fallback para OpenAI quando nenhuma integração Gemini funciona"""
+    # Buscar OpenAI API key do banco ou env
+    openai_key = os.getenv("OPENAI_API_KEY")
+    if not openai_key or openai_key.lower().strip() in ["placeholder", "none", "", "null"]:
+        openai_key = None
+        # Tentar buscar do banco
+        if database:
+            result = database.supabase.table("llm_providers").select("*").eq("provider", "openai").execute()
+            if result.data and len(result.data) > 0:
+                openai_key = result.data[0].get("api_key_encrypted")
     
-    # Carregar .env
-    env_path = Path(__file__).parent / '.env'
-    load_dotenv(dotenv_path=env_path)
+    if not openai_key or openai_key.lower().strip() in ["placeholder", "none", "", "null"]:
+        raise ValueError("OpenAI API key não disponível para fallback")
+    
+    # Validar a chave
+    openai_key = validar_api_key(openai_key, "openai", model_name)
+    # Setar env var
+    os.environ["OPENAI_API_KEY"] = openai_key
+    
+    llm = ChatOpenAI(
+        model="gpt-4",
+        temperature=temperature,
+        max_tokens=max_tokens,
+        api_key=openai_key,
+        timeout=timeout,
+        max_retries=0
+    )
+    logger.warning("Usando OpenAI como fallback para Google Gemini")
+    return llm
+
+
+# Ordem de preferência das estratégias
+ESTRATEGIAS_GEMINI = {
+    "crewai_llm": _google_via_crewai_llm,
+    "langchain_google_api_key": _google_via_langchain_google_api_key,
+    "langchain_api_key": _google_via_langchain_api_key,
+    "openai_fallback": _google_via_openai_fallback,
+}
+# Estratégias que não criam um cliente Gemini: nunca memorizadas, para que
+# uma falha passageira não transforme os agentes Gemini em GPT-4 até a próxima troca de versão
+ESTRATEGIAS_GEMINI_SEM_MEMORIA = ("openai_fallback",)
+
+
+def _criar_llm_google(agent_data: dict, api_key: str, max_tokens: int, database=None, timeout: Optional[float] = None):
+    """
+    Cria o LLM para o provider Google usando a estratégia memorizada quando existir.
     
+    Se a estratégia memorizada falhar (ex: biblioteca atualizada sem mudar versão),
+    ela é descartada e a sequência completa é executada novamente.
+    """
+    model_name = agent_data.get("llm_model", "gemini-2.5-flash")
+    temperature = float(agent_data.get("temperature", 0.7))
+    chave = _chave_estrategia_gemini(model_name)
+    
+    estrategia_memorizada = _obter_estrategia_gemini(chave)
+    if estrategia_memorizada in ESTRATEGIAS_GEMINI_SEM_MEMORIA:
+        # Gravada por uma versão anterior: descartar e tentar o Gemini de novo
+        _registrar_estrategia_gemini(chave, None)
+        estrategia_memorizada = None
+    if estrategia_memorizada in ESTRATEGIAS_GEMINI:
+        inicio = time.perf_counter()
+        try:
+            llm = ESTRATEGIAS_GEMINI[estrategia_memorizada](
+                model_name, temperature, max_tokens, api_key, database, timeout=timeout
+            )
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            logger.debug(
+                "Google LLM criado via estratégia memorizada '%s' (%.1fms)", estrategia_memorizada, duracao_ms,
+                extra=campos(modelo=model_name, estrategia=estrategia_memorizada, duracao_ms=round(duracao_ms, 1))
+            )
+            return llm
+        except Exception as e:
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            logger.warning(
+                "Estratégia memorizada '%s' falhou (%.1fms): %s", estrategia_memorizada, duracao_ms, e,
+                extra=campos(modelo=model_name, estrategia=estrategia_memorizada, duracao_ms=round(duracao_ms, 1))
+            )
+            _registrar_estrategia_gemini(chave, None)
+    
+    last_error = None
+    for tentativa, (nome, estrategia) in enumerate(ESTRATEGIAS_GEMINI.items(), 1):
+        if nome == estrategia_memorizada:
+            continue  # Já falhou acima
+        logger.debug(
+            "Tentativa %d: Criar Google via '%s'", tentativa, nome,
+            extra=campos(modelo=model_name, estrategia=nome)
+        )
+        inicio = time.perf_counter()
+        try:
+            llm = estrategia(model_name, temperature, max_tokens, api_key, database, timeout=timeout)
+        except Exception as e:
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            logger.warning(
+                "Tentativa %d ('%s') falhou (%.1fms): %s", tentativa, nome, duracao_ms, e,
+                extra=campos(modelo=model_name, estrategia=nome, duracao_ms=round(duracao_ms, 1))
+            )
+            last_error = e
+            continue
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        logger.debug(
+            "Google LLM criado via '%s' (%.1fms)", nome, duracao_ms,
+            extra=campos(modelo=model_name, estrategia=nome, duracao_ms=round(duracao_ms, 1))
+        )
+        if nome not in ESTRATEGIAS_GEMINI_SEM_MEMORIA:
+            _registrar_estrategia_gemini(chave, nome)
+        return llm
+    
+    logger.error("Todas as tentativas falharam")
+    raise ValueError(
+        f"Não foi possível criar LLM para Google Gemini. "
+        f"Última tentativa: {last_error}"
+    )
+
+
+def _obter_api_key(llm_provider: str, agent_name: str, database=None) -> str:
+    """Busca a API key do provider (banco de dados, depois .env), valida e a exporta na env var do SDK"""
     # Buscar API key: primeiro do banco de dados, depois do .env como fallback
-    llm_provider = agent_data.get("llm_provider", "openai").lower()
-    agent_name = agent_data.get('name', 'Desconhecido')
     api_key = None
     
-    print(f"[AGENTS] Buscando API key para {llm_provider} (agente: {agent_name})")
+    logger.debug(
+        "Buscando API key para %s (agente: %s)", llm_provider, agent_name,
+        extra=campos(provedor=llm_provider, agente=agent_name)
+    )
     
     # Tentar buscar do banco de dados primeiro
     if database:
@@ -298,9 +567,12 @@ def criar_agente_dinamico(agent_data: dict, use_rag: bool = True, database=None)
                 if provider_data.get("api_key_encrypted"):
                     api_key = provider_data.get("api_key_encrypted")
                     status = provider_data.get("status", "disconnected")
-                    print(f"[AGENTS] Usando API key do banco de dados para {llm_provider} (status: {status})")
+                    logger.debug(
+                        "Usando API key do banco de dados para %s (status: %s)", llm_provider, status,
+                        extra=campos(provedor=llm_provider, agente=agent_name)
+                    )
         except Exception as e:
-            print(f"[AGENTS] Erro ao buscar API key do banco: {str(e)}")
+            logger.warning("Erro ao buscar API key do banco: %s", e, extra=campos(provedor=llm_provider, agente=agent_name))
     
     # Fallback para variáveis de ambiente se não encontrou no banco
     if not api_key:
@@ -316,17 +588,23 @@ def criar_agente_dinamico(agent_data: dict, use_rag: bool = True, database=None)
         # estão definidas com valores placeholder (comum em ambientes de deploy)
         if api_key and api_key.lower().strip() in ["placeholder", "none", "", "null"]:
             api_key = None
-            print(f"[AGENTS] Ignorando valor placeholder para {llm_provider}, buscando no banco de dados")
+            logger.debug(
+                "Ignorando valor placeholder para %s, buscando no banco de dados", llm_provider,
+                extra=campos(provedor=llm_provider)
+            )
         
         if api_key:
-            print(f"[AGENTS] Usando API key do arquivo .env para {llm_provider}")
+            logger.debug("Usando API key do arquivo .env para %s", llm_provider, extra=campos(provedor=llm_provider))
     
     # VALIDAÇÃO RIGOROSA antes de criar LLM
     try:
         api_key = validar_api_key(api_key, llm_provider, agent_name)
-        print(f"[AGENTS] API key validada para {llm_provider}: {api_key[:7]}...{api_key[-4:]}")
+        logger.debug(
+            "API key validada para %s: %s...%s", llm_provider, api_key[:7], api_key[-4:],
+            extra=campos(provedor=llm_provider)
+        )
     except ValueError as e:
-        print(f"[AGENTS] ERRO: {str(e)}")
+        logger.error(str(e))
         raise
     
     # CRÍTICO: Setar env var com chave validada ANTES de criar LLM
@@ -339,7 +617,14 @@ def criar_agente_dinamico(agent_data: dict, use_rag: bool = True, database=None)
     }.get(llm_provider, f"{llm_provider.upper()}_API_KEY")
     
     os.environ[env_var_name] = api_key
-    print(f"[AGENTS] Env var atualizada: {env_var_name}")
+    logger.debug("Env var atualizada: %s", env_var_name)
+    
+    return api_key
+
+
+def _criar_llm(agent_data: dict, llm_provider: str, api_key: str, database=None, timeout: Optional[float] = None):
+    """Cria o LLM do provider com o modelo, temperatura e max_tokens do agente"""
+    from langchain_anthropic import ChatAnthropic
     
     # Obter max_tokens do agent_data (padrão: 1000)
     max_tokens = int(agent_data.get("max_tokens", 1000))
@@ -350,116 +635,86 @@ def criar_agente_dinamico(agent_data: dict, use_rag: bool = True, database=None)
             model=agent_data.get("llm_model", "gpt-4"),
             temperature=float(agent_data.get("temperature", 0.7)),
             max_tokens=max_tokens,
-            api_key=api_key
+            api_key=api_key,
+            timeout=timeout,
+            max_retries=0  # Retry em 429 fica com o agendador (llm_scheduler)
         )
     elif llm_provider == "anthropic":
         llm = ChatAnthropic(
             model=agent_data.get("llm_model", "claude-3-5-sonnet-20241022"),
             temperature=float(agent_data.get("temperature", 0.7)),
             max_tokens=max_tokens,
-            api_key=api_key
+            api_key=api_key,
+            timeout=timeout,
+            max_retries=0
         )
     elif llm_provider == "google":
-        # Estratégia: Tentar múltiplas abordagens em ordem de preferência
-        # O CrewAI pode não reconhecer ChatGoogleGenerativeAI, então tentamos várias opções
-        llm = None
-        last_error = None
-        
-        # TENTATIVA 1: Usar CrewAI.LLM nativo (melhor compatibilidade)
-        try:
-            print(f"[AGENTS] Tentativa 1: Criar Google via CrewAI.LLM...", flush=True)
-            from crewai import LLM
-            
-            model_name = agent_data.get("llm_model", "gemini-2.5-flash")
-            # Formato esperado pelo CrewAI: "gemini/modelo"
-            if not model_name.startswith("gemini/"):
-                model_name = f"gemini/{model_name}"
-            
-            llm = LLM(
-                model=model_name,
-                temperature=float(agent_data.get("temperature", 0.7)),
-                max_tokens=max_tokens,
-                api_key=api_key
-            )
-            print(f"[AGENTS] ✅ Google LLM criado via CrewAI.LLM", flush=True)
-        except Exception as e1:
-            print(f"[AGENTS] ❌ Tentativa 1 falhou: {e1}", flush=True)
-            last_error = e1
-            
-            # TENTATIVA 2: Usar ChatGoogleGenerativeAI direto
-            try:
-                print(f"[AGENTS] Tentativa 2: Criar via ChatGoogleGenerativeAI...", flush=True)
-                from langchain_google_genai import ChatGoogleGenerativeAI
-                
-                # Tentar com google_api_key primeiro (versão antiga), depois api_key (versão nova)
-                try:
-                    llm = ChatGoogleGenerativeAI(
-                        model=agent_data.get("llm_model", "gemini-2.5-flash"),
-                        temperature=float(agent_data.get("temperature", 0.7)),
-                        max_output_tokens=max_tokens,  # Google usa max_output_tokens
-                        google_api_key=api_key
-                    )
-                except TypeError:
-                    # Se google_api_key não funcionar, tentar api_key (versão 2.x)
-                    llm = ChatGoogleGenerativeAI(
-                        model=agent_data.get("llm_model", "gemini-2.5-flash"),
-                        temperature=float(agent_data.get("temperature", 0.7)),
-                        max_output_tokens=max_tokens,
-                        api_key=api_key
-                    )
-                print(f"[AGENTS] ✅ Google LLM criado via ChatGoogleGenerativeAI", flush=True)
-            except ImportError as e2:
-                print(f"[AGENTS] ❌ Tentativa 2 falhou (ImportError): {e2}", flush=True)
-                last_error = e2
-            except Exception as e2:
-                print(f"[AGENTS] ❌ Tentativa 2 falhou: {e2}", flush=True)
-                last_error = e2
-                
-                # TENTATIVA 3: Fallback para OpenAI
-                print(f"[AGENTS] Tentativa 3: Fallback para OpenAI...", flush=True)
-                try:
-                    # Buscar OpenAI API key do banco ou env
-                    openai_key = os.getenv("OPENAI_API_KEY")
-                    if not openai_key or openai_key.lower().strip() in ["placeholder", "none", "", "null"]:
-                        # Tentar buscar do banco
-                        if database:
-                            result = database.supabase.table("llm_providers").select("*").eq("provider", "openai").execute()
-                            if result.data and len(result.data) > 0:
-                                openai_key = result.data[0].get("api_key_encrypted")
-                    
-                    if openai_key and openai_key.lower().strip() not in ["placeholder", "none", "", "null"]:
-                        # Validar a chave
-                        openai_key = validar_api_key(openai_key, "openai", agent_data.get('name', 'Desconhecido'))
-                        # Setar env var
-                        os.environ["OPENAI_API_KEY"] = openai_key
-                        
-                        llm = ChatOpenAI(
-                            model="gpt-4",
-                            temperature=float(agent_data.get("temperature", 0.7)),
-                            max_tokens=max_tokens,
-                            api_key=openai_key
-                        )
-                        print(f"[AGENTS] ⚠️ Usando OpenAI como fallback para Google Gemini", flush=True)
-                    else:
-                        raise ValueError("OpenAI API key não disponível para fallback")
-                except Exception as e3:
-                    print(f"[AGENTS] ❌ Todas as tentativas falharam", flush=True)
-            raise ValueError(
-                        f"Não foi possível criar LLM para Google Gemini. "
-                        f"Última tentativa: {last_error}"
-            )
-        
-        if llm is None:
-            raise ValueError("LLM não foi criado após todas as tentativas")
+        llm = _criar_llm_google(agent_data, api_key, max_tokens, database=database, timeout=timeout)
     else:
         # Default para OpenAI
         llm = ChatOpenAI(
             model="gpt-4",
             temperature=0.7,
             max_tokens=max_tokens,
-            api_key=api_key
+            api_key=api_key,
+            timeout=timeout,
+            max_retries=0
         )
     
+    return llm
+
+
+def criar_llm_reserva(agent_data: dict, database=None, timeout: Optional[float] = None):
+    """
+    Cria o LLM de reserva do agente (backup_llm_provider/backup_llm_model) usado no hedge.
+    
+    Retorna None se o agente não tem reserva configurada. Sem o teste de
+    invocação do LLM principal: a reserva só é chamada quando o principal demora.
+    """
+    llm_provider = (agent_data.get("backup_llm_provider") or "").lower()
+    if not llm_provider:
+        return None
+    agent_name = agent_data.get('name', 'Desconhecido')
+    dados_reserva = dict(agent_data, llm_provider=llm_provider)
+    if agent_data.get("backup_llm_model"):
+        dados_reserva["llm_model"] = agent_data["backup_llm_model"]
+    elif llm_provider != (agent_data.get("llm_provider") or "openai").lower():
+        # Modelo do principal não vale para outro provider: usar o padrão do provider de reserva
+        dados_reserva.pop("llm_model", None)
+    api_key = _obter_api_key(llm_provider, agent_name, database)
+    llm = _criar_llm(dados_reserva, llm_provider, api_key, database=database, timeout=timeout)
+    logger.debug(
+        "LLM de reserva criado para %s: %s/%s", agent_name, llm_provider, dados_reserva.get('llm_model', 'padrão'),
+        extra=campos(agente=agent_name, provedor=llm_provider)
+    )
+    return llm
+
+
+def criar_llm_agente(agent_data: dict, database=None, timeout: Optional[float] = None):
+    """
+    Cria e testa o LLM (LangChain) do agente do banco.
+    
+    O Agent converte esse modelo para crewai.LLM, que não tem stream de
+    tokens: quem chama o LLM direto (DebateCrew, llms_diretos) guarda a
+    referência retornada aqui e passa o mesmo objeto a criar_agente_dinamico.
+    
+    Args:
+        timeout: Timeout (s) das requisições HTTP do LLM (todos os providers);
+            debate_config.response_timeout
+    """
+    import os
+    from pathlib import Path
+    from dotenv import load_dotenv
+    
+    # Carregar .env
+    env_path = Path(__file__).parent / '.env'
+    load_dotenv(dotenv_path=env_path)
+    
+    llm_provider = agent_data.get("llm_provider", "openai").lower()
+    agent_name = agent_data.get('name', 'Desconhecido')
+    api_key = _obter_api_key(llm_provider, agent_name, database)
+    llm = _criar_llm(agent_data, llm_provider, api_key, database=database, timeout=timeout)
+    
     # VALIDAÇÃO CRÍTICA DO LLM
     if llm is None:
         agent_name = agent_data.get('name', 'Desconhecido')
@@ -469,34 +724,63 @@ def criar_agente_dinamico(agent_data: dict, use_rag: bool = True, database=None)
             f"Verifique se a API key está configurada corretamente."
         )
     
-    print(f"[AGENTS] LLM criado: {type(llm).__name__}", flush=True)
-    print(f"[AGENTS] LLM model: {getattr(llm, 'model_name', getattr(llm, 'model', 'N/A'))}", flush=True)
-    print(f"[AGENTS] ENV CREWAI_DISABLE_LITELLM_FALLBACK: {os.getenv('CREWAI_DISABLE_LITELLM_FALLBACK')}", flush=True)
+    logger.debug(
+        "LLM criado: %s (model: %s)", type(llm).__name__, getattr(llm, 'model_name', getattr(llm, 'model', 'N/A')),
+        extra=campos(agente=agent_name, provedor=llm_provider)
+    )
+    logger.debug("ENV CREWAI_DISABLE_LITELLM_FALLBACK: %s", os.getenv('CREWAI_DISABLE_LITELLM_FALLBACK'))
     
     # TESTAR LLM ANTES DE PASSAR PARA AGENT
     # Verificar se o LLM tem o método invoke (Runnable do LangChain)
     if hasattr(llm, "invoke"):
         try:
-            print(f"[AGENTS] Testando LLM (Runnable)...", flush=True)
-            # Teste simples: invocar com uma mensagem mínima
-            test_result = llm.invoke("test")
-            print(f"[AGENTS] ✅ LLM respondeu ao teste", flush=True)
+            logger.debug("Testando LLM (Runnable)")
+            # Teste simples: invocar com uma mensagem mínima (pelo agendador, como as chamadas do debate)
+            test_result = agendador_llm.executar(lambda: llm.invoke("test"), llm_provider, chave_do_llm(llm), tokens=1)
+            logger.debug("LLM respondeu ao teste")
         except Exception as test_error:
-            print(f"[AGENTS] ❌ ERRO: LLM falhou no teste: {test_error}", flush=True)
-            import traceback
-            traceback.print_exc()
+            logger.exception("LLM falhou no teste: %s", test_error, extra=campos(agente=agent_name, provedor=llm_provider))
+            if llm_provider == "google":
+                # A estratégia memorizada criou um LLM que não responde: refazer a sequência na próxima criação
+                _registrar_estrategia_gemini(_chave_estrategia_gemini(agent_data.get("llm_model", "gemini-2.5-flash")), None)
             raise ValueError(f"LLM inválido para agente {agent_name}: {test_error}")
     else:
         # LLM nativo/alternativo (ex: GeminiCompletion do CrewAI) - não precisa de teste de invoke
-        print(f"[AGENTS] ⚠️ LLM nativo/alternativo detectado (sem método invoke) - pulando teste de invocação", flush=True)
-        print(f"[AGENTS] ✅ LLM considerado válido (tipo: {type(llm).__name__})", flush=True)
+        logger.debug("LLM nativo/alternativo detectado (sem método invoke) - pulando teste de invocação")
+        logger.debug(
+            "LLM considerado válido (tipo: %s)", type(llm).__name__,
+            extra=campos(agente=agent_name, provedor=llm_provider)
+        )
+    
+    return llm
+
+
+def criar_agente_dinamico(
+    agent_data: dict,
+    use_rag: bool = True,
+    database=None,
+    timeout: Optional[float] = None,
+    llm=None
+) -> Agent:
+    """
+    Cria um agente dinamicamente a partir de dados do banco
+    
+    Args:
+        timeout: Timeout (s) das requisições HTTP do LLM (todos os providers);
+            debate_config.response_timeout
+        llm: LLM já criado por criar_llm_agente (senão é criado aqui)
+    """
+    if llm is None:
+        llm = criar_llm_agente(agent_data, database=database, timeout=timeout)
     
     # Tratar verbose - pode vir como string do banco
-    verbose = agent_data.get("verbose", True)
+    verbose = agent_data.get("verbose", CREWAI_VERBOSE)
     if isinstance(verbose, str):
         verbose = verbose.lower() in ("true", "1", "yes", "on")
     elif verbose is None:
-        verbose = True
+        verbose = CREWAI_VERBOSE
+    # No perfil de produção a saída do CrewAI fica desligada mesmo que o agente peça verbose
+    verbose = verbose and CREWAI_VERBOSE
     
     # Tratar allow_delegation - pode vir como string do banco
     allow_delegation = agent_data.get("allow_delegation", False)
@@ -516,9 +800,9 @@ def criar_agente_dinamico(agent_data: dict, use_rag: bool = True, database=None)
         Quando necessário, use essas informações para enriquecer suas respostas e argumentos.
         Sempre priorize informações da sua base de conhecimento quando forem relevantes ao tópico discutido.
         """
-        backstory = base_backstory + rag_instruction
+        backstory = compactar_template(base_backstory + rag_instruction)
     else:
-        backstory = base_backstory
+        backstory = compactar_template(base_backstory)
     
     # Criar agent com LLM (já validamos que não é None)
     agent_params = {
@@ -530,21 +814,19 @@ def criar_agente_dinamico(agent_data: dict, use_rag: bool = True, database=None)
         "llm": llm  # Sempre passar - já validamos e testamos
     }
     
-    print(f"[AGENTS] Criando Agent com LLM validado...", flush=True)
-    print(f"[AGENTS] agent_params keys: {list(agent_params.keys())}", flush=True)
-    print(f"[AGENTS] LLM type: {type(agent_params.get('llm'))}", flush=True)
+    logger.debug("Criando Agent com LLM validado")
+    logger.debug("agent_params keys: %s", list(agent_params.keys()))
+    logger.debug("LLM type: %s", type(agent_params.get('llm')))
     
     # AGORA criar Agent com LLM validado
     try:
         agent = Agent(**agent_params)
-        print(f"[AGENTS] ✅ Agent criado com sucesso", flush=True)
+        logger.debug("Agent criado com sucesso")
     except Exception as agent_error:
-        print(f"[AGENTS] ❌ ERRO ao criar Agent: {agent_error}", flush=True)
-        print(f"[AGENTS] agent_params keys: {list(agent_params.keys())}", flush=True)
-        print(f"[AGENTS] LLM type: {type(agent_params.get('llm'))}", flush=True)
-        print(f"[AGENTS] LLM object: {agent_params.get('llm')}", flush=True)
-        import traceback
-        traceback.print_exc()
+        logger.exception(
+            f"Erro ao criar Agent: {agent_error} "
+            f"(agent_params keys: {list(agent_params.keys())}, LLM: {agent_params.get('llm')!r})"
+        )
         raise
     
     # Não podemos adicionar atributos ao Agent (é um modelo Pydantic)
@@ -166,6 +166,9 @@ class AgentCreate(BaseModel):
     status: str = "active"
     tags: List[str] = []
     description: Optional[str] = None
+    backup_llm_provider: Optional[str] = None
+    backup_llm_model: Optional[str] = None
+    hedge_after_ms: Optional[int] = Field(None, ge=500, le=60000)
 
 class AgentUpdate(BaseModel):
     name: Optional[str] = None
@@ -183,6 +186,9 @@ class AgentUpdate(BaseModel):
     status: Optional[str] = None
     tags: Optional[List[str]] = None
     description: Optional[str] = None
+    backup_llm_provider: Optional[str] = None
+    backup_llm_model: Optional[str] = None
+    hedge_after_ms: Optional[int] = Field(None, ge=500, le=60000)
 
 class LLMProviderConfig(BaseModel):
     provider: str
@@ -201,6 +207,17 @@ class DebateSettings(BaseModel):
     max_rounds: Optional[int] = Field(None, ge=1, le=10)
     response_timeout: Optional[int] = Field(None, ge=30, le=300)
     allow_without_min_agents: Optional[bool] = None
+    max_input_tokens: Optional[int] = Field(None, ge=1000, le=200000)
+    hedge_threshold_ms: Optional[int] = Field(None, ge=500, le=60000)
+    max_concurrent_debates: Optional[int] = Field(None, ge=1, le=100)
+    max_queue_size: Optional[int] = Field(None, ge=0, le=1000)
+    convergence_detection: Optional[bool] = None
+    novelty_threshold: Optional[float] = Field(None, ge=0.0, le=1.0)
+    response_cache: Optional[bool] = None
+    cache_similarity_threshold: Optional[float] = Field(None, ge=0.5, le=1.0)
+    cache_ttl_seconds: Optional[int] = Field(None, ge=60, le=2592000)
+    cache_max_entries: Optional[int] = Field(None, ge=0, le=10000)
+    hierarchical_synthesis_tokens: Optional[int] = Field(None, ge=1000, le=1000000)
 
 class ApiLimits(BaseModel):
     monthly_tokens: Optional[int] = Field(None, ge=1)
@@ -454,6 +471,8 @@ async def update_agent(agent_id: str, agent: AgentUpdate):
         result = db.supabase.table("agents").update(update_data).eq("id", agent_id).execute()
         if not result.data:
             raise HTTPException(status_code=404, detail="Agente não encontrado")
+        from database import invalidar_cache_agentes
+        invalidar_cache_agentes(agent_id)
         return result.data[0]
     except HTTPException:
         raise
@@ -465,6 +484,8 @@ async def delete_agent(agent_id: str):
     """Deleta um agente"""
     try:
         db.supabase.table("agents").delete().eq("id", agent_id).execute()
+        from database import invalidar_cache_agentes
+        invalidar_cache_agentes(agent_id)
         return {"success": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao deletar agente: {str(e)}")
@@ -550,8 +571,8 @@ class TestMessageRequest(BaseModel):
     test_message: str
 
 @router.post("/agents/{agent_id}/test")
-async def test_agent(agent_id: str, request: TestMessageRequest):
-    """Testa um agente com uma mensagem"""
+def test_agent(agent_id: str, request: TestMessageRequest):
+    """Testa um agente com uma mensagem (síncrona: criar o agente testa o LLM pelo agendador)"""
     try:
         # Buscar agente
         result = db.supabase.table("agents").select("*").eq("id", agent_id).execute()
@@ -816,8 +837,13 @@ async def update_llm_provider(provider: str, config: LLMProviderUpdate):
         raise HTTPException(status_code=500, detail=f"Erro ao atualizar provedor: {str(e)}")
 
 @router.post("/llms/{provider}/test")
-async def test_llm_connection(provider: str):
-    """Testa conexão com um provedor"""
+def test_llm_connection(provider: str):
+    """
+    Testa conexão com um provedor
+    
+    Rota síncrona: o FastAPI a executa no threadpool, porque o agendador
+    bloqueia a thread (espera de vaga e backoff em 429) e não pode rodar no event loop.
+    """
     try:
         # Buscar API key do banco
         result = db.supabase.table("llm_providers").select("*").eq("provider", provider.lower()).execute()
@@ -834,26 +860,31 @@ async def test_llm_connection(provider: str):
         # Testar conexão baseado no provider
         provider_lower = provider.lower()
         
+        # Chamadas pelo agendador compartilhado: o teste não fura os limites da chave usados pelos debates
+        from llm_scheduler import agendador_llm, identificar_chave
+        chave = identificar_chave(api_key)
+        
         connected = False
         if provider_lower == "openai":
             from openai import OpenAI
-            client = OpenAI(api_key=api_key)
+            client = OpenAI(api_key=api_key, max_retries=0)
             # Fazer chamada simples para testar
-            response = client.models.list()
+            response = agendador_llm.executar(lambda: client.models.list(), provider_lower, chave)
             connected = True
         
         elif provider_lower == "anthropic":
             from anthropic import Anthropic
-            client = Anthropic(api_key=api_key)
+            client = Anthropic(api_key=api_key, max_retries=0)
             # Listar modelos para testar
-            client.models.list()
+            agendador_llm.executar(lambda: client.models.list(), provider_lower, chave)
             connected = True
         
         elif provider_lower == "google":
             # Google Gemini test
             import google.generativeai as genai
             genai.configure(api_key=api_key)
-            models = genai.list_models()
+            # list_models é um gerador: consumir dentro do agendador para a requisição acontecer lá
+            models = agendador_llm.executar(lambda: list(genai.list_models()), provider_lower, chave)
             connected = True
         
         else:
@@ -944,6 +975,29 @@ async def get_usage_stats():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar estatísticas: {str(e)}")
 
+@router.get("/metrics/providers")
+async def get_provider_metrics():
+    """
+    Métricas por provedor desde o início do processo: latência e hedge (taxa
+    de hedge, vitórias da reserva, latência economizada) e o agendador (espera
+    na fila, limites de taxa recebidos, repetições)
+    """
+    from llm_scheduler import agendador_llm
+    from metricas_provedores import metricas_provedores
+    return {"providers": metricas_provedores.resumo(), "scheduler": agendador_llm.resumo()}
+
+@router.get("/cache/debates")
+async def get_debate_cache():
+    """Ocupação e taxa de acerto do cache semântico de debates (deste processo)"""
+    from cache_debates import cache_debates
+    return cache_debates.resumo()
+
+@router.delete("/cache/debates")
+async def clear_debate_cache():
+    """Esvazia o cache de debates (ex.: após trocar a base de conhecimento de um agente)"""
+    from cache_debates import cache_debates
+    return {"removidas": cache_debates.limpar()}
+
 @router.get("/stats")
 async def get_dashboard_stats():
     """Retorna estatísticas reais do dashboard"""
@@ -1093,6 +1147,10 @@ async def update_settings(settings_update: SettingsUpdateRequest):
         return _build_settings_response(current)
     try:
         updated = db.update_system_settings(payload)
+        # Limites de admissão valem na hora para este processo (os outros recarregam periodicamente)
+        from debate_scheduler import agendador_debates
+        debate_config = updated.get("debate_config", {})
+        agendador_debates.configurar(debate_config.get("max_concurrent_debates"), debate_config.get("max_queue_size"))
         return _build_settings_response(updated)
     except Exception as e:
         print(f"[API_ADMIN] Erro ao atualizar settings: {str(e)}")
@@ -4,6 +4,12 @@ Execute: python api_server.py
 """
 import sys
 import os
+import asyncio
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
 
 # ⚠️ CRÍTICO: Definir variáveis de ambiente ANTES de qualquer import do CrewAI
 # Isso evita que o CrewAI tente fazer prompts interativos
@@ -21,6 +27,8 @@ print("[API_SERVER] Iniciando importações...", flush=True)
 try:
     from fastapi import FastAPI, HTTPException
     from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse, StreamingResponse
+    from starlette.concurrency import run_in_threadpool
     from pydantic import BaseModel
     from typing import List, Dict, Optional
     print("[API_SERVER] FastAPI importado com sucesso", flush=True)
@@ -41,6 +49,13 @@ print("[API_SERVER] Importações pesadas (CrewAI) serão feitas lazy (quando ne
 import uvicorn
 print("[API_SERVER] Uvicorn importado com sucesso", flush=True)
 
+from coalescencia import Assinatura, ChaveIdempotenciaConflitante, Voo, chave_pedido, coalescedor_debates
+from debate_turno import TIPOS_SINTESE, TipoTurno, Turno, para_json
+from debate_scheduler import FilaCheia, Vaga, VagaCancelada, agendador_debates
+from log_utils import campos, obter_logger
+
+logger = obter_logger("api")
+
 # NÃO importar admin_router aqui - será feito lazy no startup
 admin_router = None
 
@@ -142,6 +157,18 @@ def get_database():
         print(f"[API_SERVER] ERRO ao inicializar Database: {str(e)}", flush=True)
         return None
 
+def get_debate_config() -> Dict:
+    """Retorna debate_config das configurações do sistema (ou os valores padrão)"""
+    from database import DEFAULT_SYSTEM_SETTINGS
+    debate_config = dict(DEFAULT_SYSTEM_SETTINGS["debate_config"])
+    database = get_database()
+    if database:
+        try:
+            debate_config.update(database.get_system_settings().get("debate_config", {}))
+        except Exception as e:
+            print(f"[API_SERVER] Erro ao ler debate_config, usando padrões: {str(e)}", flush=True)
+    return debate_config
+
 # Evento de startup - inicializar Database após o servidor iniciar
 @app.on_event("startup")
 async def startup_event():
@@ -190,23 +217,25 @@ try:
                 path = request.url.path
                 method = request.method
                 
-                print(f"[MIDDLEWARE] {method} {path} - Início", flush=True)
-                
                 try:
                     response = await call_next(request)
                     process_time = time.time() - start_time
-                    print(f"[MIDDLEWARE] {method} {path} - Status: {response.status_code} - Tempo: {process_time:.3f}s", flush=True)
+                    # Uma linha por requisição (sem a linha de início); amostrada em produção
+                    logger.info(
+                        "%s %s %d %.3fs", method, path, response.status_code, process_time,
+                        extra=campos(method=method, path=path, status=response.status_code, latencia=round(process_time, 3))
+                    )
                     return response
                 except Exception as e:
                     process_time = time.time() - start_time
-                    import traceback
-                    error_traceback = traceback.format_exc()
-                    print(f"[MIDDLEWARE] {method} {path} - ERRO após {process_time:.3f}s: {str(e)}", flush=True)
-                    print(f"[MIDDLEWARE] Traceback: {error_traceback}", flush=True)
+                    logger.exception(
+                        "%s %s - erro após %.3fs: %s", method, path, process_time, e,
+                        extra=campos(method=method, path=path, latencia=round(process_time, 3))
+                    )
                     raise
             except Exception as middleware_error:
                 # Se o middleware falhar, tentar processar sem ele
-                print(f"[MIDDLEWARE] ERRO no middleware: {str(middleware_error)}", flush=True)
+                logger.error("Erro no middleware: %s", middleware_error)
                 return await call_next(request)
 
     app.add_middleware(LoggingMiddleware)
@@ -356,8 +385,10 @@ class DebateRequest(BaseModel):
     pergunta: str
     num_rodadas: int
     contexto: Optional[List[str]] = None
-    modo: Optional[str] = 'debate'
+    modo: Optional[str] = 'debate'  # 'debate', 'painel' (aberturas em paralelo) ou 'sintese'
     salvar: Optional[bool] = True
+    assincrono: Optional[bool] = False  # Enfileirar como job e responder na hora com o job_id
+    sintese_continua: Optional[bool] = False  # Síntese ao final do debate, a partir de um resumo mantido a cada turno
 
 @app.get("/api/agents")
 async def get_agents():
@@ -405,292 +436,880 @@ async def get_agents():
             pass
         return {"agentes": []}
 
-@app.post("/api/debate/start")
-async def start_debate(request: DebateRequest):
-    """Inicia um novo debate"""
-    try:
-        print(f"[DEBATE] Iniciando debate - Agentes recebidos do frontend: {request.agentes}")
-        print(f"[DEBATE] Total de agentes recebidos: {len(request.agentes)}")
-        print(f"[DEBATE] Pergunta: {request.pergunta[:50]}..., Rodadas: {request.num_rodadas}")
-        # Validar agentes
-        if len(request.agentes) < 1:
-            raise HTTPException(
-                status_code=400,
-                detail="Selecione pelo menos 1 agente"
-            )
-        
-        # Buscar agentes do banco de dados usando os IDs (UUIDs)
-        nomes_agentes = []
-        agentes_data = []
-        usar_fallback = False
-        
-        try:
-            if not db:
-                raise HTTPException(status_code=503, detail="Database não disponível. Tente novamente em alguns instantes.")
-            # Buscar todos os agentes selecionados do banco
-            print(f"[DEBATE] Buscando {len(request.agentes)} agentes no banco de dados...")
-            for idx, agente_id in enumerate(request.agentes):
-                print(f"[DEBATE] Buscando agente {idx+1}/{len(request.agentes)}: ID={agente_id}")
-                result = db.supabase.table("agents").select("*").eq("id", agente_id).eq("status", "active").execute()
-                if result.data and len(result.data) > 0:
-                    agent_data = result.data[0]
-                    agentes_data.append(agent_data)
-                    # Usar o nome do agente do banco
-                    nomes_agentes.append(agent_data["name"])
-                    print(f"[DEBATE] ✓ Agente encontrado: {agent_data['name']}")
-                else:
-                    # Fallback: tentar mapear IDs antigos (compatibilidade)
-                    nome_map = {
-                        'elon': 'Elon Musk',
-                        'bill': 'Bill Gates',
-                        'jeff': 'Jeff Bezos',
-                        'mark': 'Mark Zuckerberg',
-                        'tim': 'Tim Cook'
-                    }
-                    nome = nome_map.get(agente_id.lower())
-                    if nome and nome in AGENTES_DISPONIVEIS:
-                        nomes_agentes.append(nome)
-                        usar_fallback = True
-                    else:
-                        raise HTTPException(
-                            status_code=400,
-                            detail=f"Agente com ID '{agente_id}' não encontrado no banco de dados"
-                        )
-            
-            print(f"[DEBATE] Total de agentes encontrados no banco: {len(nomes_agentes)}")
-            print(f"[DEBATE] Nomes dos agentes: {nomes_agentes}")
-            
-            if len(nomes_agentes) < 1:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Selecione pelo menos 1 agente válido"
-                )
-        except HTTPException:
-            raise
-        except Exception as e:
-            print(f"[DEBATE] Erro ao buscar agentes do banco: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            # Fallback para mapeamento antigo apenas se houver erro na query
-            nome_map = {
-                'elon': 'Elon Musk',
-                'bill': 'Bill Gates',
-                'jeff': 'Jeff Bezos',
-                'mark': 'Mark Zuckerberg',
-                'tim': 'Tim Cook'
-            }
-            nomes_agentes = []
-            for agente_id in request.agentes:
-                nome = nome_map.get(agente_id.lower())
+# Mapeamento de IDs antigos (antes dos agentes no banco) para os agentes hardcoded
+MAPA_AGENTES_LEGADOS = {
+    'elon': 'Elon Musk',
+    'bill': 'Bill Gates',
+    'jeff': 'Jeff Bezos',
+    'mark': 'Mark Zuckerberg',
+    'tim': 'Tim Cook'
+}
+
+# Pool de debates em segundo plano - criado na primeira requisição assíncrona
+job_manager = None
+
+# Debates sendo retomados neste processo (evita duas retomadas simultâneas do mesmo debate)
+_debates_em_execucao = set()
+_lock_debates_em_execucao = threading.Lock()
+
+def get_job_manager():
+    """Lazy initialization do DebateJobManager"""
+    global job_manager
+    if job_manager is None:
+        from debate_jobs import DebateJobManager
+        job_manager = DebateJobManager()
+    return job_manager
+
+# Intervalo (segundos) entre comentários de keep-alive no stream SSE,
+# para proxies não derrubarem a conexão enquanto um agente está pensando
+INTERVALO_KEEPALIVE_SSE = 15
+# Frequência (s) com que a rota síncrona verifica se o cliente desconectou
+INTERVALO_VERIFICACAO_DESCONEXAO = 1.0
+# Intervalo (s) para recarregar max_concurrent_debates/max_queue_size do banco
+INTERVALO_RECARGA_LIMITES = 30
+_limites_carregados_em = 0.0
+
+def _carregar_modulos_debate():
+    """Lazy import de DebateCrew e dos agentes hardcoded - só na primeira requisição de debate"""
+    global DebateCrew, AGENTES_DISPONIVEIS
+    if DebateCrew is not None:
+        return
+    try:
+        print("[API_SERVER] Importando DebateCrew (lazy)...", flush=True)
+        from debate_crew import DebateCrew as DebateCrewClass
+        from agents import AGENTES_DISPONIVEIS as agentes_hardcoded
+        AGENTES_DISPONIVEIS = agentes_hardcoded
+        DebateCrew = DebateCrewClass
+    except Exception as e:
+        print(f"[API_SERVER] ERRO ao importar DebateCrew: {str(e)}", flush=True)
+        import traceback
+        traceback.print_exc()
+
+# Participantes que não são agentes selecionados, mas cujas falas entram na resposta
+NOMES_PARTICIPANTES_SISTEMA = frozenset(("Moderador", "Sistema", "Contexto"))
+
+def _historico_para_retomar(database, debate: Dict) -> List[Dict]:
+    """
+    Histórico gravado de um debate interrompido, sem os itens que serão gerados de novo.
+    
+    Só vale o trecho com order_index contíguo a partir de 0: uma gravação que
+    falhou no meio (save_message só é registrada em log) deixa um buraco, e o
+    que vem depois dele é descartado e gerado de novo. Erros no fim (timeout,
+    provedor fora do ar - provável motivo da falha) e uma síntese gravada pela
+    metade também são descartados, e as mensagens deles removidas; os turnos
+    anteriores são reaproveitados.
+    """
+    mensagens = debate.get("messages") or []
+    contiguas = 0
+    for mensagem in mensagens:
+        if mensagem.get("order_index") != contiguas:
+            break
+        contiguas += 1
+    if contiguas < len(mensagens):
+        logger.warning(
+            "Mensagens gravadas com buraco no order_index: retomando do item %d (de %d gravados)",
+            contiguas, len(mensagens), extra=campos(amostra=1.0, debate_id=debate["id"])
+        )
+    historico = database.messages_to_historico(mensagens[:contiguas])
+    while historico and historico[-1]["tipo"] in ("erro", "sintese_conteudo"):
+        historico.pop()
+    database.delete_messages_from(debate["id"], len(historico))
+    return historico
+
+def _executar_debate(request: DebateRequest, ao_evento=None, cancelamento=None, retomar: Optional[Dict] = None) -> Dict:
+    """
+    Busca os agentes, executa o debate, formata o histórico e salva no banco.
+    
+    Compartilhado pela rota síncrona e pela de streaming, então o debate salvo
+    é o mesmo nas duas. Bloqueante: na rota de streaming roda numa thread.
+    
+    Com salvar, o debate é criado no banco como 'running' antes do primeiro
+    turno e cada item do histórico é gravado em messages assim que fica
+    pronto; ao final o status vira completed (failed se o debate quebrar,
+    cancelled se for cancelado). Se o processo morrer no meio, os turnos já
+    pagos continuam no banco e o debate pode ser retomado.
+    
+    Args:
+        ao_evento: Callback (tipo, dados) repassado ao DebateCrew para emitir
+            cada turno assim que ele termina
+        cancelamento: threading.Event repassado ao DebateCrew
+        retomar: Debate gravado (get_debate, com messages) a continuar do
+            último turno gravado em vez de começar um novo
+    
+    Returns:
+        Dicionário da resposta: debate_id, historico, sintese e metadados
+    """
+    if retomar:
+        with _lock_debates_em_execucao:
+            if retomar["id"] in _debates_em_execucao:
+                raise HTTPException(status_code=409, detail="Este debate já está sendo retomado")
+            _debates_em_execucao.add(retomar["id"])
+    try:
+        return _executar_debate_gravando(request, ao_evento, cancelamento, retomar)
+    finally:
+        if retomar:
+            with _lock_debates_em_execucao:
+                _debates_em_execucao.discard(retomar["id"])
+
+def _executar_debate_gravando(request: DebateRequest, ao_evento, cancelamento, retomar: Optional[Dict]) -> Dict:
+    logger.debug(
+        "Iniciando debate - %d agentes recebidos do frontend: %s", len(request.agentes), request.agentes,
+        extra=campos(agentes=len(request.agentes), rodadas=request.num_rodadas)
+    )
+    logger.debug("Pergunta: %s..., Rodadas: %s", request.pergunta[:50], request.num_rodadas)
+    # Validar agentes
+    if len(request.agentes) < 1:
+        raise HTTPException(
+            status_code=400,
+            detail="Selecione pelo menos 1 agente"
+        )
+    
+    _carregar_modulos_debate()
+    
+    # Tempos até o debate começar: busca dos agentes e até a primeira chamada ao LLM
+    inicio_pedido = time.perf_counter()
+    preparacao: Dict[str, float] = {}
+    
+    # Buscar agentes do banco de dados usando os IDs (UUIDs)
+    nomes_agentes = []
+    agentes_data = []
+    usar_fallback = False
+    
+    database = get_database()
+    try:
+        if not database:
+            raise HTTPException(status_code=503, detail="Database não disponível. Tente novamente em alguns instantes.")
+        # Buscar todos os agentes selecionados do banco (uma consulta, com cache da configuração)
+        logger.debug("Buscando %d agentes no banco de dados...", len(request.agentes))
+        inicio_busca = time.perf_counter()
+        agentes_por_id = database.get_active_agents(request.agentes)
+        preparacao["busca_agentes"] = round(time.perf_counter() - inicio_busca, 4)
+        nao_encontrados = []
+        for agente_id in request.agentes:
+            agent_data = agentes_por_id.get(agente_id)
+            if agent_data:
+                agentes_data.append(agent_data)
+                # Usar o nome do agente do banco
+                nomes_agentes.append(agent_data["name"])
+                logger.debug("Agente encontrado: %s", agent_data['name'])
+            else:
+                # Fallback: tentar mapear IDs antigos (compatibilidade)
+                nome = MAPA_AGENTES_LEGADOS.get(agente_id.lower())
                 if nome and nome in AGENTES_DISPONIVEIS:
                     nomes_agentes.append(nome)
                     usar_fallback = True
-            
-            if len(nomes_agentes) < 1:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Selecione pelo menos 1 agente válido"
-                )
-        
-        # Criar agentes CrewAI - suporta agentes dinâmicos do banco
-        # Esta seção é executada após o try-except, independente de ter entrado no except ou não
-        from agents import criar_agente_dinamico, obter_agente
-        from rag_manager import RAGManager
-        
-        # Criar mapeamento de índice -> nome do agente para salvar no histórico
-        # Isso deve ser feito ANTES de criar os agentes para garantir que temos os nomes corretos
-        agentes_nomes_map = {}  # índice -> nome do agente
-        for i, nome in enumerate(nomes_agentes):
-            # Se temos dados do banco, usar o nome do banco; senão usar o nome do fallback
-            if i < len(agentes_data):
-                agent_data = agentes_data[i]
-                agentes_nomes_map[i] = agent_data.get("name", nome)
-            else:
-                agentes_nomes_map[i] = nome
+                else:
+                    nao_encontrados.append(agente_id)
+        if nao_encontrados:
+            raise HTTPException(
+                status_code=400,
+                detail="Agentes não encontrados no banco de dados: " + ", ".join(f"'{agente_id}'" for agente_id in nao_encontrados)
+            )
         
-        agentes_crewai = []
-        rag_managers = {}  # Dicionário para mapear agent_id -> RAGManager
-        agent_ids_map = {}  # Mapear índice do agente -> agent_id
+        logger.debug(
+            "Total de agentes encontrados no banco: %d (%s)", len(nomes_agentes), nomes_agentes,
+            extra=campos(agentes=len(nomes_agentes))
+        )
         
-        try:
-            for i, nome in enumerate(nomes_agentes):
-                try:
-                    # PRIORIDADE 1: Se temos dados do banco, SEMPRE usar agente dinâmico
-                    if i < len(agentes_data):
-                        # Usar agente dinâmico do banco com RAG habilitado
-                        agent_data = agentes_data[i]
-                        agent_id = str(agent_data.get("id", ""))
-                        agentes_crewai.append(criar_agente_dinamico(agent_data, use_rag=True, database=db))
-                        
-                        # Criar RAG manager separadamente e mapear por índice
-                        if agent_id:
-                            rag_managers[i] = RAGManager(agent_id, database=db)
-                            agent_ids_map[i] = agent_id
-                    # PRIORIDADE 2: Só usar hardcoded se NÃO tivermos dados do banco
-                    elif usar_fallback or nome in AGENTES_DISPONIVEIS:
-                        # Usar agente hardcoded se existir ou se estiver usando fallback
-                        agentes_crewai.append(obter_agente(nome))
-                        # Agentes hardcoded não têm RAG
-                    else:
-                        raise HTTPException(
-                            status_code=400,
-                            detail=f"Agente '{nome}' não encontrado e sem dados do banco"
-                        )
-                except HTTPException:
-                    raise
-                except Exception as agent_error:
-                    print(f"[DEBATE] Erro ao criar agente '{nome}': {str(agent_error)}")
-                    import traceback
-                    traceback.print_exc()
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"Erro ao criar agente '{nome}': {str(agent_error)}"
-                    )
-        except HTTPException:
-            raise
-        except Exception as e:
-            print(f"[DEBATE] Erro ao criar lista de agentes: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        if len(nomes_agentes) < 1:
             raise HTTPException(
-                status_code=500,
-                detail=f"Erro ao criar agentes: {str(e)}"
+                status_code=400,
+                detail="Selecione pelo menos 1 agente válido"
             )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Erro ao buscar agentes do banco: %s", e)
+        # Fallback para mapeamento antigo apenas se houver erro na query
+        nomes_agentes = []
+        for agente_id in request.agentes:
+            nome = MAPA_AGENTES_LEGADOS.get(agente_id.lower())
+            if nome and nome in AGENTES_DISPONIVEIS:
+                nomes_agentes.append(nome)
+                usar_fallback = True
         
-        # Validar que temos agentes criados
-        if not agentes_crewai or len(agentes_crewai) == 0:
+        if len(nomes_agentes) < 1:
             raise HTTPException(
-                status_code=500,
-                detail="Nenhum agente foi criado com sucesso"
+                status_code=400,
+                detail="Selecione pelo menos 1 agente válido"
             )
-        
-        # Criar e executar debate com agentes já criados
-        try:
-            # VERIFICAÇÃO CRÍTICA
-            if DebateCrew is None:
-                error_msg = (
-                    "DebateCrew não está disponível. "
-                    "O import falhou durante a inicialização do servidor. "
-                    "Verifique os logs de startup para detalhes."
-                )
-                print(f"[DEBATE] ERRO: {error_msg}")
+    
+    # Criar agentes CrewAI - suporta agentes dinâmicos do banco
+    # Esta seção é executada após o try-except, independente de ter entrado no except ou não
+    from agents import criar_agente_dinamico, criar_llm_agente, criar_llm_reserva, obter_agente
+    from rag_manager import RAGManager
+    
+    debate_config = get_debate_config()
+    # Prazo de cada chamada ao provedor: aplicado pelo DebateCrew e também como timeout do cliente HTTP
+    timeout_resposta = debate_config.get("response_timeout")
+    limiar_hedge_padrao = debate_config.get("hedge_threshold_ms")
+    modo_escolhido = request.modo or 'debate'
+    num_rodadas = max(1, min(request.num_rodadas, int(debate_config.get("max_rounds", request.num_rodadas))))
+    
+    # Cache semântico: painel idêntico e pergunta parecida com um debate já concluído
+    chave_cache, vetor_pergunta = None, None
+    if debate_config.get("response_cache") and not retomar and len(agentes_data) == len(nomes_agentes):
+        chave_cache, vetor_pergunta, acerto = _consultar_cache(
+            request, database, debate_config, agentes_data, modo_escolhido, num_rodadas
+        )
+        if acerto:
+            return _responder_do_cache(request, database, acerto, num_rodadas, ao_evento)
+    
+    # Criar mapeamento de índice -> nome do agente para salvar no histórico
+    # Isso deve ser feito ANTES de criar os agentes para garantir que temos os nomes corretos
+    agentes_nomes_map = {}  # índice -> nome do agente
+    for i, nome in enumerate(nomes_agentes):
+        # Se temos dados do banco, usar o nome do banco; senão usar o nome do fallback
+        if i < len(agentes_data):
+            agent_data = agentes_data[i]
+            agentes_nomes_map[i] = agent_data.get("name", nome)
+        else:
+            agentes_nomes_map[i] = nome
+    
+    agentes_crewai = []
+    rag_managers = {}  # Dicionário para mapear agent_id -> RAGManager
+    agent_ids_map = {}  # Mapear índice do agente -> agent_id
+    reservas_llm = {}  # Índice do agente -> LLM de reserva e limiar do hedge
+    llms_diretos = {}  # Índice do agente -> LLM LangChain (stream de tokens), antes da conversão pelo Agent
+    
+    try:
+        for i, nome in enumerate(nomes_agentes):
+            try:
+                # PRIORIDADE 1: Se temos dados do banco, SEMPRE usar agente dinâmico
+                if i < len(agentes_data):
+                    # Usar agente dinâmico do banco com RAG habilitado
+                    agent_data = agentes_data[i]
+                    agent_id = str(agent_data.get("id", ""))
+                    llms_diretos[i] = criar_llm_agente(agent_data, database=database, timeout=timeout_resposta)
+                    agentes_crewai.append(criar_agente_dinamico(
+                        agent_data, use_rag=True, database=database, timeout=timeout_resposta, llm=llms_diretos[i]
+                    ))
+                    
+                    # Criar RAG manager separadamente e mapear por índice
+                    if agent_id:
+                        rag_managers[i] = RAGManager(agent_id, database=database)
+                        agent_ids_map[i] = agent_id
+                    
+                    # LLM de reserva (hedge) - sem ele o agente só usa o principal
+                    try:
+                        llm_reserva = criar_llm_reserva(agent_data, database=database, timeout=timeout_resposta)
+                    except Exception as reserva_error:
+                        logger.warning(
+                            "LLM de reserva de '%s' indisponível, seguindo sem hedge: %s", nome, reserva_error,
+                            extra=campos(agente=nome)
+                        )
+                        llm_reserva = None
+                    limiar_ms = agent_data.get("hedge_after_ms") or limiar_hedge_padrao
+                    if llm_reserva is not None and limiar_ms:
+                        reservas_llm[i] = {"llm": llm_reserva, "limiar": float(limiar_ms) / 1000}
+                # PRIORIDADE 2: Só usar hardcoded se NÃO tivermos dados do banco
+                elif usar_fallback or nome in AGENTES_DISPONIVEIS:
+                    # Usar agente hardcoded se existir ou se estiver usando fallback
+                    agentes_crewai.append(obter_agente(nome))
+                    # Agentes hardcoded não têm RAG
+                else:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Agente '{nome}' não encontrado e sem dados do banco"
+                    )
+            except HTTPException:
+                raise
+            except Exception as agent_error:
+                logger.exception("Erro ao criar agente '%s': %s", nome, agent_error, extra=campos(agente=nome))
                 raise HTTPException(
-                    status_code=503,
-                    detail=error_msg
+                    status_code=500,
+                    detail=f"Erro ao criar agente '{nome}': {str(agent_error)}"
                 )
-            
-            print(f"[DEBATE] Criando debate com {len(agentes_crewai)} agentes CrewAI")
-            print(f"[DEBATE] Agentes CrewAI criados: {[agente.role for agente in agentes_crewai]}")
-            print(f"[DEBATE] Mapeamento de nomes: {agentes_nomes_map}")
-            modo_escolhido = request.modo or 'debate'
-            debate = DebateCrew(
-                agentes_crewai=agentes_crewai,
-                pergunta=request.pergunta,
-                rag_managers=rag_managers,
-                contexto_usuario=request.contexto,
-                modo=modo_escolhido,
-                agentes_nomes_map=agentes_nomes_map  # Passar mapeamento de nomes
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Erro ao criar lista de agentes: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao criar agentes: {str(e)}"
+        )
+    
+    # Validar que temos agentes criados
+    if not agentes_crewai or len(agentes_crewai) == 0:
+        raise HTTPException(
+            status_code=500,
+            detail="Nenhum agente foi criado com sucesso"
+        )
+    
+    # Gravação turno a turno (ver _executar_debate)
+    debate_id = None
+    historico_inicial = None
+    ao_registrar = None
+    
+    # Criar e executar debate com agentes já criados
+    try:
+        # VERIFICAÇÃO CRÍTICA
+        if DebateCrew is None:
+            error_msg = (
+                "DebateCrew não está disponível. "
+                "O import falhou ao carregar os módulos do debate. "
+                "Verifique os logs para detalhes."
             )
-            print(f"[DEBATE] Executando debate com {request.num_rodadas} rodadas")
-            historico = debate.executar_debate(num_rodadas=request.num_rodadas)
-            print(f"[DEBATE] Debate executado. Total de itens no histórico: {len(historico)}")
-        except Exception as debate_error:
-            print(f"[DEBATE] Erro ao executar debate: {str(debate_error)}")
-            import traceback
-            traceback.print_exc()
+            logger.error(error_msg)
             raise HTTPException(
-                status_code=500,
-                detail=f"Erro ao executar debate: {str(debate_error)}"
+                status_code=503,
+                detail=error_msg
             )
         
-        # Formatar resposta
-        historico_formatado = []
-        sintese_final = None
-        
-        print(f"[DEBATE] Total de itens no historico: {len(historico)}")
-        print(f"[DEBATE] Tipos de itens no historico: {[item.get('tipo') for item in historico]}")
-        
-        summary_mode = modo_escolhido == 'sintese'
-        # Obter apenas os agentes selecionados para filtrar o histórico
-        agentes_selecionados_set = set(nomes_agentes)
-        
-        for item in historico:
-            print(f"[DEBATE] Processando item: tipo={item.get('tipo')}, agente={item.get('agente')}")
-            
-            # Ignorar síntese e sintese_conteudo - serão processadas separadamente
-            if item["tipo"] in ["sintese", "sintese_conteudo"]:
-                if item["tipo"] == "sintese_conteudo" and summary_mode:
-                    sintese_final = item["conteudo"]
-                    print(f"[DEBATE] Sintese encontrada: {len(sintese_final)} caracteres")
-                    print(f"[DEBATE] Primeiros 200 caracteres: {sintese_final[:200]}...")
-                continue
-            
-            # Para respostas, verificar se o agente está nos selecionados
-            if item["tipo"] == "resposta":
-                agente_nome = item.get("agente", "")
-                # Verificar se o nome do agente corresponde a algum dos selecionados
-                # O agente pode vir como role (ex: "CEO da Apple") ou nome (ex: "Tim Cook")
-                agente_encontrado = False
-                for nome_selecionado in agentes_selecionados_set:
-                    if nome_selecionado in agente_nome or agente_nome in nome_selecionado:
-                        agente_encontrado = True
-                        break
-                
-                if not agente_encontrado and agente_nome not in ["Moderador", "Sistema", "Contexto"]:
-                    print(f"[DEBATE] Ignorando resposta de agente não selecionado: {agente_nome}")
-                    continue
-            
-                historico_formatado.append({
-                    "tipo": item["tipo"],
-                    "conteudo": item["conteudo"],
-                "agente": item.get("agente"),  # Nome do agente (prioridade)
-                "agente_role": item.get("agente_role")  # Role do agente (para referência)
-                })
-        
-        print(f"[DEBATE] Historico formatado: {len(historico_formatado)} itens")
-        print(f"[DEBATE] Sintese final: {'Sim' if sintese_final else 'Nao'}")
-        if sintese_final and summary_mode:
-            print(f"[DEBATE] Tamanho da sintese: {len(sintese_final)} caracteres")
-        
-        # Salvar debate no banco de dados
-        debate_id = None
-        if request.salvar:
+        logger.debug(
+            "Criando debate com %d agentes CrewAI: %s", len(agentes_crewai), [agente.role for agente in agentes_crewai],
+            extra=campos(agentes=len(agentes_crewai))
+        )
+        logger.debug("Mapeamento de nomes: %s", agentes_nomes_map)
+        if retomar:
+            debate_id = retomar["id"]
+            historico_inicial = _historico_para_retomar(database, retomar)
+            database.update_debate_status(debate_id, "running")
+            logger.info(
+                "Retomando debate a partir do item %d", len(historico_inicial),
+                extra=campos(amostra=1.0, debate_id=debate_id)
+            )
+        elif request.salvar and database:
             try:
-                if not db:
-                    raise HTTPException(status_code=503, detail="Database não disponível. Não foi possível salvar o debate.")
-                debate_id = db.save_debate(
+                debate_id = database.create_debate(
                     pergunta=request.pergunta,
                     selected_agents=request.agentes,
-                    num_rodadas=request.num_rodadas,
-                    historico=historico,
-                    sintese=sintese_final
+                    num_rodadas=num_rodadas,
+                    modo=modo_escolhido,
+                    contexto=request.contexto,
+                    sintese_continua=bool(request.sintese_continua)
                 )
-                print(f"[DEBATE] Debate salvo no banco com ID: {debate_id}")
-            except Exception as db_error:
-                print(f"[DEBATE] ERRO CRITICO ao salvar no banco: {str(db_error)}")
-                print(f"[DEBATE] Tipo do erro: {type(db_error).__name__}")
-                import traceback
-                traceback.print_exc()
-                debate_id = None
+            except Exception as create_error:
+                # Ex.: migração de checkpoint não aplicada - o debate é salvo inteiro no final
+                logger.warning("Gravação turno a turno indisponível, salvando só ao final: %s", create_error)
+        ao_atualizar_resumo = None
+        if debate_id:
+            def ao_registrar(item: Turno, indice: int):
+                database.save_message(debate_id, item, indice)
+            if request.sintese_continua:
+                def ao_atualizar_resumo(resumo: str, falas: int):
+                    database.update_running_summary(debate_id, resumo, falas)
+        debate = DebateCrew(
+            agentes_crewai=agentes_crewai,
+            pergunta=request.pergunta,
+            rag_managers=rag_managers,
+            contexto_usuario=request.contexto,
+            modo=modo_escolhido,
+            agentes_nomes_map=agentes_nomes_map,  # Passar mapeamento de nomes
+            agentes_ids_map=agent_ids_map,  # agente_id de cada turno (gravado em messages.agent_id)
+            max_tokens_entrada=debate_config.get("max_input_tokens"),
+            ao_evento=ao_evento,
+            cancelamento=cancelamento,
+            timeout_resposta=timeout_resposta,
+            reservas_llm=reservas_llm,
+            llms_diretos=llms_diretos,
+            ao_registrar=ao_registrar,
+            limiar_novidade=debate_config.get("novelty_threshold") if debate_config.get("convergence_detection") else None,
+            limiar_sintese_hierarquica=debate_config.get("hierarchical_synthesis_tokens"),
+            sintese_continua=bool(request.sintese_continua),
+            resumo_continuo_retomado=(
+                (retomar.get("resumo_continuo"), retomar.get("resumo_continuo_falas")) if retomar else None
+            ),
+            ao_atualizar_resumo=ao_atualizar_resumo
+        )
+        if ao_evento:
+            ao_evento("inicio", {
+                "num_rodadas": num_rodadas,
+                "modo": modo_escolhido,
+                "agentes": [agentes_nomes_map.get(i, agente.role) for i, agente in enumerate(agentes_crewai)]
+            })
+        logger.debug("Executando debate com %d rodadas", num_rodadas, extra=campos(debate_id=debate_id))
+        historico = debate.executar_debate(num_rodadas=num_rodadas, historico_inicial=historico_inicial)
+        logger.debug(
+            "Debate executado. Total de itens no histórico: %d", len(historico),
+            extra=campos(debate_id=debate_id, itens=len(historico))
+        )
+        if debate.inicio_primeira_chamada is not None:
+            preparacao["ate_primeira_chamada"] = round(debate.inicio_primeira_chamada - inicio_pedido, 4)
+        debate.metadados["preparacao"] = preparacao
+        logger.info("Preparação do debate", extra=campos(**preparacao))
+    except Exception as debate_error:
+        logger.exception("Erro ao executar debate: %s", debate_error, extra=campos(debate_id=debate_id))
+        if debate_id:
+            try:
+                database.update_debate_status(debate_id, "failed")
+            except Exception as status_error:
+                logger.warning(
+                    "Não foi possível marcar o debate como failed: %s", status_error, extra=campos(debate_id=debate_id)
+                )
+        if isinstance(debate_error, HTTPException):
+            raise
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao executar debate: {str(debate_error)}"
+        )
+    
+    # Formatar resposta
+    historico_formatado = []
+    sintese_final = None
+    
+    logger.debug("Total de itens no historico: %d", len(historico))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Tipos de itens no historico: %s", [item.tipo.value for item in historico])
+    
+    summary_mode = modo_escolhido == 'sintese' or bool(request.sintese_continua)
+    # Respostas geradas no debate trazem agente_idx (só há agentes selecionados no
+    # DebateCrew); as que vêm do contexto do usuário entram se o nome for o de um
+    # agente selecionado ou de um participante do sistema
+    nomes_permitidos = set(nomes_agentes) | NOMES_PARTICIPANTES_SISTEMA
+    
+    # Os itens da resposta são os próprios Turnos do debate (sem cópia por item)
+    for item in historico:
+        logger.debug("Processando item: tipo=%s, agente=%s", item.tipo, item.agente)
         
-        return {
-            "debate_id": debate_id,
-            "historico": historico_formatado,
-            "sintese": sintese_final
-        }
+        # Ignorar síntese e sintese_conteudo - serão processadas separadamente
+        if item.tipo in TIPOS_SINTESE:
+            if item.tipo is TipoTurno.SINTESE_CONTEUDO and summary_mode:
+                sintese_final = item.conteudo
+                logger.debug("Sintese encontrada: %d caracteres", len(sintese_final))
+                logger.debug("Primeiros 200 caracteres: %s...", sintese_final[:200])
+            continue
         
-    except HTTPException:
+        if item.tipo is TipoTurno.RESPOSTA:
+            if item.agente_idx is None and item.agente not in nomes_permitidos:
+                logger.debug("Ignorando resposta de agente não selecionado: %s", item.agente)
+                continue
+            # agente (nome), agente_role, agente_id, agente_idx, rodada e timestamp (fim do turno: ritmo de exibição no cliente)
+            historico_formatado.append(item)
+    
+    logger.debug(
+        "Historico formatado: %d itens; sintese final: %s", len(historico_formatado), "Sim" if sintese_final else "Nao",
+        extra=campos(debate_id=debate_id, itens=len(historico_formatado))
+    )
+    if sintese_final and summary_mode:
+        logger.debug("Tamanho da sintese: %d caracteres", len(sintese_final))
+    
+    # Salvar debate no banco de dados
+    if debate_id:
+        # Itens já gravados turno a turno: só o status final (e a síntese)
+        status_final = "cancelled" if debate.metadados.get("cancelado") else "completed"
+        try:
+            database.update_debate_status(debate_id, status_final, sintese=sintese_final)
+            logger.info("Debate gravado", extra=campos(amostra=1.0, debate_id=debate_id, status=status_final))
+        except Exception as db_error:
+            logger.exception("Erro ao atualizar status do debate: %s", db_error, extra=campos(debate_id=debate_id))
+    elif request.salvar and debate.metadados.get("cancelado"):
+        logger.info("Debate cancelado - não será salvo no banco", extra=campos(amostra=1.0))
+    elif request.salvar:
+        try:
+            if not database:
+                raise HTTPException(status_code=503, detail="Database não disponível. Não foi possível salvar o debate.")
+            debate_id = database.save_debate(
+                pergunta=request.pergunta,
+                selected_agents=request.agentes,
+                num_rodadas=num_rodadas,
+                historico=historico,
+                sintese=sintese_final
+            )
+            logger.info("Debate salvo no banco", extra=campos(amostra=1.0, debate_id=debate_id))
+        except Exception as db_error:
+            logger.exception(
+                f"Erro crítico ao salvar no banco: {str(db_error)}",
+                extra=campos(tipo_erro=type(db_error).__name__)
+            )
+            debate_id = None
+    
+    resposta = {
+        "debate_id": debate_id,
+        "historico": historico_formatado,
+        "sintese": sintese_final,
+        "metadados": debate.metadados,
+        "cached": False
+    }
+    # Só debates completos entram no cache (sem cancelamento nem turnos com erro)
+    if chave_cache and not debate.metadados.get("cancelado") and not any(item.tipo is TipoTurno.ERRO for item in historico):
+        from cache_debates import cache_debates
+        cache_debates.guardar(chave_cache, request.pergunta, vetor_pergunta, {
+            "resposta": {k: v for k, v in resposta.items() if k != "debate_id"},
+            "historico": historico,
+            "inicio": {
+                "num_rodadas": num_rodadas,
+                "modo": modo_escolhido,
+                "agentes": [agentes_nomes_map.get(i, agente.role) for i, agente in enumerate(agentes_crewai)]
+            }
+        })
+    return resposta
+
+_cliente_embeddings_cache = None
+_lock_cliente_embeddings_cache = threading.Lock()
+
+def _consultar_cache(request: DebateRequest, database, debate_config: Dict, agentes_data: List[Dict], modo: str, num_rodadas: int):
+    """(chave, embedding da pergunta, acerto ou None); (None, None, None) se o cache não puder ser consultado"""
+    global _cliente_embeddings_cache
+    from cache_debates import cache_debates, chave_painel
+    cache_debates.configurar(
+        limiar=debate_config.get("cache_similarity_threshold"),
+        ttl=debate_config.get("cache_ttl_seconds"),
+        max_entradas=debate_config.get("cache_max_entries")
+    )
+    try:
+        with _lock_cliente_embeddings_cache:
+            if _cliente_embeddings_cache is None:
+                from rag_manager import ClienteEmbeddings, obter_chave_embeddings
+                _cliente_embeddings_cache = ClienteEmbeddings(obter_chave_embeddings(database, origem="cache de debates"))
+        chave = chave_painel(agentes_data, modo, num_rodadas, request.contexto, bool(request.sintese_continua))
+        vetor = _cliente_embeddings_cache.embed(request.pergunta)
+    except Exception as e:
+        logger.warning("Cache de debates indisponível, executando o debate: %s", e)
+        return None, None, None
+    return chave, vetor, cache_debates.buscar(chave, vetor)
+
+def _responder_do_cache(request: DebateRequest, database, acerto: Dict, num_rodadas: int, ao_evento) -> Dict:
+    """Resposta de um debate servido do cache: reemite os eventos e salva como um debate novo"""
+    resposta, historico = acerto["dados"]["resposta"], acerto["dados"]["historico"]
+    resposta["cached"] = True
+    resposta["metadados"]["cache"] = {
+        "pergunta_original": acerto["pergunta"],
+        "similaridade": acerto["similaridade"],
+        "idade": acerto["idade"],
+    }
+    if ao_evento:
+        ao_evento("inicio", dict(acerto["dados"]["inicio"], cached=True))
+        eventos = {"pergunta": "pergunta", "resposta": "turno", "erro": "erro", "sintese_conteudo": "sintese"}
+        for item in historico:
+            if item["tipo"] in eventos:
+                ao_evento(eventos[item["tipo"]], item)
+    resposta["debate_id"] = None
+    if request.salvar and database:
+        try:
+            resposta["debate_id"] = database.save_debate(
+                pergunta=request.pergunta,
+                selected_agents=request.agentes,
+                num_rodadas=num_rodadas,
+                historico=historico,
+                sintese=resposta["sintese"]
+            )
+        except Exception as db_error:
+            logger.exception("Erro ao salvar debate servido do cache: %s", db_error)
+    return resposta
+
+async def _sair_ao_desconectar(http_request: Request, assinatura: Assinatura) -> None:
+    """Tira o pedido do voo se o cliente fechar a conexão antes da resposta (o último a sair cancela o debate)"""
+    while not assinatura.voo.concluido.is_set():
+        if await http_request.is_disconnected():
+            logger.info("Cliente desconectou", extra=campos(amostra=1.0, path=http_request.url.path, voo=assinatura.voo.id))
+            assinatura.sair()
+            return
+        await asyncio.sleep(INTERVALO_VERIFICACAO_DESCONEXAO)
+
+def _identificar_cliente(http_request: Request) -> str:
+    """Cliente para a fila justa: X-Client-Id, senão o IP original (X-Forwarded-For do Cloud Run) ou o da conexão"""
+    cliente = http_request.headers.get("x-client-id")
+    if not cliente:
+        encaminhado = http_request.headers.get("x-forwarded-for", "")
+        cliente = encaminhado.split(",")[0].strip() or (http_request.client.host if http_request.client else "")
+    return cliente or "anonimo"
+
+async def _aplicar_limites_fila() -> None:
+    """Atualiza os limites do agendador a partir do debate_config (no máximo a cada INTERVALO_RECARGA_LIMITES)"""
+    global _limites_carregados_em
+    agora = asyncio.get_running_loop().time()
+    if _limites_carregados_em and agora - _limites_carregados_em < INTERVALO_RECARGA_LIMITES:
+        return
+    _limites_carregados_em = agora
+    debate_config = await run_in_threadpool(get_debate_config)
+    agendador_debates.configurar(debate_config.get("max_concurrent_debates"), debate_config.get("max_queue_size"))
+
+def _erro_fila_cheia(erro: FilaCheia) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail={
+            "mensagem": "Servidor ocupado: muitos debates em andamento. Tente novamente em instantes.",
+            "retry_after": erro.retry_after,
+            "na_fila": erro.na_fila,
+            "executando": erro.executando,
+        },
+        headers={"Retry-After": str(erro.retry_after)}
+    )
+
+def _reservar_vaga(http_request: Request) -> Vaga:
+    """Pede a vaga do debate ao agendador; fila cheia vira HTTP 429 com Retry-After"""
+    try:
+        return agendador_debates.reservar(_identificar_cliente(http_request))
+    except FilaCheia as e:
+        raise _erro_fila_cheia(e)
+
+def _erro_http(erro: Dict) -> HTTPException:
+    """HTTPException a partir do desfecho de um voo ({"status_code", "detail"})"""
+    headers = None
+    if erro["status_code"] == 429 and isinstance(erro["detail"], dict):
+        headers = {"Retry-After": str(erro["detail"].get("retry_after"))}
+    return HTTPException(status_code=erro["status_code"], detail=erro["detail"], headers=headers)
+
+def _entrar_no_voo(request: DebateRequest, http_request: Request, retomar: Optional[Dict], tipo: str) -> Assinatura:
+    """
+    Assina a execução de um pedido idêntico em andamento (ou com a mesma
+    Idempotency-Key do mesmo cliente) ou cria uma nova, da qual o pedido é líder.
+    Jobs e execuções diretas (síncrona e stream) coalescem separadamente; retomadas nunca.
+    """
+    chave, chave_idempotencia = None, None
+    if not retomar:
+        chave = f"{tipo}:" + chave_pedido(
+            request.agentes, request.pergunta, request.num_rodadas, request.modo, request.contexto,
+            bool(request.sintese_continua), bool(request.salvar)
+        )
+        idempotency_key = http_request.headers.get("idempotency-key")
+        if idempotency_key:
+            chave_idempotencia = f"{_identificar_cliente(http_request)}:{idempotency_key}"
+    try:
+        return coalescedor_debates.entrar(chave, chave_idempotencia)
+    except ChaveIdempotenciaConflitante as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+def _decolar(voo: Voo, request: DebateRequest, http_request: Request, retomar: Optional[Dict] = None) -> None:
+    """Líder do voo: reserva a vaga (429 com a fila cheia, também para quem já assinou) e executa numa thread própria"""
+    try:
+        vaga = _reservar_vaga(http_request)
+    except HTTPException as e:
+        coalescedor_debates.concluir(voo, erro={"status_code": e.status_code, "detail": e.detail})
         raise
+    threading.Thread(
+        target=_executar_voo, args=(voo, vaga, request, retomar), name=f"debate-{voo.id[:8]}", daemon=True
+    ).start()
+
+def _executar_voo(voo: Voo, vaga: Vaga, request: DebateRequest, retomar: Optional[Dict]) -> None:
+    """Thread do voo: espera a vaga, executa o debate e publica fim (resultado) ou falha para todos os assinantes"""
+    resultado, erro = None, None
+    try:
+        posicao_inicial = agendador_debates.posicao(vaga)
+        agendador_debates.aguardar(vaga, voo.cancelamento, lambda posicao: voo.publicar("fila", {"posicao": posicao}))
+        resultado = _executar_debate(request, ao_evento=voo.publicar, cancelamento=voo.cancelamento, retomar=retomar)
+        resultado["metadados"]["fila"] = {"posicao_inicial": posicao_inicial, "espera": round(vaga.espera, 3)}
+    except VagaCancelada:
+        # Todos os clientes desconectaram antes da vaga: ninguém recebe esta resposta
+        erro = {"status_code": 499, "detail": "Debate cancelado enquanto aguardava na fila"}
+    except HTTPException as e:
+        erro = {"status_code": e.status_code, "detail": e.detail}
     except Exception as e:
-        # Capturar qualquer erro não tratado
-        error_msg = str(e)
-        print(f"[DEBATE] ERRO NAO TRATADO: {error_msg}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erro não tratado: %s", e, extra=campos(voo=voo.id))
+        erro = {"status_code": 500, "detail": f"Erro ao executar debate: {str(e)}"}
+    finally:
+        agendador_debates.encerrar(vaga)
+    coalescedor_debates.concluir(voo, resultado=resultado, erro=erro)
+    if erro is None:
+        voo.publicar("fim", resultado)
+    else:
+        voo.publicar("falha", erro)
+
+async def _acompanhar_voo(voo: Voo):
+    """
+    Eventos do voo no event loop: os já publicados e depois os novos, até fim
+    ou falha. Produz None a cada INTERVALO_KEEPALIVE_SSE sem eventos.
+    """
+    loop = asyncio.get_running_loop()
+    fila: asyncio.Queue = asyncio.Queue()
+    
+    def ouvinte(tipo: str, dados):
+        # Chamado da thread do debate: entregar ao event loop de forma thread-safe
+        loop.call_soon_threadsafe(fila.put_nowait, (tipo, dados))
+    
+    for evento in voo.ouvir(ouvinte):
+        fila.put_nowait(evento)
+    try:
+        while True:
+            try:
+                evento = await asyncio.wait_for(fila.get(), timeout=INTERVALO_KEEPALIVE_SSE)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            yield evento
+            if evento[0] in ("fim", "falha"):
+                return
+    finally:
+        voo.parar_de_ouvir(ouvinte)
+
+@app.get("/api/debate/fila")
+async def get_debate_queue():
+    """Ocupação do agendador de debates deste processo: em execução, na fila (por cliente), esperas e recusas"""
+    return dict(agendador_debates.resumo(), coalescencia=coalescedor_debates.resumo())
+
+@app.post("/api/debate/start")
+async def start_debate(request: DebateRequest, http_request: Request):
+    """
+    Inicia um novo debate.
+    
+    Com assincrono=true o debate é enfileirado no pool de jobs e a resposta
+    (202) traz o job_id para acompanhar em /api/debate/jobs/{job_id}.
+    Sem ele o debate roda numa thread e a resposta traz o resultado completo;
+    em ambos os casos o event loop fica livre para outras requisições. Se o
+    cliente desconectar, o debate é cancelado e a chamada em andamento abandonada.
+    
+    Os debates passam pelo agendador (max_concurrent_debates em execução,
+    fila justa por cliente); com a fila cheia a resposta é 429 com Retry-After.
+    A posição na fila vem em posicao_fila (job) ou metadados.fila (síncrono).
+    
+    Pedidos idênticos (agentes, pergunta, rodadas, modo e contexto) com um
+    debate igual em andamento não executam outro: recebem o mesmo resultado
+    (ou o mesmo job_id) com coalescido=true. Com o header Idempotency-Key, a
+    repetição depois de concluído devolve o resultado guardado; a mesma
+    chave com outro pedido responde 422.
+    """
+    return await _iniciar_debate(request, http_request)
+
+async def _iniciar_debate(request: DebateRequest, http_request: Request, retomar: Optional[Dict] = None):
+    """Execução comum de /api/debate/start e /api/debate/{debate_id}/resume (job ou síncrona)"""
+    if len(request.agentes) < 1:
         raise HTTPException(
-            status_code=500,
-            detail=f"Erro ao executar debate: {error_msg}"
+            status_code=400,
+            detail="Selecione pelo menos 1 agente"
         )
+    # Antes de entrar no voo: daqui até a vaga do líder não há await (um pedido igual não vê o voo pela metade)
+    await _aplicar_limites_fila()
+    if request.assincrono:
+        return _iniciar_job(request, http_request, retomar)
+    assinatura = _entrar_no_voo(request, http_request, retomar, "direto")
+    if assinatura.lider:
+        try:
+            _decolar(assinatura.voo, request, http_request, retomar)
+        except HTTPException:
+            assinatura.sair()
+            raise
+    vigia = asyncio.create_task(_sair_ao_desconectar(http_request, assinatura))
+    try:
+        async for evento in _acompanhar_voo(assinatura.voo):
+            if evento is None:
+                continue
+            tipo, dados = evento
+            if tipo == "falha":
+                raise _erro_http(dados)
+            if tipo == "fim":
+                return dados if assinatura.lider else dict(dados, coalescido=True)
+    finally:
+        vigia.cancel()
+        assinatura.sair()
+
+def _iniciar_job(request: DebateRequest, http_request: Request, retomar: Optional[Dict]):
+    """Enfileira o debate como job; um pedido igual (ou com a mesma Idempotency-Key) recebe o mesmo job"""
+    assinatura = _entrar_no_voo(request, http_request, retomar, "job")
+    voo = assinatura.voo
+    if not assinatura.lider:
+        # Jobs não dependem da conexão: a assinatura só serve para achar o voo
+        assinatura.sair()
+        job = get_job_manager().obter(voo.job_id) if voo.job_id else None
+        if job:
+            return JSONResponse(status_code=202, content={
+                "job_id": job.id,
+                "status": job.status,
+                "posicao_fila": job.posicao_fila,
+                "status_url": f"/api/debate/jobs/{job.id}",
+                "coalescido": True
+            })
+        # Job já expirou: o desfecho continua guardado pela Idempotency-Key
+        if voo.erro or not voo.resultado:
+            raise _erro_http(voo.erro or {"status_code": 409, "detail": "Debate repetido sem resultado disponível"})
+        return dict(voo.resultado, coalescido=True)
+    
+    def ao_finalizar(job):
+        erro = job.erro
+        if erro is None and job.resultado is None:
+            erro = {"status_code": 499, "detail": "Job cancelado antes de iniciar"}
+        coalescedor_debates.concluir(voo, resultado=job.resultado, erro=erro)
+    
+    # O líder só sai do voo com o job_id gravado: sem ele, o voo sem assinantes seria cancelado
+    try:
+        job = get_job_manager().submeter(
+            lambda job: _executar_debate(
+                request, ao_evento=job.registrar_evento, cancelamento=job.cancelamento, retomar=retomar
+            ),
+            cliente=_identificar_cliente(http_request),
+            ao_finalizar=ao_finalizar
+        )
+        voo.job_id = job.id
+    except FilaCheia as e:
+        erro = _erro_fila_cheia(e)
+        coalescedor_debates.concluir(voo, erro={"status_code": erro.status_code, "detail": erro.detail})
+        raise erro
+    finally:
+        assinatura.sair()
+    return JSONResponse(status_code=202, content={
+        "job_id": job.id,
+        "status": job.status,
+        "posicao_fila": job.posicao_fila,
+        "status_url": f"/api/debate/jobs/{job.id}",
+        "coalescido": False
+    })
+
+def _obter_job(job_id: str):
+    job = get_job_manager().obter(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado ou expirado")
+    return job
+
+@app.get("/api/debate/jobs/{job_id}")
+async def get_debate_job(job_id: str):
+    """Status do job: turnos concluídos, agente falando agora, tempo decorrido e resultado final"""
+    return _obter_job(job_id).para_dict()
+
+@app.get("/api/debate/jobs/{job_id}/historico")
+async def get_debate_job_historico(job_id: str, desde: int = 0):
+    """Transcrição parcial do job; use desde=<itens já recebidos> para buscar só os novos"""
+    job = _obter_job(job_id)
+    itens = job.historico_desde(max(0, desde))
+    return {"job_id": job.id, "status": job.status, "desde": desde, "historico": itens}
+
+@app.post("/api/debate/jobs/{job_id}/cancel")
+async def cancel_debate_job(job_id: str):
+    """Cancela o job (o turno em andamento termina; os seguintes e a síntese não rodam)"""
+    get_job_manager().cancelar(job_id)
+    return _obter_job(job_id).para_dict()
+
+def _evento_sse(tipo: str, dados) -> str:
+    return f"event: {tipo}\ndata: {json.dumps(dados, ensure_ascii=False, default=para_json)}\n\n"
+
+@app.post("/api/debate/start/stream")
+async def start_debate_stream(request: DebateRequest, http_request: Request):
+    """
+    Inicia um novo debate emitindo o progresso como Server-Sent Events.
+    
+    Eventos: preparando, fila (posição enquanto aguarda vaga), inicio,
+    pergunta, turno_inicio, token (quando o provedor faz stream), turno, erro,
+    sintese_inicio, sintese e, ao final, fim (com o mesmo payload de
+    /api/debate/start) ou falha (status_code e detail de um erro que abortou
+    o debate). Com a fila cheia, responde 429 com Retry-After antes do stream.
+    Um pedido idêntico a um debate em andamento (ou com a mesma
+    Idempotency-Key) recebe os eventos já emitidos e segue o mesmo stream.
+    """
+    if len(request.agentes) < 1:
+        raise HTTPException(
+            status_code=400,
+            detail="Selecione pelo menos 1 agente"
+        )
+    await _aplicar_limites_fila()
+    assinatura = _entrar_no_voo(request, http_request, None, "direto")
+    if assinatura.lider:
+        try:
+            _decolar(assinatura.voo, request, http_request)
+        except HTTPException:
+            assinatura.sair()
+            raise
+    
+    async def gerar_eventos():
+        # Primeiro byte imediato, antes de buscar agentes e criar LLMs
+        yield _evento_sse("preparando", {
+            "agentes": request.agentes,
+            "num_rodadas": request.num_rodadas,
+            "coalescido": not assinatura.lider
+        })
+        try:
+            # Eventos já emitidos (se o pedido assinou um debate em andamento) e os seguintes
+            async for evento in _acompanhar_voo(assinatura.voo):
+                yield ": keep-alive\n\n" if evento is None else _evento_sse(*evento)
+        finally:
+            # Cliente desconectou (o Starlette encerra o gerador) antes do fim: o último a sair cancela o debate
+            if not assinatura.voo.concluido.is_set():
+                logger.info("Cliente desconectou do stream", extra=campos(amostra=1.0, voo=assinatura.voo.id))
+            assinatura.sair()
+    
+    return StreamingResponse(
+        gerar_eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/api/debate/{debate_id}")
 async def get_debate(debate_id: str):
@@ -707,13 +1326,68 @@ async def get_debate(debate_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar debate: {str(e)}")
 
+def _debate_parado(debate: Dict, limite: float) -> bool:
+    """Debate 'running' sem atividade (mensagem ou atualização) há mais de `limite` segundos - instância caiu no meio"""
+    momentos = [debate.get("updated_at"), debate.get("created_at")] + [
+        mensagem.get("timestamp") for mensagem in debate.get("messages") or []
+    ]
+    ultimo = None
+    for momento in momentos:
+        if not momento:
+            continue
+        try:
+            data = datetime.fromisoformat(str(momento).replace("Z", "+00:00"))
+        except ValueError:
+            continue
+        if data.tzinfo is None:
+            data = data.replace(tzinfo=timezone.utc)
+        ultimo = data if ultimo is None or data > ultimo else ultimo
+    return ultimo is None or (datetime.now(timezone.utc) - ultimo).total_seconds() > limite
+
+@app.post("/api/debate/{debate_id}/resume")
+async def resume_debate(debate_id: str, http_request: Request, assincrono: bool = False):
+    """
+    Retoma um debate interrompido a partir do último turno gravado.
+    
+    Vale para debates failed ou cancelled e para running parados (sem
+    atividade há mais de 2x response_timeout: a instância que o executava
+    caiu). Os turnos já gravados não são gerados de novo; erros no fim da
+    transcrição são refeitos. Resposta igual à de /api/debate/start
+    (com ?assincrono=true, 202 com o job_id).
+    """
+    database = get_database()
+    if not database:
+        raise HTTPException(status_code=503, detail="Database não disponível.")
+    debate = await run_in_threadpool(database.get_debate, debate_id)
+    if not debate:
+        raise HTTPException(status_code=404, detail="Debate não encontrado")
+    status = debate.get("status") or "completed"
+    if status == "completed":
+        raise HTTPException(status_code=409, detail="Debate já concluído")
+    if status == "running":
+        debate_config = await run_in_threadpool(get_debate_config)
+        limite = 2 * float(debate_config.get("response_timeout") or 120)
+        if debate_id in _debates_em_execucao or not _debate_parado(debate, limite):
+            raise HTTPException(status_code=409, detail="Debate em andamento")
+    request = DebateRequest(
+        agentes=debate["selected_agents"],
+        pergunta=debate["pergunta"],
+        num_rodadas=debate["num_rodadas"],
+        contexto=debate.get("contexto"),
+        modo=debate.get("modo") or "debate",
+        salvar=True,
+        assincrono=assincrono,
+        sintese_continua=bool(debate.get("sintese_continua"))
+    )
+    return await _iniciar_debate(request, http_request, retomar=debate)
+
 @app.get("/api/debates")
-async def list_debates(limit: int = 50):
-    """Lista debates recentes"""
+async def list_debates(limit: int = 50, status: Optional[str] = None):
+    """Lista debates recentes (status=failed, por exemplo, para achar os que podem ser retomados)"""
     try:
         if not db:
             return {"debates": []}
-        debates = db.list_debates(limit)
+        debates = db.list_debates(limit, status=status)
         return {"debates": debates}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao listar debates: {str(e)}")
@@ -0,0 +1,537 @@
+"""
+Benchmark do fluxo de debate sem chamadas reais aos LLMs
+
+As chamadas aos agentes são substituídas por uma latência simulada, então o
+tempo medido é o overhead do próprio DebateCrew somado à "latência do LLM".
+Compara o fluxo atual com o fluxo antigo (pausa fixa de 1s após cada turno).
+
+Com --framework, os agentes são Agents reais do CrewAI com um LLM falso, e o
+benchmark mede o overhead do framework por turno: uma Crew nova a cada turno
+(fluxo antigo) contra a chamada direta ao LLM. --perfil imprime o cProfile.
+
+Com --logs, mede o overhead de log/console por turno no perfil de
+desenvolvimento (agentes verbose, logs DEBUG em texto) contra o perfil de
+produção (sem verbose, logs INFO em JSON amostrados); a saída vai para /dev/null.
+
+Com --carga, dispara uma rajada de debates (um cliente "pesado" com a maior
+parte dos pedidos, enviados primeiro, e clientes leves depois) contra um LLM
+falso que fica mais lento acima da sua capacidade, sem limite e com o
+agendador de debates (admissão, fila justa por cliente e 429 com a fila cheia).
+
+Com --turnos, compara memória (tracemalloc) e CPU do histórico de um debate
+de N turnos como dicts (formato antigo, copiado para a resposta da API) e
+como Turnos (a resposta referencia os mesmos objetos): montagem, resposta,
+texto formatado, linhas de messages e eventos SSE.
+
+Execute: python benchmark_debate.py [--agentes 3] [--rodadas 3] [--latencia 0.5] [--framework [--perfil]] [--logs]
+                                    [--carga [--pedidos 40] [--clientes 4] [--simultaneos 4] [--fila 20]]
+                                    [--turnos [--num-turnos 100]]
+"""
+import argparse
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import statistics
+import threading
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+from crewai import Agent, Crew, Process, Task
+from crewai.llms.base_llm import BaseLLM
+
+from database import Database
+from debate_crew import DebateCrew
+from debate_scheduler import AgendadorDebates, FilaCheia
+from debate_turno import TipoTurno, Turno, formatar_historico, para_json
+from log_utils import PERFIL_DESENVOLVIMENTO, PERFIL_PRODUCAO, configurar_logging
+
+# Pausa que o fluxo antigo fazia após cada resposta
+PAUSA_LEGADA = 1.0
+
+
+class DebateCrewSimulado(DebateCrew):
+    """DebateCrew com o LLM trocado por uma espera de latência aleatória (jitter de ±20%)"""
+
+    def __init__(self, *args, latencia: float = 0.5, semente: int = 42, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencia = latencia
+        self._aleatorio = random.Random(semente)
+        self.tempo_llm = 0.0  # Soma das latências (no modo painel as chamadas se sobrepõem)
+        self._lock_tempo = threading.Lock()
+
+    def _chamar_agente(self, idx: int, agente: Any, montador: Any, abortar: Any = None) -> Tuple[str, Optional[Dict[str, int]]]:
+        espera = self.latencia * self._aleatorio.uniform(0.8, 1.2)
+        time.sleep(espera)
+        with self._lock_tempo:
+            self.tempo_llm += espera
+        return f"{agente.role} responde ao turno. " + "argumento " * 120, None
+
+
+class DebateCrewPausaLegada(DebateCrewSimulado):
+    """Emula o fluxo anterior, que dormia PAUSA_LEGADA segundos após cada turno"""
+
+    def _registrar_turno(self, historico: List[Dict], turno: Dict[str, Any]) -> None:
+        super()._registrar_turno(historico, turno)
+        time.sleep(PAUSA_LEGADA)
+
+
+class LLMFalso(BaseLLM):
+    """LLM do CrewAI que só espera a latência simulada - mede o framework sem rede"""
+
+    def __init__(self, latencia: float = 0.0, **kwargs):
+        super().__init__(model="llm-falso", **kwargs)
+        self.latencia = latencia
+        self.tempo_llm = 0.0
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs) -> str:
+        time.sleep(self.latencia)
+        self.tempo_llm += self.latencia
+        return "Final Answer: resposta simulada do agente. " + "argumento " * 120
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 8192
+
+
+class DebateCrewCrewPorTurno(DebateCrew):
+    """Fluxo antigo: uma Crew nova (verbose) por turno em vez da chamada direta ao LLM"""
+
+    def _chamar_agente(self, idx: int, agente: Any, montador: Any, abortar: Any = None) -> Tuple[str, Optional[Dict[str, int]]]:
+        task = Task(
+            description=montador.texto(),
+            agent=agente,
+            expected_output="Uma resposta clara e autêntica sobre a questão do debate"
+        )
+        crew = Crew(agents=[agente], tasks=[task], process=Process.sequential, verbose=True, memory=False)
+        resultado = crew.kickoff()
+        return str(resultado.raw) if hasattr(resultado, "raw") else str(resultado), None
+
+
+class DebateCrewComTarefa(DebateCrew):
+    """Turnos pelo caminho de agentes com ferramentas (Task.execute_sync), onde o verbose do CrewAI renderiza no console"""
+
+    def _chamar_agente(self, idx: int, agente: Any, montador: Any, abortar: Any = None) -> Tuple[str, Optional[Dict[str, int]]]:
+        task = Task(
+            description=montador.texto(),
+            agent=agente,
+            expected_output="Uma resposta clara e autêntica sobre a questão do debate"
+        )
+        saida = task.execute_sync(agent=agente)
+        return str(saida.raw) if hasattr(saida, "raw") else str(saida), None
+
+
+class BackendFalso:
+    """LLM falso compartilhado: acima de `capacidade` chamadas simultâneas a latência cresce na mesma proporção"""
+
+    def __init__(self, latencia: float, capacidade: int):
+        self.latencia = latencia
+        self.capacidade = max(1, capacidade)
+        self.ativas = 0
+        self.pico = 0
+        self._lock = threading.Lock()
+
+    def chamar(self) -> None:
+        with self._lock:
+            self.ativas += 1
+            self.pico = max(self.pico, self.ativas)
+            saturacao = max(1.0, self.ativas / self.capacidade)
+        try:
+            time.sleep(self.latencia * saturacao)
+        finally:
+            with self._lock:
+                self.ativas -= 1
+
+
+class DebateCrewBackendFalso(DebateCrew):
+    """DebateCrew cujos agentes chamam o BackendFalso compartilhado"""
+
+    def __init__(self, *args, backend: BackendFalso, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.backend = backend
+
+    def _chamar_agente(self, idx: int, agente: Any, montador: Any, abortar: Any = None) -> Tuple[str, Optional[Dict[str, int]]]:
+        self.backend.chamar()
+        return f"{agente.role} responde ao turno. " + "argumento " * 120, None
+
+
+def criar_agentes(quantidade: int) -> List[SimpleNamespace]:
+    """Agentes mínimos (role/goal/backstory/llm) - o LLM nunca é chamado"""
+    return [
+        SimpleNamespace(
+            role=f"Especialista {i + 1}",
+            goal="Defender seu ponto de vista",
+            backstory="Participante simulado do benchmark.",
+            llm=None,
+            tools=[]
+        )
+        for i in range(quantidade)
+    ]
+
+
+def executar_cenario(nome: str, classe: type, args: argparse.Namespace, modo: str = "debate") -> Dict[str, Any]:
+    debate = classe(
+        agentes_crewai=criar_agentes(args.agentes),
+        pergunta="Qual será o impacto da IA no mercado de trabalho?",
+        modo=modo,
+        latencia=args.latencia
+    )
+    inicio = time.perf_counter()
+    debate.executar_debate(num_rodadas=args.rodadas)
+    total = time.perf_counter() - inicio
+    return {
+        "cenario": nome,
+        "total": total,
+        "llm": debate.tempo_llm,
+        # Negativo no modo painel: as latências sobrepostas somam mais que o tempo real
+        "overhead": total - debate.tempo_llm,
+        "turnos": len(debate.metadados["turnos"]),
+    }
+
+
+def imprimir_resultados(resultados: List[Dict[str, Any]]) -> None:
+    base = resultados[0]["total"]
+    print(f"\n{'cenário':<22}{'total (s)':>11}{'LLM somado (s)':>16}{'overhead (s)':>14}{'vs. 1º':>9}")
+    for r in resultados:
+        print(
+            f"{r['cenario']:<22}{r['total']:>11.2f}{r['llm']:>16.2f}"
+            f"{r['overhead']:>14.2f}{base / r['total']:>8.2f}x"
+        )
+
+
+def executar_framework(args: argparse.Namespace) -> None:
+    """Overhead do CrewAI por turno: Crew por turno x chamada direta, com o mesmo LLM falso"""
+    resultados = []
+    for nome, classe in (("Crew por turno", DebateCrewCrewPorTurno), ("chamada direta", DebateCrew)):
+        llms = [LLMFalso(latencia=args.latencia) for _ in range(args.agentes)]
+        agentes = [
+            Agent(
+                role=f"Especialista {i + 1}",
+                goal="Defender seu ponto de vista",
+                backstory="Participante simulado do benchmark.",
+                llm=llm,
+                verbose=False,
+                allow_delegation=False
+            )
+            for i, llm in enumerate(llms)
+        ]
+        debate = classe(agentes_crewai=agentes, pergunta="Qual será o impacto da IA no mercado de trabalho?")
+        perfil = cProfile.Profile() if args.perfil else None
+        inicio = time.perf_counter()
+        if perfil:
+            perfil.enable()
+        debate.executar_debate(num_rodadas=args.rodadas)
+        if perfil:
+            perfil.disable()
+        total = time.perf_counter() - inicio
+        tempo_llm = sum(llm.tempo_llm for llm in llms)
+        turnos = max(len(debate.metadados["turnos"]), 1)
+        resultados.append((nome, total, (total - tempo_llm) / turnos))
+        if perfil:
+            saida = io.StringIO()
+            pstats.Stats(perfil, stream=saida).sort_stats("cumulative").print_stats(15)
+            print(f"\n[BENCHMARK] Perfil - {nome}\n{saida.getvalue()}")
+
+    print(f"\n{'fluxo':<18}{'total (s)':>11}{'overhead/turno (ms)':>22}")
+    for nome, total, overhead in resultados:
+        print(f"{nome:<18}{total:>11.2f}{overhead * 1000:>22.1f}")
+
+
+def executar_logs(args: argparse.Namespace, repeticoes: int = 5) -> None:
+    """Overhead por turno com e sem verbose: perfil de desenvolvimento x produção, mesmo LLM falso sem latência"""
+    resultados = []
+    with open(os.devnull, "w") as destino:
+        for perfil, verbose in ((PERFIL_DESENVOLVIMENTO, True), (PERFIL_PRODUCAO, False)):
+            configurar_logging(perfil, stream=destino, forcar=True)
+            tempos = []
+            for _ in range(repeticoes):
+                agentes = [
+                    Agent(
+                        role=f"Especialista {i + 1}",
+                        goal="Defender seu ponto de vista",
+                        backstory="Participante simulado do benchmark.",
+                        llm=LLMFalso(),
+                        verbose=verbose,
+                        allow_delegation=False
+                    )
+                    for i in range(args.agentes)
+                ]
+                debate = DebateCrewComTarefa(agentes_crewai=agentes, pergunta="Qual será o impacto da IA no mercado de trabalho?")
+                inicio = time.perf_counter()
+                # Painéis do CrewAI vão para o stdout; os logs, para o handler configurado acima
+                with redirect_stdout(destino):
+                    debate.executar_debate(num_rodadas=args.rodadas)
+                tempos.append((time.perf_counter() - inicio) / max(len(debate.metadados["turnos"]), 1))
+            resultados.append((f"{perfil} (verbose={verbose})", statistics.median(tempos)))
+    configurar_logging(forcar=True)
+
+    base = resultados[0][1]
+    print(f"\n{'perfil':<34}{'overhead/turno (ms)':>22}{'vs. 1º':>9}")
+    for nome, tempo in resultados:
+        print(f"{nome:<34}{tempo * 1000:>22.2f}{base / tempo:>8.2f}x")
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(p * len(valores)))] if valores else 0.0
+
+
+def executar_carga(args: argparse.Namespace) -> None:
+    """Rajada de debates de vários clientes, sem limite x com o agendador de debates, contra o BackendFalso"""
+    # Cliente pesado com 60% dos pedidos, enviados antes dos clientes leves (pior caso para uma fila FIFO)
+    pesados = int(args.pedidos * 0.6)
+    leves = max(1, args.clientes - 1)
+    clientes = ["pesado"] * pesados + [f"leve-{i % leves + 1}" for i in range(args.pedidos - pesados)]
+
+    resultados = []
+    with open(os.devnull, "w") as destino:
+        configurar_logging(PERFIL_PRODUCAO, stream=destino, forcar=True)
+        for nome, agendador in (
+            ("sem limite", None),
+            ("agendador", AgendadorDebates(args.simultaneos, args.fila)),
+        ):
+            backend = BackendFalso(args.latencia, capacidade=args.simultaneos)
+            medicoes: List[Tuple[str, float, float]] = []  # (cliente, espera na fila, tempo total)
+            recusados = []
+            lock = threading.Lock()
+
+            def pedido(cliente: str) -> None:
+                inicio = time.perf_counter()
+                vaga = None
+                if agendador:
+                    try:
+                        vaga = agendador.reservar(cliente)
+                    except FilaCheia as e:
+                        with lock:
+                            recusados.append(e.retry_after)
+                        return
+                    agendador.aguardar(vaga)
+                espera = time.perf_counter() - inicio
+                try:
+                    debate = DebateCrewBackendFalso(
+                        agentes_crewai=criar_agentes(args.agentes),
+                        pergunta="Qual será o impacto da IA no mercado de trabalho?",
+                        backend=backend
+                    )
+                    debate.executar_debate(num_rodadas=args.rodadas)
+                finally:
+                    if vaga:
+                        agendador.encerrar(vaga)
+                with lock:
+                    medicoes.append((cliente, espera, time.perf_counter() - inicio))
+
+            inicio = time.perf_counter()
+            threads = [threading.Thread(target=pedido, args=(cliente,)) for cliente in clientes]
+            # redirect_stdout troca o sys.stdout do processo: uma vez para todas as threads
+            with redirect_stdout(destino):
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            total = time.perf_counter() - inicio
+            tempos = [t for _, _, t in medicoes]
+            resultados.append({
+                "cenario": nome,
+                "total": total,
+                "concluidos": len(medicoes),
+                "recusados": len(recusados),
+                "retry_after": statistics.median(recusados) if recusados else None,
+                "p50": _percentil(tempos, 0.5),
+                "p95": _percentil(tempos, 0.95),
+                "pico": backend.pico,
+                "espera_pesado": statistics.mean([e for c, e, _ in medicoes if c == "pesado"] or [0.0]),
+                "espera_leves": statistics.mean([e for c, e, _ in medicoes if c != "pesado"] or [0.0]),
+            })
+    configurar_logging(forcar=True)
+
+    print(
+        f"\n{'cenário':<14}{'concluídos':>11}{'429':>6}{'Retry-After':>13}{'p50 (s)':>9}{'p95 (s)':>9}"
+        f"{'chamadas simult.':>18}{'fila pesado (s)':>17}{'fila leves (s)':>16}{'total (s)':>11}"
+    )
+    for r in resultados:
+        retry = f"{r['retry_after']:.0f}s" if r["retry_after"] is not None else "-"
+        print(
+            f"{r['cenario']:<14}{r['concluidos']:>11}{r['recusados']:>6}{retry:>13}{r['p50']:>9.2f}{r['p95']:>9.2f}"
+            f"{r['pico']:>18}{r['espera_pesado']:>17.2f}{r['espera_leves']:>16.2f}{r['total']:>11.2f}"
+        )
+
+
+def _historico_dicts(falas: List[Tuple[str, str, int, str]], pergunta: str) -> List[Dict[str, Any]]:
+    historico = [{"tipo": "pergunta", "conteudo": pergunta, "agente": "Moderador", "timestamp": falas[0][3]}]
+    for agente, conteudo, rodada, timestamp in falas:
+        historico.append({
+            "tipo": "resposta", "conteudo": conteudo, "agente": agente,
+            "agente_role": agente, "rodada": rodada, "timestamp": timestamp
+        })
+    historico.append({"tipo": "sintese_conteudo", "conteudo": pergunta, "agente": "Facilitador", "timestamp": falas[-1][3]})
+    return historico
+
+
+def _resposta_dicts(historico: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fluxo antigo: cópia de cada resposta para o JSON da API"""
+    return [
+        {
+            "tipo": item["tipo"], "conteudo": item["conteudo"], "agente": item.get("agente"),
+            "agente_role": item.get("agente_role"), "rodada": item.get("rodada"), "timestamp": item.get("timestamp")
+        }
+        for item in historico if item["tipo"] == "resposta"
+    ]
+
+
+def _texto_dicts(historico: List[Dict[str, Any]]) -> str:
+    formato = []
+    for item in historico:
+        if item["tipo"] in ["sintese", "sintese_conteudo"]:
+            continue
+        if item["tipo"] == "pergunta":
+            formato.append(f"**🤔 PERGUNTA:** {item['conteudo']}\n")
+        elif item["tipo"] == "resposta":
+            formato.append(f"**{item['agente']}:**\n{item['conteudo']}\n")
+        elif item["tipo"] == "erro":
+            formato.append(f"⚠️ {item['conteudo']}\n")
+    return "\n".join(formato)
+
+
+def _linha_dict(debate_id: str, item: Dict[str, Any], order_index: int) -> Dict[str, Any]:
+    """Linha de messages montada do dict, como o Database fazia antes do Turno"""
+    content = str(item["conteudo"])
+    if len(content) > 10000:
+        content = content[:10000] + "... [truncado]"
+    message = {
+        "debate_id": debate_id, "type": item["tipo"], "content": content,
+        "agent_id": item.get("agente"), "agent_name": item.get("agente"),
+        "agent_role": item.get("agente_role") or item.get("agente"), "round_number": item.get("rodada"),
+        "order_index": order_index, "timestamp": item.get("timestamp"),
+    }
+    return {k: v for k, v in message.items() if v is not None}
+
+
+def _historico_turnos(falas: List[Tuple[str, str, int, str]], pergunta: str) -> List[Turno]:
+    historico = [Turno(TipoTurno.PERGUNTA, pergunta, agente="Moderador", timestamp=falas[0][3])]
+    for agente, conteudo, rodada, timestamp in falas:
+        historico.append(Turno(TipoTurno.RESPOSTA, conteudo, agente=agente, agente_role=agente, rodada=rodada, timestamp=timestamp))
+    historico.append(Turno(TipoTurno.SINTESE_CONTEUDO, pergunta, agente="Facilitador", timestamp=falas[-1][3]))
+    return historico
+
+
+def _resposta_turnos(historico: List[Turno]) -> List[Turno]:
+    """Fluxo atual: a resposta referencia os próprios Turnos"""
+    return [item for item in historico if item.tipo is TipoTurno.RESPOSTA]
+
+
+def _medir_memoria(funcao, *args) -> Tuple[Any, int]:
+    """Resultado da função e os bytes que ele retém (tracemalloc)"""
+    tracemalloc.start()
+    resultado = funcao(*args)
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, memoria
+
+
+def executar_turnos(args: argparse.Namespace, repeticoes: int = 200) -> None:
+    """
+    Histórico de num_turnos como dicts x Turnos: memória retida pelo histórico
+    e pela resposta da API, e CPU de um debate inteiro (montagem, resposta,
+    texto formatado, linhas de messages e eventos SSE)
+    """
+    pergunta = "Qual será o impacto da IA no mercado de trabalho?"
+    # Textos criados antes da medição: os dois formatos apontam para as mesmas strings
+    falas = [
+        (f"Especialista {i % args.agentes + 1}", f"Resposta do turno {i}. " + "argumento " * 120,
+         i // args.agentes + 1, f"2025-01-01T00:00:{i % 60:02d}+00:00")
+        for i in range(args.num_turnos)
+    ]
+    cenarios = (
+        ("dicts", _historico_dicts, _resposta_dicts, _texto_dicts, _linha_dict, str),
+        ("Turno (__slots__)", _historico_turnos, _resposta_turnos,
+         lambda historico: "\n".join(formatar_historico(historico)), Database._message_row, para_json),
+    )
+
+    resultados = []
+    for nome, montar, resposta, texto, linha, serializar in cenarios:
+        historico, memoria_historico = _medir_memoria(montar, falas, pergunta)
+        _, memoria_resposta = _medir_memoria(resposta, historico)
+        del historico
+
+        inicio = time.process_time()
+        for _ in range(repeticoes):
+            historico = montar(falas, pergunta)
+            resposta(historico)
+            texto(historico)
+            for indice, item in enumerate(historico):
+                linha("debate", item, indice)
+                json.dumps(item, ensure_ascii=False, default=serializar)
+        cpu = (time.process_time() - inicio) / repeticoes
+        resultados.append((nome, memoria_historico, memoria_resposta, cpu))
+
+    _, base_historico, base_resposta, base_cpu = resultados[0]
+    print(
+        f"\n{'formato':<20}{'histórico (KB)':>16}{'resposta API (KB)':>19}{'vs. dicts':>11}"
+        f"{'CPU/debate (ms)':>17}{'vs. dicts':>11}"
+    )
+    for nome, memoria_historico, memoria_resposta, cpu in resultados:
+        relacao = (memoria_historico + memoria_resposta) / (base_historico + base_resposta)
+        print(
+            f"{nome:<20}{memoria_historico / 1024:>16.1f}{memoria_resposta / 1024:>19.1f}{relacao:>10.2f}x"
+            f"{cpu * 1000:>17.2f}{cpu / base_cpu:>10.2f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do DebateCrew com LLM simulado")
+    parser.add_argument("--agentes", type=int, default=3)
+    parser.add_argument("--rodadas", type=int, default=3)
+    parser.add_argument("--latencia", type=float, default=0.5, help="Latência média simulada por chamada (s)")
+    parser.add_argument("--framework", action="store_true", help="Medir o overhead do CrewAI por turno")
+    parser.add_argument("--perfil", action="store_true", help="Com --framework, imprimir o cProfile de cada fluxo")
+    parser.add_argument("--logs", action="store_true", help="Medir o overhead de log com e sem verbose (desenvolvimento x produção)")
+    parser.add_argument("--carga", action="store_true", help="Teste de carga: rajada de debates sem limite x com o agendador de debates")
+    parser.add_argument("--pedidos", type=int, default=40, help="Com --carga, debates disparados na rajada")
+    parser.add_argument("--clientes", type=int, default=4, help="Com --carga, clientes (1 pesado + leves)")
+    parser.add_argument("--simultaneos", type=int, default=4, help="Com --carga, max_concurrent_debates e capacidade do LLM falso")
+    parser.add_argument("--fila", type=int, default=20, help="Com --carga, max_queue_size")
+    parser.add_argument("--turnos", action="store_true", help="Memória e CPU do histórico: dicts x Turnos")
+    parser.add_argument("--num-turnos", type=int, default=100, help="Com --turnos, turnos do debate")
+    args = parser.parse_args()
+
+    if args.turnos:
+        print(f"[BENCHMARK] Histórico de {args.num_turnos} turnos, {args.agentes} agentes")
+        executar_turnos(args)
+        return
+
+    if args.carga:
+        print(
+            f"[BENCHMARK] Carga: {args.pedidos} debates de {args.clientes} clientes, {args.agentes} agentes, "
+            f"{args.rodadas} rodadas, até {args.simultaneos} simultâneos e fila de {args.fila}"
+        )
+        executar_carga(args)
+        return
+
+    if args.logs:
+        print(f"[BENCHMARK] Overhead de log por turno: {args.agentes} agentes, {args.rodadas} rodadas")
+        executar_logs(args)
+        return
+
+    if args.framework:
+        print(f"[BENCHMARK] Overhead do framework: {args.agentes} agentes, {args.rodadas} rodadas")
+        executar_framework(args)
+        return
+
+    print(f"[BENCHMARK] {args.agentes} agentes, {args.rodadas} rodadas, latência simulada {args.latencia}s")
+    resultados = [
+        executar_cenario("pausa fixa de 1s", DebateCrewPausaLegada, args),
+        executar_cenario("sem pausa", DebateCrewSimulado, args),
+        executar_cenario("painel (1ª rodada)", DebateCrewSimulado, args, modo="painel"),
+    ]
+    imprimir_resultados(resultados)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Cache semântico de debates (opcional, em memória por processo)
+
+Debates concluídos ficam guardados pela chave exata do painel: ids dos
+agentes com o updated_at de cada um (editar um agente invalida o que ele
+disse), modo, número de rodadas e hash do contexto do usuário. Dentro da
+mesma chave, uma pergunta nova reaproveita o debate cuja pergunta tem
+similaridade de embedding >= limiar. As entradas expiram pelo TTL e, acima
+de max_entradas, a usada há mais tempo sai (LRU).
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from copy import deepcopy
+from typing import Any, Dict, List, Optional
+
+from convergencia import similaridade_cosseno
+from log_utils import campos, obter_logger
+
+logger = obter_logger("cache")
+
+LIMIAR_PADRAO = 0.95
+TTL_PADRAO = 86400
+MAX_ENTRADAS_PADRAO = 200
+
+
+def _hash(valor: Any) -> str:
+    return hashlib.sha256(json.dumps(valor, ensure_ascii=False, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def chave_painel(
+    agentes: List[Dict[str, Any]],
+    modo: str,
+    num_rodadas: int,
+    contexto: Optional[List[str]],
+    sintese_continua: bool = False
+) -> str:
+    """Chave exata do cache: agentes (id + updated_at, ordenados), modo, rodadas, hash do contexto e síntese"""
+    return _hash({
+        "agentes": sorted([str(agente.get("id")), str(agente.get("updated_at") or "")] for agente in agentes),
+        "modo": modo,
+        "rodadas": num_rodadas,
+        "contexto": _hash(contexto or []),
+        "sintese_continua": sintese_continua,
+    })
+
+
+class CacheDebates:
+    """Entradas (pergunta, embedding, resultado) por chave de painel, com TTL e despejo LRU"""
+
+    def __init__(self, limiar: float = LIMIAR_PADRAO, ttl: float = TTL_PADRAO, max_entradas: int = MAX_ENTRADAS_PADRAO):
+        self.limiar = limiar
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # id -> entrada, da menos à mais recente
+        self._por_chave: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        self._metricas = {"acertos": 0, "falhas": 0, "expiradas": 0, "despejadas": 0}
+
+    def configurar(self, limiar: Optional[float] = None, ttl: Optional[float] = None, max_entradas: Optional[int] = None) -> None:
+        """Aplica os parâmetros do debate_config (o tamanho novo vale já, despejando o excedente)"""
+        with self._lock:
+            if limiar is not None:
+                self.limiar = float(limiar)
+            if ttl is not None:
+                self.ttl = float(ttl)
+            if max_entradas is not None:
+                self.max_entradas = max(0, int(max_entradas))
+            self._despejar()
+
+    def _remover(self, entrada_id: str) -> None:
+        # Chamado com self._lock
+        entrada = self._entradas.pop(entrada_id)
+        ids = self._por_chave.get(entrada["chave"])
+        if ids is not None:
+            ids.discard(entrada_id)
+            if not ids:
+                del self._por_chave[entrada["chave"]]
+
+    def _despejar(self) -> None:
+        # Chamado com self._lock
+        while len(self._entradas) > self.max_entradas:
+            self._remover(next(iter(self._entradas)))
+            self._metricas["despejadas"] += 1
+
+    def buscar(self, chave: str, vetor: List[float]) -> Optional[Dict[str, Any]]:
+        """Entrada mais parecida da chave (cópia, com similaridade e idade) ou None"""
+        agora = time.time()
+        with self._lock:
+            melhor, melhor_similaridade = None, self.limiar
+            for entrada_id in list(self._por_chave.get(chave, ())):
+                entrada = self._entradas[entrada_id]
+                if agora - entrada["criada_em"] > self.ttl:
+                    self._remover(entrada_id)
+                    self._metricas["expiradas"] += 1
+                    continue
+                similaridade = similaridade_cosseno(vetor, entrada["vetor"])
+                if similaridade >= melhor_similaridade:
+                    melhor, melhor_similaridade = entrada, similaridade
+            if melhor is None:
+                self._metricas["falhas"] += 1
+                return None
+            self._metricas["acertos"] += 1
+            self._entradas.move_to_end(melhor["id"])
+            resultado = deepcopy(melhor["dados"])
+        logger.info(
+            "Debate servido do cache (similaridade %.3f)", melhor_similaridade,
+            extra=campos(amostra=1.0, similaridade=round(melhor_similaridade, 4))
+        )
+        return {
+            "dados": resultado,
+            "pergunta": melhor["pergunta"],
+            "similaridade": round(melhor_similaridade, 4),
+            "idade": round(agora - melhor["criada_em"], 1),
+        }
+
+    def guardar(self, chave: str, pergunta: str, vetor: List[float], dados: Dict[str, Any]) -> None:
+        if self.max_entradas <= 0:
+            return
+        entrada = {
+            "id": str(uuid.uuid4()),
+            "chave": chave,
+            "pergunta": pergunta,
+            "vetor": list(vetor),
+            "dados": deepcopy(dados),
+            "criada_em": time.time(),
+        }
+        with self._lock:
+            self._entradas[entrada["id"]] = entrada
+            self._por_chave.setdefault(chave, set()).add(entrada["id"])
+            self._despejar()
+
+    def limpar(self) -> int:
+        with self._lock:
+            total = len(self._entradas)
+            self._entradas.clear()
+            self._por_chave.clear()
+            return total
+
+    def resumo(self) -> Dict[str, Any]:
+        with self._lock:
+            consultas = self._metricas["acertos"] + self._metricas["falhas"]
+            return {
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "limiar": self.limiar,
+                "ttl": self.ttl,
+                **self._metricas,
+                "taxa_acerto": round(self._metricas["acertos"] / consultas, 3) if consultas else None,
+            }
+
+
+# Instância do processo
+cache_debates = CacheDebates()
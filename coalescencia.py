@@ -0,0 +1,213 @@
+"""
+Coalescência de pedidos de debate idênticos (single-flight) e Idempotency-Key
+
+Duplo clique e retries do frontend mandam o mesmo /api/debate/start em
+segundos. Pedidos com a mesma chave canônica (agentes, pergunta, rodadas, modo,
+contexto, gravação) enquanto um debate igual está em andamento não iniciam outro: entram
+como assinantes da execução em curso (um "voo") e recebem os mesmos eventos e o
+mesmo resultado. O debate só é cancelado quando todos os assinantes saem.
+
+Com o header Idempotency-Key, o voo continua disponível depois de concluído
+(até TTL_IDEMPOTENCIA): repetir o pedido com a mesma chave devolve o resultado
+já obtido em vez de executar de novo. Falhas e cancelamentos não ficam
+guardados, para que o retry execute o debate.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from log_utils import campos, obter_logger
+
+logger = obter_logger("coalescencia")
+
+# Tempo (segundos) que um resultado fica associado à sua Idempotency-Key
+TTL_IDEMPOTENCIA = int(os.getenv("DEBATE_IDEMPOTENCY_TTL", "86400"))
+MAX_IDEMPOTENCIA = 1000
+# Eventos que não entram no registro reenviado a quem chega depois (só interessam ao vivo)
+EVENTOS_SO_AO_VIVO = {"token"}
+
+
+class ChaveIdempotenciaConflitante(Exception):
+    """A Idempotency-Key já foi usada com um pedido diferente"""
+
+
+def chave_pedido(
+    agentes: List[str],
+    pergunta: str,
+    num_rodadas: int,
+    modo: Optional[str],
+    contexto: Optional[List[str]],
+    sintese_continua: bool = False,
+    salvar: bool = True
+) -> str:
+    """
+    Hash canônico do pedido (espaços da pergunta normalizados; a ordem dos agentes conta)
+    
+    salvar entra na chave: quem pediu a gravação não pode assinar um voo que
+    não grava (ficaria sem debate_id), nem o contrário.
+    """
+    canonico = {
+        "agentes": [str(agente) for agente in agentes],
+        "pergunta": re.sub(r"\s+", " ", pergunta or "").strip(),
+        "num_rodadas": num_rodadas,
+        "modo": modo or "debate",
+        "contexto": [str(item) for item in contexto or []],
+        "sintese_continua": sintese_continua,
+        "salvar": salvar,
+    }
+    return hashlib.sha256(json.dumps(canonico, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+
+
+class Voo:
+    """Uma execução de debate compartilhada pelos pedidos idênticos"""
+
+    def __init__(self, chave: Optional[str]):
+        self.id = str(uuid.uuid4())
+        self.chave = chave
+        self.criado_em = time.time()
+        self.finalizado_em: Optional[float] = None
+        self.resultado: Optional[Dict[str, Any]] = None
+        self.erro: Optional[Dict[str, Any]] = None  # {"status_code", "detail"}
+        self.job_id: Optional[str] = None  # Voo de um job: os assinantes recebem o job_id
+        self.cancelamento = threading.Event()
+        self.concluido = threading.Event()
+        self.assinantes = 0
+        self._eventos: List[Tuple[str, Any]] = []
+        self._ouvintes: List[Callable[[str, Any], None]] = []
+        self._lock = threading.Lock()
+
+    def publicar(self, tipo: str, dados: Any) -> None:
+        """Callback ao_evento do DebateCrew: registra e repassa a cada assinante"""
+        with self._lock:
+            if tipo not in EVENTOS_SO_AO_VIVO:
+                self._eventos.append((tipo, dados))
+            ouvintes = list(self._ouvintes)
+        for ouvinte in ouvintes:
+            try:
+                ouvinte(tipo, dados)
+            except Exception as e:
+                logger.warning("Erro ao repassar evento '%s': %s", tipo, e)
+
+    def ouvir(self, ouvinte: Callable[[str, Any], None]) -> List[Tuple[str, Any]]:
+        """Registra o ouvinte e retorna os eventos já publicados (sem lacuna nem repetição entre os dois)"""
+        with self._lock:
+            self._ouvintes.append(ouvinte)
+            return list(self._eventos)
+
+    def parar_de_ouvir(self, ouvinte: Callable[[str, Any], None]) -> None:
+        with self._lock:
+            if ouvinte in self._ouvintes:
+                self._ouvintes.remove(ouvinte)
+
+
+class Assinatura:
+    """Participação de um pedido num voo; sair() é idempotente"""
+
+    def __init__(self, coalescedor: "CoalescedorDebates", voo: Voo, lider: bool):
+        self.coalescedor = coalescedor
+        self.voo = voo
+        self.lider = lider  # True: este pedido inicia a execução
+        self._saiu = False
+
+    def sair(self) -> None:
+        if not self._saiu:
+            self._saiu = True
+            self.coalescedor._sair(self.voo)
+
+
+class CoalescedorDebates:
+    """Voos em andamento por chave e concluídos por Idempotency-Key (uma instância por processo)"""
+
+    def __init__(self, ttl_idempotencia: int = TTL_IDEMPOTENCIA, max_idempotencia: int = MAX_IDEMPOTENCIA):
+        self.ttl_idempotencia = ttl_idempotencia
+        self.max_idempotencia = max_idempotencia
+        self._em_andamento: Dict[str, Voo] = {}
+        self._por_idempotencia: "OrderedDict[str, Voo]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._metricas = {"execucoes": 0, "coalescidos": 0, "idempotentes": 0}
+
+    def entrar(self, chave: Optional[str], chave_idempotencia: Optional[str] = None) -> Assinatura:
+        """
+        Assina o voo da chave (ou da Idempotency-Key) ou cria um novo, do qual
+        o pedido é o líder. chave None cria sempre um voo próprio (ex.: retomada).
+        Lança ChaveIdempotenciaConflitante se a Idempotency-Key veio com outro pedido.
+        """
+        with self._lock:
+            self._limpar_idempotencia()
+            voo = self._por_idempotencia.get(chave_idempotencia) if chave_idempotencia else None
+            if voo is not None:
+                if voo.chave != chave:
+                    raise ChaveIdempotenciaConflitante("Idempotency-Key já usada com outro pedido de debate")
+                metrica = "idempotentes" if voo.concluido.is_set() else "coalescidos"
+            else:
+                voo = self._em_andamento.get(chave) if chave else None
+                metrica = "coalescidos"
+            lider = voo is None
+            if lider:
+                voo = Voo(chave)
+                if chave:
+                    self._em_andamento[chave] = voo
+                metrica = "execucoes"
+            if chave_idempotencia:
+                self._por_idempotencia[chave_idempotencia] = voo
+                self._por_idempotencia.move_to_end(chave_idempotencia)
+                while len(self._por_idempotencia) > self.max_idempotencia:
+                    self._por_idempotencia.popitem(last=False)
+            voo.assinantes += 1
+            self._metricas[metrica] += 1
+        if not lider:
+            logger.info(
+                "Pedido de debate repetido: assinando a execução existente",
+                extra=campos(amostra=1.0, voo=voo.id, concluido=voo.concluido.is_set(), assinantes=voo.assinantes)
+            )
+        return Assinatura(self, voo, lider)
+
+    def _sair(self, voo: Voo) -> None:
+        with self._lock:
+            voo.assinantes -= 1
+            abandonado = voo.assinantes <= 0 and not voo.concluido.is_set() and voo.job_id is None
+        if abandonado:
+            # Ninguém mais espera este debate (jobs seguem sem conexão aberta)
+            voo.cancelamento.set()
+
+    def concluir(self, voo: Voo, resultado: Optional[Dict[str, Any]] = None, erro: Optional[Dict[str, Any]] = None) -> None:
+        """Guarda o desfecho e tira o voo de andamento; sem sucesso, libera também a Idempotency-Key"""
+        with self._lock:
+            if voo.concluido.is_set():
+                return
+            voo.resultado, voo.erro = resultado, erro
+            voo.finalizado_em = time.time()
+            voo.concluido.set()
+            if voo.chave and self._em_andamento.get(voo.chave) is voo:
+                del self._em_andamento[voo.chave]
+            if erro is not None or (resultado or {}).get("metadados", {}).get("cancelado"):
+                for chave in [chave for chave, outro in self._por_idempotencia.items() if outro is voo]:
+                    del self._por_idempotencia[chave]
+
+    def _limpar_idempotencia(self) -> None:
+        # Chamado com self._lock
+        limite = time.time() - self.ttl_idempotencia
+        expiradas = [
+            chave for chave, voo in self._por_idempotencia.items()
+            if voo.finalizado_em is not None and voo.finalizado_em < limite
+        ]
+        for chave in expiradas:
+            del self._por_idempotencia[chave]
+
+    def resumo(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "em_andamento": len(self._em_andamento),
+                "chaves_idempotencia": len(self._por_idempotencia),
+                **self._metricas,
+            }
+
+
+# Instância do processo
+coalescedor_debates = CoalescedorDebates()
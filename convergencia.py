@@ -0,0 +1,59 @@
+"""
+Detecção de convergência do debate pela novidade semântica de cada turno
+
+Cada resposta vira um embedding (o mesmo cliente de embeddings do RAG). A
+novidade do turno é 1 - a maior similaridade de cosseno com os turnos
+anteriores do próprio agente e com os turnos da rodada até ali. A partir de
+RODADA_MINIMA, um agente cujo turno fica abaixo do limiar só repetiu o que já
+foi dito: ele deixa de falar, e o debate termina quando restam menos de dois
+agentes com algo novo a dizer.
+"""
+import math
+from typing import Any, Callable, Dict, List, Set
+
+# A 1ª rodada são as aberturas: posições parecidas ainda não são convergência
+RODADA_MINIMA = 2
+
+
+def similaridade_cosseno(a: List[float], b: List[float]) -> float:
+    # Poucas comparações por turno: Python puro basta e o DebateCrew não depende de numpy
+    norma = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return sum(x * y for x, y in zip(a, b)) / norma if norma else 0.0
+
+
+class DetectorConvergencia:
+    """Novidade dos turnos e agentes que já convergiram (estado de um debate)"""
+
+    def __init__(self, embed: Callable[[str], List[float]], limiar: float, rodada_minima: int = RODADA_MINIMA):
+        self.embed = embed
+        self.limiar = float(limiar)
+        self.rodada_minima = rodada_minima
+        self.convergidos: Set[int] = set()
+        self.novidades: List[Dict[str, Any]] = []
+        self._por_agente: Dict[int, List[List[float]]] = {}
+        self._por_rodada: Dict[int, List[List[float]]] = {}
+
+    def vetor(self, texto: str) -> List[float]:
+        return [float(x) for x in self.embed(texto)]
+
+    def registrar(self, idx: int, agente: str, rodada: int, vetor: List[float]) -> float:
+        """Mede a novidade do turno, guarda o embedding e marca o agente se ele convergiu"""
+        referencias = self._por_agente.get(idx, []) + self._por_rodada.get(rodada, [])
+        novidade = 1.0 - max((similaridade_cosseno(vetor, ref) for ref in referencias), default=0.0)
+        self._por_agente.setdefault(idx, []).append(vetor)
+        self._por_rodada.setdefault(rodada, []).append(vetor)
+        convergiu = rodada >= self.rodada_minima and novidade < self.limiar
+        if convergiu:
+            self.convergidos.add(idx)
+        self.novidades.append({
+            "rodada": rodada,
+            "agente": agente,
+            "novidade": round(novidade, 4),
+            "convergiu": convergiu
+        })
+        return novidade
+
+    def encerrar(self, total_agentes: int) -> bool:
+        """O debate acabou quando restam menos de dois agentes ativos (ou o único agente convergiu)"""
+        ativos = total_agentes - len(self.convergidos)
+        return ativos < min(2, total_agentes)
@@ -1,18 +1,39 @@
 """
 Módulo para operações com banco de dados Supabase
 """
+import os
+import threading
+import time
 from copy import deepcopy
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from supabase import Client
 from supabase_config import get_supabase_client
 
+from debate_turno import Turno
+
 DEFAULT_SYSTEM_SETTINGS = {
     "debate_config": {
         "max_rounds": 5,
         "response_timeout": 120,
         "allow_without_min_agents": False,
+        "max_input_tokens": 6000,
+        # Tempo sem primeiro token do LLM principal até acionar o de reserva (agentes com backup_llm_provider)
+        "hedge_threshold_ms": 5000,
+        # Debates executados ao mesmo tempo por processo e pedidos aguardando vaga (além disso: HTTP 429)
+        "max_concurrent_debates": 4,
+        "max_queue_size": 20,
+        # Encerrar o debate quando os agentes só repetem o já dito (novidade semântica abaixo do limiar)
+        "convergence_detection": False,
+        "novelty_threshold": 0.1,
+        # Reaproveitar debates concluídos para perguntas semelhantes com o mesmo painel (cache em memória)
+        "response_cache": False,
+        "cache_similarity_threshold": 0.95,
+        "cache_ttl_seconds": 86400,
+        "cache_max_entries": 200,
+        # Transcrições maiores que isto (tokens) têm síntese hierárquica: resumos por participante e síntese final
+        "hierarchical_synthesis_tokens": 12000,
     },
     "api_limits": {
         "monthly_tokens": 1000000,
@@ -26,6 +47,31 @@ DEFAULT_SYSTEM_SETTINGS = {
     },
 }
 
+# Colunas de agents usadas para montar um debate (criar_agente_dinamico,
+# criar_llm_reserva, hedge e chave do cache de debates)
+COLUNAS_AGENTE_DEBATE = (
+    "id, name, role, goal, backstory, llm_provider, llm_model, backup_llm_provider, backup_llm_model, "
+    "hedge_after_ms, temperature, max_tokens, verbose, allow_delegation, status, updated_at"
+)
+# Validade (s) da configuração de um agente no cache. Edições feitas por esta
+# instância invalidam na hora (invalidar_cache_agentes); as de outras instâncias
+# aparecem depois do TTL
+TTL_CACHE_AGENTES = float(os.getenv("AGENT_CACHE_TTL", "60"))
+
+# Cache do processo (compartilhado por todas as instâncias de Database): id -> (momento da busca, linha)
+_cache_agentes: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_lock_cache_agentes = threading.Lock()
+
+
+def invalidar_cache_agentes(agent_id: Optional[str] = None) -> None:
+    """Descarta a configuração em cache de um agente (ou de todos, sem agent_id)"""
+    with _lock_cache_agentes:
+        if agent_id is None:
+            _cache_agentes.clear()
+        else:
+            _cache_agentes.pop(str(agent_id), None)
+
+
 class Database:
     def __init__(self):
         self.supabase: Client = get_supabase_client()
@@ -140,8 +186,41 @@ class Database:
             traceback.print_exc()
             return False
     
+    def get_active_agents(self, agent_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Configuração dos agentes ativos por id (só as COLUNAS_AGENTE_DEBATE).
+        
+        Os que não estão no cache vêm numa única consulta (in_); ids inexistentes
+        ou inativos ficam fora do resultado e não são guardados no cache.
+        """
+        agora = time.monotonic()
+        encontrados: Dict[str, Dict[str, Any]] = {}
+        with _lock_cache_agentes:
+            for agent_id in agent_ids:
+                entrada = _cache_agentes.get(agent_id)
+                if entrada and agora - entrada[0] < TTL_CACHE_AGENTES:
+                    encontrados[agent_id] = dict(entrada[1])
+        faltantes = list(dict.fromkeys(agent_id for agent_id in agent_ids if agent_id not in encontrados))
+        if not faltantes:
+            return encontrados
+        
+        def consultar(colunas: str):
+            return self.supabase.table("agents").select(colunas).in_("id", faltantes).eq("status", "active").execute()
+        
+        try:
+            result = consultar(COLUNAS_AGENTE_DEBATE)
+        except Exception as e:
+            # Ex.: migração com as colunas de failover não aplicada
+            print(f"[DB] Busca de agentes com colunas selecionadas falhou, repetindo com todas: {str(e)}")
+            result = consultar("*")
+        with _lock_cache_agentes:
+            for linha in result.data or []:
+                _cache_agentes[str(linha["id"])] = (agora, linha)
+                encontrados[str(linha["id"])] = dict(linha)
+        return encontrados
+    
     def save_debate(self, pergunta: str, selected_agents: List[str], 
-                   num_rodadas: int, historico: List[Dict], sintese: Optional[str] = None) -> str:
+                   num_rodadas: int, historico: List[Turno], sintese: Optional[str] = None) -> str:
         """Salva um debate completo no banco"""
         try:
             print(f"[DB] Tentando salvar debate no banco...")
@@ -173,26 +252,10 @@ class Database:
             print(f"[DB] Debate criado com ID: {debate_id}")
             
             # Salvar mensagens
-            messages_data = []
-            for idx, item in enumerate(historico):
-                # Limitar tamanho do conteúdo se muito grande
-                content = str(item["conteudo"])
-                if len(content) > 10000:
-                    content = content[:10000] + "... [truncado]"
-                
-                message = {
-                    "debate_id": debate_id,
-                    "type": item["tipo"],
-                    "content": content,
-                    "agent_id": item.get("agente"),
-                    "agent_name": item.get("agente"),
-                    "agent_role": item.get("agente"),
-                    "order_index": idx,
-                    # Não enviar timestamp - deixar o banco usar DEFAULT
-                }
-                # Remover campos None para evitar problemas
-                message = {k: v for k, v in message.items() if v is not None}
-                messages_data.append(message)
+            messages_data = [
+                self._message_row(debate_id, item, idx)
+                for idx, item in enumerate(historico)
+            ]
             
             if messages_data:
                 print(f"[DB] Inserindo {len(messages_data)} mensagens na tabela 'messages'...")
@@ -216,6 +279,94 @@ class Database:
             traceback.print_exc()
             raise
     
+    @staticmethod
+    def _message_row(debate_id: str, item: Turno, order_index: int) -> Dict:
+        """Linha da tabela messages para um item do histórico do debate"""
+        # Limitar tamanho do conteúdo se muito grande
+        content = str(item.conteudo)
+        if len(content) > 10000:
+            content = content[:10000] + "... [truncado]"
+        
+        message = {
+            "debate_id": debate_id,
+            "type": item.tipo.value,
+            "content": content,
+            "agent_id": item.agente_id,  # id do agente no banco (None para moderador, contexto e síntese)
+            "agent_name": item.agente,
+            "agent_role": item.agente_role or item.agente,
+            "round_number": item.rodada,
+            "order_index": order_index,
+            # Momento real do turno (ISO 8601); sem ele o banco usa DEFAULT NOW()
+            "timestamp": item.timestamp,
+        }
+        # Remover campos None para evitar problemas
+        return {k: v for k, v in message.items() if v is not None}
+    
+    @staticmethod
+    def messages_to_historico(messages: List[Dict]) -> List[Turno]:
+        """Converte as linhas de messages (ordenadas por order_index) de volta em itens do histórico"""
+        return [
+            Turno(
+                message["type"],
+                message["content"],
+                agente=message.get("agent_name"),
+                agente_role=message.get("agent_role"),
+                rodada=message.get("round_number"),
+                timestamp=message.get("timestamp"),
+                # Debates gravados antes do agente_id têm o nome do agente nesta coluna
+                agente_id=message.get("agent_id"),
+            )
+            for message in messages
+        ]
+    
+    # ========== GRAVAÇÃO INCREMENTAL (TURNO A TURNO) ==========
+    
+    def create_debate(self, pergunta: str, selected_agents: List[str], num_rodadas: int,
+                      modo: Optional[str] = None, contexto: Optional[List[str]] = None,
+                      sintese_continua: bool = False) -> str:
+        """Cria o debate com status 'running' antes do primeiro turno; as mensagens entram com save_message"""
+        debate_data = {
+            "pergunta": pergunta,
+            "selected_agents": selected_agents if isinstance(selected_agents, list) else list(selected_agents),
+            "num_rodadas": num_rodadas,
+            "status": "running",
+            "modo": modo,
+            "contexto": contexto or None,
+            "sintese_continua": True if sintese_continua else None,
+        }
+        debate_data = {k: v for k, v in debate_data.items() if v is not None}
+        result = self.supabase.table("debates").insert(debate_data).execute()
+        if hasattr(result, 'error') and result.error:
+            raise Exception(f"Erro do Supabase: {result.error}")
+        if not result.data:
+            raise Exception("Nenhum dado retornado ao criar debate. Verifique se a migração supabase_update_checkpoint_schema.sql foi aplicada.")
+        return result.data[0]["id"]
+    
+    def save_message(self, debate_id: str, item: Turno, order_index: int) -> None:
+        """Grava um item do histórico assim que ele é produzido (turno, pergunta ou síntese)"""
+        result = self.supabase.table("messages").insert(self._message_row(debate_id, item, order_index)).execute()
+        if hasattr(result, 'error') and result.error:
+            raise Exception(f"Erro ao inserir mensagem: {result.error}")
+    
+    def update_running_summary(self, debate_id: str, resumo: str, falas: int) -> None:
+        """Grava o resumo contínuo (sintese_continua) e quantas respostas ele cobre, para retomar dele"""
+        self.supabase.table("debates").update({
+            "resumo_continuo": resumo,
+            "resumo_continuo_falas": falas,
+            "updated_at": datetime.now().isoformat()
+        }).eq("id", debate_id).execute()
+    
+    def delete_messages_from(self, debate_id: str, order_index: int) -> None:
+        """Remove as mensagens a partir de order_index (turnos que serão gerados de novo ao retomar)"""
+        self.supabase.table("messages").delete().eq("debate_id", debate_id).gte("order_index", order_index).execute()
+    
+    def update_debate_status(self, debate_id: str, status: str, sintese: Optional[str] = None) -> None:
+        """Atualiza o status do debate (running, completed, failed, cancelled) e, ao concluir, a síntese"""
+        payload = {"status": status, "updated_at": datetime.now().isoformat()}
+        if sintese is not None:
+            payload["sintese"] = sintese
+        self.supabase.table("debates").update(payload).eq("id", debate_id).execute()
+    
     def get_debate(self, debate_id: str) -> Optional[Dict]:
         """Recupera um debate completo"""
         try:
@@ -241,11 +392,13 @@ class Database:
             traceback.print_exc()
             return None
     
-    def list_debates(self, limit: int = 50) -> List[Dict]:
-        """Lista debates recentes"""
+    def list_debates(self, limit: int = 50, status: Optional[str] = None) -> List[Dict]:
+        """Lista debates recentes (opcionalmente só os de um status, ex.: failed para retomar)"""
         try:
-            result = self.supabase.table("debates")\
-                .select("*")\
+            query = self.supabase.table("debates").select("*")
+            if status:
+                query = query.eq("status", status)
+            result = query\
                 .order("created_at", desc=True)\
                 .limit(limit)\
                 .execute()
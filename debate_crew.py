@@ -2,16 +2,117 @@
 Módulo com a lógica de orquestração do debate
 """
 import os
-import traceback
+import queue
+import threading
 
 # ⚠️ CRÍTICO: Desabilitar fallback do LiteLLM ANTES de importar CrewAI
 # Isso evita erros quando LLM não está disponível
 os.environ.setdefault("CREWAI_DISABLE_LITELLM_FALLBACK", "true")
 
-from crewai import Crew, Process, Task, Agent
+from crewai import Task, Agent
 from agents import obter_agente, AGENTES_DISPONIVEIS
-from typing import List, Dict, Optional, Any
+from convergencia import DetectorConvergencia
+from debate_transcript import ResumoContinuo, TranscricaoIncremental, truncar_transcricao
+from debate_turno import TipoTurno, Turno, formatar_historico
+from llm_scheduler import PRIORIDADE_INTERATIVA, ChamadaCancelada, agendador_llm, chave_do_llm
+from log_utils import campos, obter_logger
+from metricas_provedores import metricas_provedores
+from prompt_builder import (
+    ESTABILIDADE_CONTEXTO_USUARIO,
+    ESTABILIDADE_PERGUNTA,
+    ESTABILIDADE_PERSONA,
+    ESTABILIDADE_RAG,
+    ESTABILIDADE_TRANSCRICAO,
+    ESTABILIDADE_TURNO,
+    PRIORIDADE_CONTEXTO_USUARIO,
+    PRIORIDADE_RAG,
+    PRIORIDADE_TRANSCRICAO,
+    MontadorPrompt,
+    compactar_conteudo,
+    compactar_template,
+    detectar_provedor,
+    diferenca_uso_tokens,
+    extrair_uso_tokens,
+    montar_persona,
+    orcamento_modelo,
+)
+from token_utils import contar_tokens
+from typing import List, Dict, Optional, Any, Tuple, Callable
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+
+logger = obter_logger("debate")
+
+# Limite padrão de tokens de entrada por turno (prompt completo enviado ao agente)
+MAX_TOKENS_ENTRADA_PADRAO = 6000
+# Espaço mínimo reservado para a transcrição, mesmo que o restante do prompt seja grande
+MIN_TOKENS_CONTEXTO = 500
+# Menor trecho útil de RAG/contexto do usuário; abaixo disso o segmento é removido
+MIN_TOKENS_SEGMENTO_OPCIONAL = 100
+# Modo em que a primeira rodada (aberturas independentes) roda em paralelo
+MODO_PAINEL = "painel"
+# Chamadas simultâneas por provedor no modo painel (compartilhado entre debates do processo)
+LIMITE_CONCORRENCIA_PROVEDOR = {
+    "openai": int(os.getenv("PAINEL_LIMITE_OPENAI", "4")),
+    "anthropic": int(os.getenv("PAINEL_LIMITE_ANTHROPIC", "2")),
+    "google": int(os.getenv("PAINEL_LIMITE_GOOGLE", "2")),
+}
+_semaforos_provedor: Dict[str, threading.BoundedSemaphore] = {}
+_semaforos_lock = threading.Lock()
+
+def _semaforo_provedor(provedor: str) -> threading.BoundedSemaphore:
+    with _semaforos_lock:
+        if provedor not in _semaforos_provedor:
+            _semaforos_provedor[provedor] = threading.BoundedSemaphore(
+                max(1, LIMITE_CONCORRENCIA_PROVEDOR.get(provedor, 2))
+            )
+        return _semaforos_provedor[provedor]
+
+def _texto_conteudo(conteudo: Any) -> str:
+    """Texto de uma mensagem/chunk; Anthropic e Gemini podem devolver lista de blocos"""
+    if isinstance(conteudo, list):
+        return "".join(
+            b.get("text", "") if isinstance(b, dict) else str(b)
+            for b in conteudo
+        )
+    return str(conteudo) if conteudo is not None else ""
+
+def _resumo_uso_llm(llm: Any) -> Any:
+    """Resumo cumulativo de tokens do crewai.LLM (None se o LLM não expõe)"""
+    obter = getattr(llm, "get_token_usage_summary", None)
+    try:
+        return obter() if callable(obter) else None
+    except Exception:
+        return None
+
+def _tem_stream(llm: Any) -> bool:
+    """Modelos LangChain têm o método stream; no crewai.LLM nativo stream é um campo bool"""
+    return callable(getattr(llm, "stream", None))
+
+def _chamada_direta(llm: Any) -> bool:
+    """O LLM pode ser chamado direto com as mensagens (stream do LangChain ou call do crewai.LLM)"""
+    return _tem_stream(llm) or callable(getattr(llm, "call", None))
+
+def _agora_iso() -> str:
+    """Timestamp UTC (ISO 8601) dos itens e eventos - o cliente usa para ritmar a exibição"""
+    return datetime.now(timezone.utc).isoformat()
+
+# Saída reservada quando o LLM não informa max_tokens
+MAX_TOKENS_SAIDA_PADRAO = 1000
+CABECALHO_TRANSCRICAO = "Contexto do debate até agora:\n"
+# Frequência (s) com que uma chamada com prazo verifica o cancelamento do debate
+INTERVALO_VERIFICACAO_CANCELAMENTO = 0.5
+# Síntese hierárquica (map-reduce): acima deste tamanho da transcrição (tokens)
+# as falas de cada participante são resumidas em paralelo antes da síntese final
+LIMIAR_SINTESE_HIERARQUICA_PADRAO = 12000
+# Mesmo abaixo do limiar, a transcrição não pode ocupar mais que esta fração da janela do facilitador
+FRACAO_JANELA_SINTESE_DIRETA = 0.8
+# Modelo (OpenAI) dos resumos por participante - mais barato que o do facilitador
+MODELO_RESUMOS = os.getenv("SINTESE_MODELO_RESUMOS", "gpt-4.1-mini")
+
+class TurnoCancelado(Exception):
+    """O debate foi cancelado com uma chamada ao provedor em andamento"""
 
 class DebateCrew:
     """Classe para gerenciar debates entre agentes"""
@@ -24,7 +125,20 @@ class DebateCrew:
         rag_managers: Optional[Dict[int, Any]] = None,
         contexto_usuario: Optional[List[str]] = None,
         modo: str = 'debate',
-        agentes_nomes_map: Optional[Dict[int, str]] = None
+        agentes_nomes_map: Optional[Dict[int, str]] = None,
+        agentes_ids_map: Optional[Dict[int, str]] = None,
+        max_tokens_entrada: Optional[int] = None,
+        ao_evento: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        cancelamento: Optional[threading.Event] = None,
+        timeout_resposta: Optional[float] = None,
+        reservas_llm: Optional[Dict[int, Dict[str, Any]]] = None,
+        llms_diretos: Optional[Dict[int, Any]] = None,
+        ao_registrar: Optional[Callable[[Dict[str, Any], int], None]] = None,
+        limiar_novidade: Optional[float] = None,
+        limiar_sintese_hierarquica: Optional[int] = None,
+        sintese_continua: bool = False,
+        resumo_continuo_retomado: Optional[Tuple[str, int]] = None,
+        ao_atualizar_resumo: Optional[Callable[[str, int], None]] = None
     ):
         """
         Inicializa o debate
@@ -34,6 +148,36 @@ class DebateCrew:
             pergunta: A questão a ser debatida
             agentes_crewai: Lista opcional de agentes CrewAI já criados (modo dinâmico)
             rag_managers: Dicionário opcional mapeando índice do agente -> RAGManager
+            agentes_ids_map: Dicionário opcional índice do agente -> id do agente no
+                banco, gravado em cada turno (agente_id) junto com o índice
+            max_tokens_entrada: Limite de tokens do prompt de cada turno
+            ao_evento: Callback opcional chamado a cada evento do debate
+                (tipo, dados) - usado pelo streaming SSE da API
+            cancelamento: Event opcional; quando setado o debate para antes do
+                próximo turno e a chamada em andamento é abandonada
+            timeout_resposta: Prazo (s) de cada turno, busca RAG e síntese
+                (debate_config.response_timeout); None = sem prazo
+            reservas_llm: Dicionário opcional índice do agente -> {"llm": LLM de
+                reserva, "limiar": segundos sem primeiro token até o hedge}
+            llms_diretos: Dicionário opcional índice do agente -> modelo LangChain
+                passado ao Agent (ver agents.criar_llm_agente). O Agent guarda
+                um crewai.LLM convertido, sem stream de tokens; as chamadas
+                diretas (turnos sem ferramentas e hedge) usam este modelo
+            ao_registrar: Callback opcional (item, posição no histórico) chamado,
+                na ordem do histórico, assim que cada item entra nele - usado
+                pela API para gravar o debate turno a turno
+            limiar_novidade: Liga a detecção de convergência (ver convergencia.py):
+                agentes que só repetem o já dito deixam de falar e o debate
+                termina antes; None = desligada
+            limiar_sintese_hierarquica: Tokens da transcrição a partir dos quais a
+                síntese é hierárquica (ver gerar_sintese_com_agente)
+            sintese_continua: Gera a síntese ao final do debate a partir de um
+                resumo atualizado em segundo plano a cada turno (ResumoContinuo)
+            resumo_continuo_retomado: (resumo, falas que ele cobre) gravado pelo
+                debate interrompido; ao retomar, o resumo continua dele
+            ao_atualizar_resumo: Callback opcional (resumo, falas que ele cobre)
+                chamado a cada atualização do resumo contínuo - usado pela API
+                para gravá-lo junto com o debate
         """
         if not pergunta:
             raise ValueError("Pergunta é obrigatória")
@@ -44,6 +188,35 @@ class DebateCrew:
         self.modo = modo
         self.should_generate_summary = self.modo == 'sintese'
         self.agentes_nomes_map = agentes_nomes_map or {}  # Dicionário: índice -> nome do agente
+        self.agentes_ids_map = agentes_ids_map or {}  # Dicionário: índice -> id do agente no banco
+        self.max_tokens_entrada = int(max_tokens_entrada or MAX_TOKENS_ENTRADA_PADRAO)
+        self._contextos_rag: Dict[int, str] = {}  # Cache do contexto RAG por índice do agente
+        self._buscas_rag: Dict[int, Future] = {}  # Buscas RAG antecipadas em andamento por índice do agente
+        self._provedores: Dict[int, str] = {}  # Provedor do LLM por índice do agente
+        self.inicio_primeira_chamada: Optional[float] = None  # perf_counter da primeira chamada a um agente
+        self._inicio_lock = threading.Lock()  # No modo painel os agentes são chamados em paralelo
+        self._orcamentos: Dict[int, int] = {}  # Tokens de entrada disponíveis por índice do agente
+        self.ao_evento = ao_evento
+        self.cancelamento = cancelamento
+        self.timeout_resposta = float(timeout_resposta) if timeout_resposta else None
+        self.reservas_llm = reservas_llm or {}  # Dicionário: índice -> LLM de reserva e limiar do hedge
+        self.llms_diretos = llms_diretos or {}  # Dicionário: índice -> modelo LangChain do agente
+        self.ao_registrar = ao_registrar
+        self.limiar_sintese_hierarquica = int(limiar_sintese_hierarquica or LIMIAR_SINTESE_HIERARQUICA_PADRAO)
+        # Só faz sentido com turnos: no modo sintese a transcrição já chega pronta no contexto
+        self._resumo_continuo: Optional[ResumoContinuo] = None
+        self._resumo_continuo_retomado = resumo_continuo_retomado
+        if sintese_continua and not self.should_generate_summary:
+            self._resumo_continuo = ResumoContinuo(self._atualizar_resumo_continuo, ao_atualizar=ao_atualizar_resumo)
+        self._resumidor: Optional[Agent] = None
+        # Detecção de convergência: usa o cliente de embeddings do RAG (qualquer agente serve)
+        self._convergencia: Optional[DetectorConvergencia] = None
+        if limiar_novidade:
+            cliente_embeddings = next(iter(self.rag_managers.values()), None)
+            if cliente_embeddings is not None:
+                self._convergencia = DetectorConvergencia(cliente_embeddings.embed, limiar_novidade)
+            else:
+                logger.info("Detecção de convergência desligada: nenhum agente com cliente de embeddings (RAG)")
         
         if agentes_crewai:
             # Modo dinâmico: usar agentes já criados
@@ -57,277 +230,1184 @@ class DebateCrew:
             self.agentes = [obter_agente(nome) for nome in nomes_agentes]
         else:
             raise ValueError("É necessário fornecer nomes_agentes ou agentes_crewai")
-        self.historico = []
+        self.historico: List[Turno] = []
+        self._transcricao = TranscricaoIncremental()
+        # Métricas do debate (tokens por turno etc.) - retornadas junto com o histórico pela API
+        self.metadados: Dict[str, Any] = {
+            "max_tokens_entrada": self.max_tokens_entrada,
+            "turnos": [],
+            # Tokens de entrada lidos do cache do provedor (somando os turnos com uso informado)
+            "cache_prompt": {"tokens_entrada": 0, "tokens_cache": 0, "proporcao": None},
+            # Segmentos truncados/removidos para caber no orçamento de tokens
+            "ajustes_prompt": [],
+            # Chamadas que estouraram timeout_resposta (turno, rag ou sintese)
+            "timeouts": [],
+            # Turnos em que o LLM de reserva foi acionado (ver _chamar_com_hedge)
+            "hedges": [],
+            # Buscas RAG antecipadas e quanto os turnos ainda esperaram por elas (ver _antecipar_contextos_rag)
+            "rag": {"antecipadas": 0, "espera_total": 0.0}
+        }
         
-    def executar_debate(self, num_rodadas: int = 3) -> List[Dict]:
+    def executar_debate(self, num_rodadas: int = 3, historico_inicial: Optional[List[Dict]] = None) -> List[Turno]:
         """
         Executa o debate entre os agentes
         
         Args:
             num_rodadas: Número de rodadas de debate (cada agente fala uma vez por rodada)
+            historico_inicial: Histórico já gravado de um debate interrompido
+                (pergunta e turnos, na ordem). O debate continua do turno
+                seguinte: os turnos dele não são gerados de novo nem
+                repassados ao ao_registrar
             
         Returns:
             Lista com o histórico do debate
         """
         historico = []
         if self.should_generate_summary:
-            historico = [{
-                "tipo": "pergunta",
-                "conteudo": self.pergunta,
-                "agente": "Contexto"
-            }] + self._build_history_from_context()
+            if historico_inicial:
+                historico = [Turno.de_dict(item) for item in historico_inicial]
+            else:
+                self._registrar_item(historico, Turno(TipoTurno.PERGUNTA, self.pergunta, agente="Contexto"))
+                for item in self._build_history_from_context():
+                    self._registrar_item(historico, item)
             self.historico = historico
+            self._emitir("sintese_inicio", {"timestamp": _agora_iso()})
             sintese_final = self.gerar_sintese_com_agente()
-            historico.append({
-                "tipo": "sintese_conteudo",
-                "conteudo": sintese_final,
-                "agente": "Facilitador"
-            })
+            self._registrar_item(historico, Turno(
+                TipoTurno.SINTESE_CONTEUDO, sintese_final, agente="Facilitador", timestamp=_agora_iso()
+            ))
+            self._emitir("sintese", historico[-1])
             self.historico = historico
             return historico
-        contexto_usuario_block = ""
-        if self.contexto_usuario:
-            contexto_usuario_block = "\nContexto adicional fornecido pelo usuário:\n" + "\n".join(self.contexto_usuario)
+        num_rodadas = max(1, int(num_rodadas or 1))
+        self.metadados["num_rodadas"] = num_rodadas
+        self._transcricao = TranscricaoIncremental()
+        self._antecipar_contextos_rag()
         
-        # Mensagem inicial com a pergunta
-        historico.append({
-            "tipo": "pergunta",
-            "conteudo": self.pergunta,
-            "agente": "Moderador"
-        })
+        turnos_concluidos = 0
+        if historico_inicial:
+            historico = [Turno.de_dict(item) for item in historico_inicial]
+            turnos_concluidos = self._restaurar_historico(historico)
+            self.metadados["retomado_do_turno"] = turnos_concluidos
+        else:
+            # Mensagem inicial com a pergunta
+            self._registrar_item(historico, Turno(
+                TipoTurno.PERGUNTA, self.pergunta, agente="Moderador", timestamp=_agora_iso()
+            ))
+            self._emitir("pergunta", historico[0])
         
-        # Cada agente responde uma vez
-        for idx, agente in enumerate(self.agentes):
-            try:
-                # Contexto: o que outros agentes já disseram
-                contexto_anterior = self._obter_contexto_anterior(historico)
-                
-                # Buscar contexto RAG se disponível (usando índice do agente)
-                rag_context = ""
-                if idx in self.rag_managers:
-                    rag_manager = self.rag_managers[idx]
-                    if rag_manager:
-                        rag_context = rag_manager.get_context(self.pergunta, k=2)
-                
-                # Criar prompt com contexto RAG
-                if rag_context:
-                    enhanced_prompt = f"""
-                    Você está participando de um debate sobre: {self.pergunta}
-                    
-                    Contexto do debate até agora:
-                    {contexto_anterior}
-                {contexto_usuario_block}
-                    
-                    Informações relevantes da sua base de conhecimento:
-                    {rag_context}
-                    
-                    Agora é sua vez de falar. Dê sua opinião sobre a questão, 
-                    considerando o que outros participantes já disseram e as informações 
-                    da sua base de conhecimento quando relevantes.
-                    Você pode concordar, discordar ou adicionar novas perspectivas.
-                    Seja autêntico à sua personalidade e estilo de comunicação.
-                    Mantenha sua resposta concisa mas impactante (2-3 parágrafos).
-                    """
-                else:
-                    enhanced_prompt = f"""
-                    Você está participando de um debate sobre: {self.pergunta}
-                    
-                    Contexto do debate até agora:
-                    {contexto_anterior}
-                {contexto_usuario_block}
-                    
-                    Agora é sua vez de falar. Dê sua opinião sobre a questão, 
-                    considerando o que outros participantes já disseram. 
-                    Você pode concordar, discordar ou adicionar novas perspectivas.
-                    Seja autêntico à sua personalidade e estilo de comunicação.
-                    Mantenha sua resposta concisa mas impactante (2-3 parágrafos).
-                    """
-                
-                task = Task(
-                    description=enhanced_prompt,
-                    agent=agente,
-                    expected_output="Uma resposta clara e autêntica sobre a questão do debate"
-                )
-                
-                # Executa a task
-                crew = Crew(
-                    agents=[agente],
-                    tasks=[task],
-                    process=Process.sequential,
-                    verbose=True,
-                    memory=False  # Desabilitar memória nativa para evitar erros de embedding/chave
-                )
-                
-                resultado = crew.kickoff()
-                
-                # Obter nome do agente se disponível no mapeamento, senão usar role
-                agente_nome = self.agentes_nomes_map.get(idx, agente.role) if self.agentes_nomes_map else agente.role
-                
-                historico.append({
-                    "tipo": "resposta",
-                    "conteudo": str(resultado),
-                    "agente": agente_nome,  # Usar nome do agente em vez de apenas role
-                    "agente_role": agente.role  # Salvar role também para referência
-                })
-                
-                # Pequena pausa para tornar o debate mais natural
-                time.sleep(1)
-                
-            except Exception as e:
-                # Log detalhado do erro para debugging
-                error_traceback = traceback.format_exc()
-                print(f"❌ ERRO CRÍTICO NO DEBATE ao processar resposta de {agente.role}:")
-                print(f"❌ Tipo do erro: {type(e).__name__}")
-                print(f"❌ Mensagem: {str(e)}")
-                print(f"❌ Traceback completo:")
-                print(error_traceback)
-                traceback.print_exc()  # Também imprimir no stderr padrão
-                
-                historico.append({
-                    "tipo": "erro",
-                    "conteudo": f"Erro ao processar resposta de {agente.role}: {str(e)}",
-                    "agente": "Sistema"
-                })
+        # Cada agente responde uma vez por rodada; o turno k é (rodada k // n + 1, agente k % n)
+        total_agentes = len(self.agentes)
+        if self._convergencia:
+            self.metadados["convergencia"] = {
+                "limiar": self._convergencia.limiar,
+                "novidade": self._convergencia.novidades,
+                "agentes_encerrados": [],
+                "encerrado_na_rodada": None,
+                "turnos_economizados": 0,
+                "tokens_economizados": 0
+            }
+        for rodada in range(1, num_rodadas + 1):
+            if self._cancelado():
+                break
+            if self._convergencia and self._convergencia.encerrar(total_agentes):
+                self.metadados["convergencia"]["encerrado_na_rodada"] = rodada - 1
+                logger.info("Debate convergiu - encerrado após a rodada %d", rodada - 1, extra=campos(amostra=1.0))
+                break
+            primeiro_turno = (rodada - 1) * total_agentes
+            if turnos_concluidos >= primeiro_turno + total_agentes:
+                continue
+            if rodada == 1 and self.modo == MODO_PAINEL and total_agentes > 1:
+                # Aberturas independentes: todos partem da mesma transcrição vazia
+                self._executar_rodada_paralela(historico, rodada, num_rodadas, primeiro_agente=turnos_concluidos)
+                continue
+            for idx, agente in enumerate(self.agentes):
+                if self._cancelado():
+                    break
+                if primeiro_turno + idx < turnos_concluidos:
+                    continue
+                if self._convergencia:
+                    if self._convergencia.encerrar(total_agentes):
+                        break
+                    if idx in self._convergencia.convergidos:
+                        # Sem nada novo na última fala: o turno não é gerado
+                        continue
+                # Sem pausa entre turnos: o ritmo de exibição fica com o cliente (timestamps dos itens)
+                self._registrar_turno(historico, self._gerar_turno(idx, agente, rodada, num_rodadas))
+        if self._convergencia and not self._cancelado():
+            self._registrar_economia_convergencia(historico, num_rodadas * total_agentes)
         
         # Atualizar histórico ANTES de gerar síntese (se necessário)
         self.historico = historico
         
-        # Só gerar síntese se should_generate_summary for True (modo 'sintese')
-        if self.should_generate_summary:
-            print("🔄 Gerando síntese final do debate com agente facilitador...")
+        if self._cancelado():
+            logger.info("Debate cancelado - turnos restantes e síntese ignorados", extra=campos(amostra=1.0))
+            self.metadados["cancelado"] = True
+            self.historico = historico
+            return historico
+        
+        # Síntese ao final dos turnos: com sintese_continua (o modo 'sintese' retorna antes, sem turnos)
+        if self.should_generate_summary or self._resumo_continuo is not None:
+            logger.debug("Gerando síntese final do debate com agente facilitador")
+            self._emitir("sintese_inicio", {"timestamp": _agora_iso()})
             sintese = self.gerar_sintese_com_agente()
-            print(f"✅ Síntese gerada: {len(sintese)} caracteres")
+            logger.debug("Síntese gerada: %d caracteres", len(sintese))
             
             # Adicionar apenas o conteúdo da síntese, sem título
-            historico.append({
-                "tipo": "sintese_conteudo",
-                "conteudo": sintese,
-                "agente": "Facilitador"
-            })
+            self._registrar_item(historico, Turno(
+                TipoTurno.SINTESE_CONTEUDO, sintese, agente="Facilitador", timestamp=_agora_iso()
+            ))
+            self._emitir("sintese", historico[-1])
         
         # Atualizar histórico final
         self.historico = historico
         return historico
     
-    def gerar_sintese_com_agente(self) -> str:
-        """Gera síntese usando um agente facilitador como task"""
-        from agents import criar_facilitador
+    def _gerar_turno(self, idx: int, agente: Agent, rodada: int, num_rodadas: int) -> Dict[str, Any]:
+        """
+        Monta o prompt e chama o agente para um turno.
         
+        Não altera a transcrição nem as métricas do debate (ver _registrar_turno),
+        então pode rodar em paralelo para agentes da mesma rodada. Retorna o item
+        do histórico ("resposta" ou "erro") e os dados usados nas métricas.
+        """
+        agente_nome = self.agentes_nomes_map.get(idx, agente.role) if self.agentes_nomes_map else agente.role
+        inicio = time.perf_counter()
         try:
-            # Criar agente facilitador
-            print("📋 Criando agente facilitador...")
-            facilitador = criar_facilitador()
+            self._emitir("turno_inicio", {
+                "rodada": rodada,
+                "agente": agente_nome,
+                "agente_role": agente.role,
+                "timestamp": _agora_iso()
+            })
+            rag_context = self._obter_contexto_rag(idx)
             
-            # Compilar todo o debate
-            print("📝 Compilando histórico do debate...")
-            debate_completo = self.obter_historico_formatado()
-            print(f"📊 Histórico compilado: {len(debate_completo)} caracteres")
-            contexto_usuario_section = ""
-            if self.contexto_usuario:
-                contexto_usuario_section = (
-                    "CONTEXTO ADICIONAL DO USUÁRIO:\n"
-                    + "\n".join(self.contexto_usuario)
-                    + "\n\n"
-                )
+            orcamento = self._orcamento_agente(idx, agente)
             
-            # Criar task para o facilitador
-            task_sintese = Task(
-                description=f"""
-                Você é um facilitador experiente. Analise o seguinte debate e crie uma síntese final completa.
-                
-                PERGUNTA DO DEBATE: {self.pergunta}
-                
-                DEBATE COMPLETO:
-                {contexto_usuario_section}{debate_completo}
-                
-                Sua tarefa é criar uma síntese profissional que:
-                1. Resuma os principais pontos levantados por cada participante
-                2. Identifique áreas de consenso e divergência entre os participantes
-                3. Destaque os argumentos mais relevantes e impactantes
-                4. Apresente conclusões ou insights finais úteis para o usuário
-                5. Seja clara, concisa e objetiva (3-4 parágrafos bem estruturados)
-                
-                Formate a síntese de forma profissional e estruturada, facilitando o entendimento
-                do usuário sobre todos os aspectos discutidos no debate.
-                """,
-                agent=facilitador,
-                expected_output="Uma síntese completa e estruturada do debate, com todos os pontos principais e conclusões finais"
+            # Parte fixa do prompt ajustada deixando espaço mínimo para a transcrição:
+            # RAG e contexto do usuário são cortados antes dela
+            montador = self._montar_prompt_turno(
+                idx, agente, "", rag_context, rodada, num_rodadas
+            )
+            ajustes = montador.ajustar_ao_orcamento(orcamento - MIN_TOKENS_CONTEXTO)
+            orcamento_contexto = max(
+                MIN_TOKENS_CONTEXTO,
+                orcamento - montador.contar_tokens() - contar_tokens(CABECALHO_TRANSCRICAO) - 1
             )
             
-            # Executar task com CrewAI
-            print("🚀 Executando task de síntese com CrewAI...")
-            crew = Crew(
-                agents=[facilitador],
-                tasks=[task_sintese],
-                process=Process.sequential,
-                verbose=True,
-                memory=False  # Desabilitar memória nativa para evitar erros de embedding/chave
+            # Contexto: o que os agentes já disseram (janela deslizante por rodada)
+            contexto_anterior = self._obter_contexto_anterior(rodada, orcamento_contexto)
+            montador.adicionar(
+                "transcricao",
+                contexto_anterior,
+                ESTABILIDADE_TRANSCRICAO,
+                ponto_cache=True,
+                prioridade=PRIORIDADE_TRANSCRICAO,
+                min_tokens=MIN_TOKENS_CONTEXTO,
+                manter_fim=True,
+                cabecalho=CABECALHO_TRANSCRICAO,
+                truncar=truncar_transcricao
             )
+            # A estimativa de tokens da transcrição é aproximada: um segundo corte
+            # pequeno no mesmo segmento é mesclado ao primeiro
+            for ajuste in montador.ajustar_ao_orcamento(orcamento):
+                anterior = next((a for a in ajustes if a["segmento"] == ajuste["segmento"]), None)
+                if anterior:
+                    anterior.update(acao=ajuste["acao"], tokens_depois=ajuste["tokens_depois"])
+                else:
+                    ajustes.append(ajuste)
             
-            resultado = crew.kickoff()
-            print(f"📦 Resultado recebido do CrewAI: {type(resultado)}")
+            resultado, uso = self._com_prazo(
+                lambda abortar: self._chamar_agente(idx, agente, montador, abortar),
+                f"Resposta de {agente_nome}",
+                etapa="turno", rodada=rodada, agente=agente_nome
+            )
             
-            # Extrair conteúdo do resultado
-            if hasattr(resultado, 'raw'):
-                sintese_texto = str(resultado.raw)
-            elif hasattr(resultado, 'content'):
-                sintese_texto = str(resultado.content)
-            else:
-                sintese_texto = str(resultado)
+            item = Turno(
+                TipoTurno.RESPOSTA,
+                resultado,
+                agente=agente_nome,  # Usar nome do agente em vez de apenas role
+                agente_role=agente.role,  # Salvar role também para referência
+                rodada=rodada,
+                timestamp=_agora_iso(),
+                agente_id=self.agentes_ids_map.get(idx),
+                agente_idx=idx
+            )
+            self._emitir("turno", item)
+            return {
+                "item": item,
+                "idx": idx,
+                "embedding": self._embedding_turno(resultado, agente_nome),
+                "montador": montador,
+                "contexto": contexto_anterior,
+                "uso": uso,
+                "ajustes": ajustes,
+                "duracao": time.perf_counter() - inicio
+            }
             
-            print(f"✅ Síntese extraída: {len(sintese_texto)} caracteres")
-            return sintese_texto
+        except Exception as e:
+            conteudo = f"Erro ao processar resposta de {agente.role}: {str(e)}"
+            if isinstance(e, (TimeoutError, TurnoCancelado, ChamadaCancelada)):
+                # Prazo estourado ou debate cancelado: sem traceback, o debate segue para o próximo agente
+                conteudo = str(e)
+                logger.warning("%s", e, extra=campos(agente=agente.role, rodada=rodada, tipo_erro=type(e).__name__))
+            else:
+                # Um único registro com o traceback (ERROR nunca é amostrado)
+                logger.exception(
+                    "Erro ao processar resposta de %s: %s", agente.role, e,
+                    extra=campos(agente=agente.role, rodada=rodada, tipo_erro=type(e).__name__)
+                )
             
+            item = Turno(
+                TipoTurno.ERRO, conteudo, agente="Sistema", rodada=rodada, timestamp=_agora_iso(),
+                agente_id=self.agentes_ids_map.get(idx), agente_idx=idx  # Turno em que o erro ocorreu
+            )
+            self._emitir("erro", item)
+            return {"item": item, "duracao": time.perf_counter() - inicio}
+    
+    def _registrar_item(self, historico: List[Turno], item: Turno) -> None:
+        """Acrescenta o item ao histórico e o repassa ao ao_registrar (falha ao gravar não interrompe o debate)"""
+        historico.append(item)
+        if not self.ao_registrar:
+            return
+        try:
+            self.ao_registrar(item, len(historico) - 1)
         except Exception as e:
-            error_msg = f"Erro ao gerar síntese: {str(e)}"
-            print(f"❌ {error_msg}")
-            traceback.print_exc()
-            return error_msg
+            logger.warning("Falha ao gravar item %d do histórico: %s", len(historico) - 1, e, extra=campos(tipo=item.tipo.value))
+    
+    def _restaurar_historico(self, historico: List[Turno]) -> int:
+        """
+        Refaz a transcrição a partir de um histórico gravado e reemite os itens.
+        
+        Retorna a posição (turno k = rodada k // n + 1, agente k % n) seguinte à
+        do último turno gravado. Turnos são localizados pela rodada e pelo
+        agente (turnos pulados pela convergência não deixam item): pelo
+        agente_id gravado ou, em debates gravados antes dele, pelo nome da
+        resposta; erros sem agente contam como o turno seguinte. Os itens
+        localizados assim são trocados por cópias com agente_id e agente_idx.
+        
+        Com sintese_continua, o resumo gravado (resumo_continuo_retomado) é
+        restaurado e só as respostas que ele ainda não cobre vão para o
+        ResumoContinuo; se ele cobre mais respostas do que as restauradas,
+        é descartado e o resumo é refeito.
+        """
+        ja_resumidas = 0
+        if self._resumo_continuo is not None and self._resumo_continuo_retomado:
+            resumo, falas = self._resumo_continuo_retomado
+            respostas = sum(1 for item in historico if item.tipo is TipoTurno.RESPOSTA)
+            if resumo and 0 < (falas or 0) <= respostas:
+                self._resumo_continuo.restaurar(resumo, falas)
+                ja_resumidas = falas
+            else:
+                logger.info(
+                    "Resumo contínuo gravado não corresponde ao histórico (%s de %d respostas) - refazendo",
+                    falas, respostas, extra=campos(amostra=1.0)
+                )
+        respostas_vistas = 0
+        indices_por_id = {agente_id: idx for idx, agente_id in self.agentes_ids_map.items()}
+        indices_por_nome = {
+            self.agentes_nomes_map.get(idx, agente.role): idx
+            for idx, agente in enumerate(self.agentes)
+        }
+        posicao = 0
+        for posicao_item, item in enumerate(historico):
+            if item.tipo is TipoTurno.PERGUNTA:
+                self._emitir("pergunta", item)
+            elif item.tipo in (TipoTurno.RESPOSTA, TipoTurno.ERRO):
+                idx = item.agente_idx
+                if idx is None:
+                    idx = indices_por_id.get(item.agente_id)
+                    if idx is None and item.tipo is TipoTurno.RESPOSTA:
+                        idx = indices_por_nome.get(item.agente)
+                    if idx is not None:
+                        item = historico[posicao_item] = item.substituir(
+                            agente_id=self.agentes_ids_map.get(idx), agente_idx=idx
+                        )
+                if idx is not None and item.rodada:
+                    posicao = (item.rodada - 1) * len(self.agentes) + idx + 1
+                else:
+                    posicao += 1
+                if item.tipo is TipoTurno.RESPOSTA:
+                    self._transcricao.adicionar(item.agente, item.conteudo, item.rodada or 1)
+                    respostas_vistas += 1
+                    if self._resumo_continuo is not None and respostas_vistas > ja_resumidas:
+                        self._resumo_continuo.adicionar(f"{item.agente} (rodada {item.rodada or 1}): {item.conteudo}")
+                self._emitir("turno" if item.tipo is TipoTurno.RESPOSTA else "erro", item)
+        logger.info("Debate retomado no turno %d", posicao, extra=campos(amostra=1.0, turno=posicao))
+        return posicao
+    
+    def _registrar_turno(self, historico: List[Turno], turno: Dict[str, Any]) -> None:
+        """Acrescenta o turno ao histórico, à transcrição e às métricas (sempre na thread do debate)"""
+        item = turno["item"]
+        self._registrar_item(historico, item)
+        if item.tipo is not TipoTurno.RESPOSTA:
+            return
+        self._transcricao.adicionar(item.agente, item.conteudo, item.rodada)
+        if self._resumo_continuo is not None:
+            # Atualização em segundo plano, em paralelo com o turno seguinte
+            self._resumo_continuo.adicionar(f"{item.agente} (rodada {item.rodada}): {item.conteudo}")
+        self._registrar_metricas_turno(
+            item.rodada, item.agente, turno["montador"], turno["contexto"], item.conteudo, turno["uso"],
+            duracao=turno["duracao"]
+        )
+        self._registrar_ajustes_prompt(turno["ajustes"], rodada=item.rodada, agente=item.agente)
+        if self._convergencia and turno.get("embedding") is not None:
+            novidade = self._convergencia.registrar(turno["idx"], item.agente, item.rodada, turno["embedding"])
+            if turno["idx"] in self._convergencia.convergidos:
+                self.metadados["convergencia"]["agentes_encerrados"].append(item.agente)
+                logger.info(
+                    "%s convergiu na rodada %d (novidade %.3f) - não fala mais", item.agente, item.rodada, novidade,
+                    extra=campos(amostra=1.0, agente=item.agente, rodada=item.rodada, novidade=round(novidade, 4))
+                )
+    
+    def _embedding_turno(self, texto: str, agente_nome: str) -> Any:
+        """Embedding da resposta para o detector de convergência (None se desligado ou se a chamada falhar)"""
+        if not self._convergencia or self._cancelado():
+            return None
+        try:
+            return self._convergencia.vetor(texto)
+        except Exception as e:
+            logger.warning("Embedding do turno de %s falhou - sem medida de novidade: %s", agente_nome, e)
+            return None
+    
+    def _registrar_economia_convergencia(self, historico: List[Turno], turnos_planejados: int) -> None:
+        """Turnos não gerados pela convergência e tokens estimados (média dos turnos da última rodada)"""
+        realizados = sum(1 for item in historico if item.tipo in (TipoTurno.RESPOSTA, TipoTurno.ERRO))
+        economizados = max(0, turnos_planejados - realizados)
+        ultimos = self.metadados["turnos"][-len(self.agentes):]
+        media = (
+            sum(turno["tokens_entrada"] + turno["tokens_saida"] for turno in ultimos) / len(ultimos)
+            if ultimos else 0
+        )
+        self.metadados["convergencia"]["turnos_economizados"] = economizados
+        self.metadados["convergencia"]["tokens_economizados"] = int(economizados * media)
+    
+    def _executar_rodada_paralela(self, historico: List[Turno], rodada: int, num_rodadas: int, primeiro_agente: int = 0) -> None:
+        """
+        Executa os turnos da rodada em paralelo (modo painel).
+        
+        Cada chamada respeita o limite de concorrência do provedor do agente.
+        Os turnos entram no histórico e na transcrição na ordem dos agentes,
+        não na ordem em que terminam, para o debate ser reproduzível.
+        Agentes com índice menor que primeiro_agente já falaram (debate retomado).
+        """
+        inicio = time.perf_counter()
+        
+        def _turno_com_limite(idx: int, agente: Agent) -> Dict[str, Any]:
+            with _semaforo_provedor(self._provedor(idx, agente)):
+                return self._gerar_turno(idx, agente, rodada, num_rodadas)
+        
+        with ThreadPoolExecutor(max_workers=len(self.agentes), thread_name_prefix="painel") as executor:
+            futuros = [
+                executor.submit(_turno_com_limite, idx, agente)
+                for idx, agente in enumerate(self.agentes)
+                if idx >= primeiro_agente
+            ]
+            turnos = [futuro.result() for futuro in futuros]
+        
+        tempo_paralelo = time.perf_counter() - inicio
+        for turno in turnos:
+            self._registrar_turno(historico, turno)
+        
+        # O fluxo sequencial faria os mesmos turnos um após o outro
+        tempo_sequencial = sum(turno["duracao"] for turno in turnos)
+        self.metadados["painel"] = {
+            "rodada": rodada,
+            "agentes": len(turnos),
+            "tempo_paralelo": round(tempo_paralelo, 3),
+            "tempo_sequencial_estimado": round(tempo_sequencial, 3),
+            "speedup": round(tempo_sequencial / tempo_paralelo, 2) if tempo_paralelo > 0 else None
+        }
+        logger.info(
+            "Rodada %d em paralelo: %.1fs (sequencial estimado: %.1fs)",
+            rodada, tempo_paralelo, tempo_sequencial, extra=campos(**self.metadados["painel"])
+        )
+    
+    def _cancelado(self) -> bool:
+        return self.cancelamento is not None and self.cancelamento.is_set()
+    
+    def _com_prazo(self, funcao: Callable[[Optional[threading.Event]], Any], descricao: str, **origem: Any) -> Any:
+        """
+        Executa funcao(abortar) respeitando timeout_resposta e o cancelamento do debate.
+        
+        A chamada roda numa thread daemon. Se o prazo estourar (TimeoutError) ou o
+        debate for cancelado (TurnoCancelado), `abortar` é setado - um stream em
+        andamento é fechado no próximo chunk, encerrando a requisição ao provedor -
+        e a exceção é levantada sem esperar a thread. Uma chamada bloqueante sem
+        stream termina sozinha, limitada pelo timeout do cliente HTTP do LLM.
+        """
+        if not self.timeout_resposta and self.cancelamento is None:
+            return funcao(None)
+        abortar = threading.Event()
+        concluido = threading.Event()
+        resultado: Dict[str, Any] = {}
+        
+        def _executar():
+            try:
+                resultado["valor"] = funcao(abortar)
+            except BaseException as e:
+                resultado["erro"] = e
+            finally:
+                concluido.set()
+        
+        threading.Thread(target=_executar, name="debate-prazo", daemon=True).start()
+        limite = time.monotonic() + self.timeout_resposta if self.timeout_resposta else None
+        while True:
+            espera = INTERVALO_VERIFICACAO_CANCELAMENTO
+            if limite is not None:
+                espera = min(espera, max(0.0, limite - time.monotonic()))
+            if concluido.wait(espera):
+                break
+            if self._cancelado():
+                abortar.set()
+                raise TurnoCancelado(f"{descricao}: debate cancelado")
+            if limite is not None and time.monotonic() >= limite:
+                abortar.set()
+                self.metadados["timeouts"].append(dict(origem, prazo=self.timeout_resposta))
+                raise TimeoutError(f"{descricao} excedeu o limite de {self.timeout_resposta:g}s")
+        if "erro" in resultado:
+            raise resultado["erro"]
+        return resultado["valor"]
+    
+    def _emitir(self, tipo: str, dados: Dict[str, Any]) -> None:
+        """Repassa um evento ao callback; falhas no consumidor não interrompem o debate"""
+        if not self.ao_evento:
+            return
+        try:
+            self.ao_evento(tipo, dados)
+        except Exception as e:
+            logger.warning("Erro ao emitir evento '%s': %s", tipo, e)
+    
+    def _antecipar_contextos_rag(self) -> None:
+        """
+        Dispara as buscas RAG de todos os agentes em paralelo no início do debate.
+        
+        A busca depende só da pergunta: o embedding dela é calculado uma vez e
+        compartilhado, e cada turno espera só pela busca do seu agente
+        (_obter_contexto_rag), que em geral já terminou durante os turnos anteriores.
+        """
+        pendentes = {
+            idx: rag_manager for idx, rag_manager in self.rag_managers.items()
+            if rag_manager and idx not in self._contextos_rag and idx not in self._buscas_rag
+        }
+        if not pendentes:
+            return
+        futuros = {idx: Future() for idx in pendentes}
+        self._buscas_rag.update(futuros)
+        self.metadados["rag"]["antecipadas"] += len(futuros)
+        
+        def _buscar_agente(idx: int, rag_manager: Any, embedding: Optional[List[float]]) -> None:
+            try:
+                if embedding is not None:
+                    futuros[idx].set_result(rag_manager.get_context(self.pergunta, k=2, query_embedding=embedding))
+                else:
+                    futuros[idx].set_result(rag_manager.get_context(self.pergunta, k=2))
+            except BaseException as e:
+                futuros[idx].set_exception(e)
+        
+        def _buscar_todos() -> None:
+            embedding = None
+            embed = getattr(next(iter(pendentes.values())), "embed", None)
+            if callable(embed):
+                try:
+                    embedding = embed(self.pergunta)
+                except Exception as e:
+                    # Cada busca calcula o próprio embedding
+                    logger.warning("Embedding compartilhado da pergunta falhou: %s", e)
+            for idx, rag_manager in pendentes.items():
+                threading.Thread(
+                    target=_buscar_agente, args=(idx, rag_manager, embedding), name=f"rag-{idx}", daemon=True
+                ).start()
+        
+        threading.Thread(target=_buscar_todos, name="rag-antecipada", daemon=True).start()
+    
+    def _obter_contexto_rag(self, idx: int) -> str:
+        """Contexto RAG do agente: resultado da busca antecipada (ou busca na hora), uma vez por debate"""
+        if idx not in self._contextos_rag:
+            rag_context = ""
+            rag_manager = self.rag_managers.get(idx)
+            if rag_manager:
+                futuro = self._buscas_rag.get(idx)
+                if futuro is not None:
+                    buscar = lambda abortar: futuro.result()
+                else:
+                    buscar = lambda abortar: rag_manager.get_context(self.pergunta, k=2)
+                inicio = time.perf_counter()
+                try:
+                    rag_context = self._com_prazo(
+                        buscar,
+                        f"Busca RAG do agente {idx}",
+                        etapa="rag", agente=self.agentes_nomes_map.get(idx, idx)
+                    )
+                except TimeoutError as e:
+                    # Sem a base de conhecimento o agente ainda pode responder
+                    logger.warning("%s - turno segue sem contexto RAG", e)
+                finally:
+                    self.metadados["rag"]["espera_total"] = round(
+                        self.metadados["rag"]["espera_total"] + time.perf_counter() - inicio, 3
+                    )
+            self._contextos_rag[idx] = rag_context
+        return self._contextos_rag[idx]
+    
+    def _llm_agente(self, idx: int, agente: Agent) -> Any:
+        """LLM das chamadas diretas do agente: o modelo LangChain original, se houver"""
+        llm = self.llms_diretos.get(idx)
+        return llm if llm is not None else getattr(agente, "llm", None)
     
-    def _obter_contexto_anterior(self, historico: List[Dict]) -> str:
-        """Extrai o contexto das respostas anteriores, agrupadas por rodada"""
-        # Filtrar apenas respostas (ignorar pergunta, síntese, erros, etc)
-        respostas = [item for item in historico if item.get("tipo") == "resposta"]
+    def _provedor(self, idx: int, agente: Agent) -> str:
+        if idx not in self._provedores:
+            self._provedores[idx] = detectar_provedor(self._llm_agente(idx, agente))
+        return self._provedores[idx]
+    
+    def _orcamento_agente(self, idx: int, agente: Agent) -> int:
+        """Tokens de entrada do turno: janela do modelo do agente limitada por max_tokens_entrada"""
+        if idx not in self._orcamentos:
+            modelo, max_saida = self._modelo_llm(self._llm_agente(idx, agente))
+            self._orcamentos[idx] = orcamento_modelo(modelo, max_saida, self.max_tokens_entrada)
+        return self._orcamentos[idx]
+    
+    @staticmethod
+    def _modelo_llm(llm: Any) -> Tuple[Optional[str], int]:
+        """Nome do modelo e saída máxima configurados no LLM (LangChain ou crewai.LLM)"""
+        modelo = getattr(llm, "model_name", None) or getattr(llm, "model", None)
+        max_saida = (
+            getattr(llm, "max_tokens", None)
+            or getattr(llm, "max_output_tokens", None)
+            or MAX_TOKENS_SAIDA_PADRAO
+        )
+        return (str(modelo) if modelo else None), int(max_saida)
+    
+    def _registrar_ajustes_prompt(self, ajustes: List[Dict[str, Any]], **origem: Any) -> None:
+        """Guarda em metadados os segmentos cortados para caber no orçamento (origem: rodada/agente ou etapa)"""
+        for ajuste in ajustes:
+            registro = dict(origem, **ajuste)
+            self.metadados["ajustes_prompt"].append(registro)
+            logger.info(
+                "Prompt ajustado ao orçamento: segmento '%s' %s (%d -> %d tokens)",
+                ajuste["segmento"], ajuste["acao"], ajuste["tokens_antes"], ajuste["tokens_depois"],
+                extra=campos(**registro)
+            )
+    
+    def _montar_prompt_turno(
+        self,
+        idx: int,
+        agente: Agent,
+        contexto_anterior: str,
+        rag_context: str,
+        rodada: int,
+        num_rodadas: int
+    ) -> MontadorPrompt:
+        """
+        Monta o prompt de um turno do debate, do trecho mais estável ao menos estável:
+        persona, pergunta/instruções, contexto do usuário, transcrição, RAG e a vez do agente.
+        """
+        montador = MontadorPrompt(self._provedor(idx, agente), self._modelo_llm(self._llm_agente(idx, agente))[0])
+        montador.adicionar(
+            "persona",
+            montar_persona(agente.role, agente.goal, agente.backstory),
+            ESTABILIDADE_PERSONA,
+            ponto_cache=True
+        )
         
-        if not respostas:
-            return "Este é o início do debate. Seja o primeiro a dar sua opinião."
+        if rag_context:
+            consideracoes = (
+                "considerando o que outros participantes já disseram e as informações "
+                "da sua base de conhecimento quando relevantes."
+            )
+        else:
+            consideracoes = "considerando o que outros participantes já disseram."
+        montador.adicionar(
+            "pergunta",
+            f"Você está participando de um debate sobre: {self.pergunta}\n\n"
+            f"Quando for sua vez, dê sua opinião sobre a questão, {consideracoes}\n"
+            "Você pode concordar, discordar ou adicionar novas perspectivas.\n"
+            "Seja autêntico à sua personalidade e estilo de comunicação.\n"
+            "Mantenha sua resposta concisa mas impactante (2-3 parágrafos).",
+            ESTABILIDADE_PERGUNTA,
+            ponto_cache=True
+        )
+        if self.contexto_usuario:
+            montador.adicionar(
+                "contexto_usuario",
+                "Contexto adicional fornecido pelo usuário:\n" + compactar_conteudo("\n".join(self.contexto_usuario)),
+                ESTABILIDADE_CONTEXTO_USUARIO,
+                prioridade=PRIORIDADE_CONTEXTO_USUARIO,
+                min_tokens=MIN_TOKENS_SEGMENTO_OPCIONAL
+            )
+        # A transcrição só cresce no final, então fechar o breakpoint nela
+        # permite reaproveitar o cache no próximo turno deste agente
+        montador.adicionar(
+            "transcricao",
+            contexto_anterior,
+            ESTABILIDADE_TRANSCRICAO,
+            ponto_cache=True,
+            prioridade=PRIORIDADE_TRANSCRICAO,
+            min_tokens=MIN_TOKENS_CONTEXTO,
+            manter_fim=True,
+            cabecalho=CABECALHO_TRANSCRICAO,
+            truncar=truncar_transcricao
+        )
+        if rag_context:
+            montador.adicionar(
+                "rag",
+                f"Informações relevantes da sua base de conhecimento:\n{compactar_conteudo(rag_context)}",
+                ESTABILIDADE_RAG,
+                prioridade=PRIORIDADE_RAG,
+                min_tokens=MIN_TOKENS_SEGMENTO_OPCIONAL
+            )
+        vez = "Agora é sua vez de falar."
+        if num_rodadas > 1:
+            vez = f"Esta é a rodada {rodada} de {num_rodadas}. {vez}"
+        montador.adicionar("turno", vez, ESTABILIDADE_TURNO)
+        return montador
+    
+    def _chamar_agente(
+        self,
+        idx: int,
+        agente: Agent,
+        montador: MontadorPrompt,
+        abortar: Optional[threading.Event] = None
+    ) -> Tuple[str, Optional[Dict[str, int]]]:
+        """
+        Executa um turno do agente com o prompt montado (ver _chamar_llm).
+        
+        Agentes com LLM de reserva e sem ferramentas passam pelo hedge
+        (_chamar_com_hedge). A latência de cada turno concluído entra nas
+        métricas do provedor do agente.
+        """
+        nome = self.agentes_nomes_map.get(idx, agente.role)
+        provedor = self._provedor(idx, agente)
+        llm = self._llm_agente(idx, agente)
+        reserva = self.reservas_llm.get(idx)
+        inicio = time.perf_counter()
+        with self._inicio_lock:
+            if self.inicio_primeira_chamada is None or inicio < self.inicio_primeira_chamada:
+                self.inicio_primeira_chamada = inicio
+        if reserva and not getattr(agente, "tools", None) and _chamada_direta(llm) and _chamada_direta(reserva["llm"]):
+            resposta, hedge, venceu_reserva = self._chamar_com_hedge(nome, llm, reserva, montador, abortar)
+            duracao = time.perf_counter() - inicio
+            if abortar is None or not abortar.is_set():
+                economia = metricas_provedores.registrar_chamada(
+                    provedor, duracao, com_reserva=True, hedge=hedge, venceu_reserva=venceu_reserva
+                )
+                if hedge:
+                    self.metadados["hedges"].append({
+                        "agente": nome,
+                        "provedor": provedor,
+                        "vencedor": "reserva" if venceu_reserva else "principal",
+                        "duracao": round(duracao, 3),
+                        "latencia_economizada": round(economia, 3) if economia is not None else None
+                    })
+            return resposta
+        resposta = self._chamar_llm(agente, montador, nome, abortar, llm=llm)
+        if abortar is None or not abortar.is_set():
+            metricas_provedores.registrar_chamada(provedor, time.perf_counter() - inicio)
+        return resposta
+    
+    def _chamar_com_hedge(
+        self,
+        nome: str,
+        llm: Any,
+        reserva: Dict[str, Any],
+        montador: MontadorPrompt,
+        abortar: Optional[threading.Event] = None
+    ) -> Tuple[Tuple[str, Optional[Dict[str, int]]], bool, bool]:
+        """
+        Chama o LLM principal e, se ele não produzir o primeiro token em
+        reserva["limiar"] segundos (ou falhar antes), envia o mesmo prompt ao
+        LLM de reserva. Vale a resposta que terminar primeiro; a outra é abortada.
+        Um crewai.LLM nativo (sem stream) não sinaliza o primeiro token: a
+        reserva entra sempre que ele não termina dentro do limiar.
         
-        # Agrupar respostas por rodada
-        # Cada rodada tem N respostas (onde N = número de agentes)
-        num_agentes = len(self.agentes)
-        rodadas = []
+        Depois do hedge os tokens não são emitidos (as duas respostas chegariam
+        intercaladas): o cliente recebe a resposta vencedora no evento "turno".
+        
+        Returns:
+            ((texto, uso), hedge acionado, reserva venceu)
+        """
+        concluidos: queue.Queue = queue.Queue()
+        estados: Dict[str, Tuple[Any, Optional[BaseException]]] = {}
+        paradas: Dict[str, threading.Event] = {}
+        sinal_principal = threading.Event()  # Primeiro token ou fim da chamada principal
+        silenciar = threading.Event()
         
-        for i in range(0, len(respostas), num_agentes):
-            rodada_num = (i // num_agentes) + 1
-            respostas_rodada = respostas[i:i + num_agentes]
+        def _iniciar(rotulo: str, llm_tentativa: Any, sinal: Optional[threading.Event]) -> None:
+            parar = paradas[rotulo] = threading.Event()
             
-            # Formatar respostas da rodada
-            respostas_formatadas = []
-            for resposta in respostas_rodada:
-                agente_nome = resposta.get('agente', 'Desconhecido')
-                conteudo = resposta.get('conteudo', '')
-                respostas_formatadas.append(f"{agente_nome}: {conteudo}")
+            def _executar():
+                try:
+                    estados[rotulo] = (self._agendar(
+                        llm_tentativa, montador,
+                        lambda: self._chamar_llm_direto(nome, llm_tentativa, montador, parar, sinal, silenciar),
+                        parar
+                    ), None)
+                except Exception as e:
+                    estados[rotulo] = (None, e)
+                finally:
+                    if sinal is not None:
+                        sinal.set()
+                    concluidos.put(rotulo)
             
-            # Adicionar marcador de rodada e respostas
-            rodadas.append(f"--- RODADA {rodada_num} ---")
-            rodadas.extend(respostas_formatadas)
-            rodadas.append("")  # Linha em branco entre rodadas
+            threading.Thread(target=_executar, name=f"hedge-{rotulo}", daemon=True).start()
         
-        # Remover última linha em branco se existir
-        if rodadas and rodadas[-1] == "":
-            rodadas.pop()
+        _iniciar("principal", llm, sinal_principal)
+        sem_token = not sinal_principal.wait(reserva["limiar"])
+        erro_principal = estados.get("principal", (None, None))[1]
+        hedge = sem_token or erro_principal is not None
+        if hedge:
+            logger.info(
+                "Hedge: %s %s - acionando LLM de reserva", nome,
+                f"sem primeiro token em {reserva['limiar']:g}s" if sem_token else f"falhou ({erro_principal})",
+                extra=campos(agente=nome)
+            )
+            silenciar.set()
+            _iniciar("reserva", reserva["llm"], None)
+        
+        pendentes = len(paradas)
+        ultimo_erro: Optional[BaseException] = None
+        while pendentes:
+            try:
+                rotulo = concluidos.get(timeout=INTERVALO_VERIFICACAO_CANCELAMENTO)
+            except queue.Empty:
+                if abortar is not None and abortar.is_set():
+                    # Prazo ou cancelamento (_com_prazo já levantou a exceção): encerrar as duas chamadas
+                    for parar in paradas.values():
+                        parar.set()
+                    return ("", None), hedge, False
+                continue
+            pendentes -= 1
+            resposta, erro = estados[rotulo]
+            if erro is None:
+                for outro, parar in paradas.items():
+                    if outro != rotulo:
+                        parar.set()
+                return resposta, hedge, rotulo == "reserva"
+            ultimo_erro = erro
+        raise ultimo_erro
+    
+    def _chamar_llm(
+        self,
+        agente: Agent,
+        montador: MontadorPrompt,
+        nome: str,
+        abortar: Optional[threading.Event] = None,
+        emitir_tokens: bool = True,
+        llm: Any = None
+    ) -> Tuple[str, Optional[Dict[str, int]]]:
+        """
+        Envia o prompt montado ao LLM do agente (ou a `llm`, o modelo
+        LangChain que o Agent recebeu - ver llms_diretos).
         
-        return "\n".join(rodadas)
+        Retorna o texto da resposta e o uso de tokens informado pelo provedor
+        (None se indisponível). Sem ferramentas o agente não precisa do loop
+        de execução do CrewAI, então o LLM é chamado direto com as mensagens
+        (persona como system, cache_control na Anthropic):
+        - modelos LangChain (invoke/stream): com ao_evento, os tokens são
+          emitidos (evento "token") à medida que chegam;
+        - crewai.LLM (call): o Agent converte os modelos LangChain para ele;
+          sem stream, o uso vem da diferença no resumo de tokens do LLM.
+        Agentes com ferramentas executam a task direto no agente, sem montar
+        uma Crew a cada turno. `abortar` (ver _com_prazo) interrompe o stream.
+        Com emitir_tokens=False (chamadas internas, como os resumos da
+        síntese) a resposta não é emitida em tokens.
+        Toda chamada passa pelo agendador compartilhado (ver _agendar).
+        """
+        if llm is None:
+            llm = getattr(agente, "llm", None)
+        if not getattr(agente, "tools", None):
+            if hasattr(llm, "invoke"):
+                if self.ao_evento and emitir_tokens and _tem_stream(llm):
+                    return self._agendar(
+                        llm, montador, lambda: self._chamar_llm_em_stream(nome, llm, montador, abortar), abortar
+                    )
+                mensagem = self._agendar(llm, montador, lambda: llm.invoke(montador.mensagens()), abortar)
+                return _texto_conteudo(getattr(mensagem, "content", mensagem)), extrair_uso_tokens(mensagem)
+            if callable(getattr(llm, "call", None)):
+                return self._agendar(llm, montador, lambda: self._chamar_llm_direto(nome, llm, montador), abortar)
+        
+        task = Task(
+            description=montador.texto(),
+            agent=agente,
+            expected_output="Uma resposta clara e autêntica sobre a questão do debate"
+        )
+        # Com ferramentas a task pode fazer várias chamadas ao LLM; o agendador controla a primeira
+        saida = self._agendar(llm, montador, lambda: task.execute_sync(agent=agente), abortar)
+        texto = str(saida.raw) if hasattr(saida, "raw") else str(saida)
+        return texto, extrair_uso_tokens(saida)
+    
+    def _agendar(
+        self,
+        llm: Any,
+        montador: MontadorPrompt,
+        funcao: Callable[[], Any],
+        abortar: Optional[threading.Event] = None
+    ) -> Any:
+        """
+        Executa a chamada ao provedor pelo agendador compartilhado: limites de
+        requisições/tokens por minuto da chave, prioridade interativa e retry
+        com backoff em 429. Os tokens reservados são o prompt mais a saída máxima.
+        """
+        _, max_saida = self._modelo_llm(llm)
+        return agendador_llm.executar(
+            funcao,
+            detectar_provedor(llm),
+            chave_do_llm(llm),
+            tokens=montador.contar_tokens() + max_saida,
+            prioridade=PRIORIDADE_INTERATIVA,
+            cancelamento=abortar or self.cancelamento
+        )
+    
+    def _chamar_llm_direto(
+        self,
+        nome: str,
+        llm: Any,
+        montador: MontadorPrompt,
+        abortar: Optional[threading.Event] = None,
+        primeiro_token: Optional[threading.Event] = None,
+        silenciar: Optional[threading.Event] = None
+    ) -> Tuple[str, Optional[Dict[str, int]]]:
+        """
+        Chama o LLM com as mensagens, sem o loop de execução do CrewAI.
+        
+        Modelos LangChain vão em stream (ver _chamar_llm_em_stream). O
+        crewai.LLM vai por call: sem primeiro token e sem como interromper;
+        o uso vem da diferença no resumo de tokens do LLM.
+        """
+        if _tem_stream(llm):
+            return self._chamar_llm_em_stream(nome, llm, montador, abortar, primeiro_token, silenciar)
+        uso_antes = _resumo_uso_llm(llm)
+        resposta = llm.call(montador.mensagens())
+        return str(resposta), diferenca_uso_tokens(uso_antes, _resumo_uso_llm(llm))
+    
+    def _chamar_llm_em_stream(
+        self,
+        nome: str,
+        llm: Any,
+        montador: MontadorPrompt,
+        abortar: Optional[threading.Event] = None,
+        primeiro_token: Optional[threading.Event] = None,
+        silenciar: Optional[threading.Event] = None
+    ) -> Tuple[str, Optional[Dict[str, int]]]:
+        """
+        Chama o LLM em stream emitindo cada pedaço de texto; os chunks somados trazem o uso de tokens.
+        
+        Com `abortar` setado o gerador é fechado, o que encerra a conexão com o provedor.
+        `primeiro_token` é setado no primeiro chunk e, com `silenciar` setado,
+        os tokens deixam de ser emitidos (ver _chamar_com_hedge).
+        """
+        partes: List[str] = []
+        mensagem = None
+        fluxo = llm.stream(montador.mensagens())
+        try:
+            for chunk in fluxo:
+                if abortar is not None and abortar.is_set():
+                    break
+                if primeiro_token is not None:
+                    primeiro_token.set()
+                mensagem = chunk if mensagem is None else mensagem + chunk
+                texto = _texto_conteudo(getattr(chunk, "content", ""))
+                if texto:
+                    partes.append(texto)
+                    if silenciar is None or not silenciar.is_set():
+                        self._emitir("token", {"agente": nome, "conteudo": texto})
+        finally:
+            fechar = getattr(fluxo, "close", None)
+            if callable(fechar):
+                fechar()
+        return "".join(partes), extrair_uso_tokens(mensagem)
+    
+    def _registrar_metricas_turno(
+        self,
+        rodada: int,
+        agente_nome: str,
+        montador: MontadorPrompt,
+        contexto_anterior: str,
+        resultado: str,
+        uso: Optional[Dict[str, int]],
+        duracao: Optional[float] = None
+    ) -> None:
+        """Registra tokens e duração do turno; usa o uso informado pelo provedor quando existir"""
+        turno = {
+            "rodada": rodada,
+            "agente": agente_nome,
+            "duracao": round(duracao, 3) if duracao is not None else None,
+            "tokens_entrada": montador.contar_tokens(),
+            "tokens_contexto": contar_tokens(contexto_anterior),
+            "tokens_saida": contar_tokens(resultado),
+            "tokens_cache": None,
+            "proporcao_cache": None
+        }
+        if uso and uso.get("tokens_entrada"):
+            turno["tokens_entrada"] = uso["tokens_entrada"]
+            turno["tokens_saida"] = uso["tokens_saida"] or turno["tokens_saida"]
+            turno["tokens_cache"] = uso["tokens_cache"]
+            turno["proporcao_cache"] = round(uso["tokens_cache"] / uso["tokens_entrada"], 3)
+            
+            cache_prompt = self.metadados["cache_prompt"]
+            cache_prompt["tokens_entrada"] += uso["tokens_entrada"]
+            cache_prompt["tokens_cache"] += uso["tokens_cache"]
+            cache_prompt["proporcao"] = round(cache_prompt["tokens_cache"] / cache_prompt["tokens_entrada"], 3)
+        self.metadados["turnos"].append(turno)
+    
+    def gerar_sintese_com_agente(self) -> str:
+        """
+        Gera a síntese com o agente facilitador.
+        
+        Transcrições curtas vão inteiras num único prompt. Acima de
+        limiar_sintese_hierarquica tokens (ou de FRACAO_JANELA_SINTESE_DIRETA
+        da janela do facilitador) a síntese é hierárquica: as falas de cada
+        participante são resumidas em paralelo por MODELO_RESUMOS e o
+        facilitador sintetiza a partir dos resumos.
+        """
+        from agents import criar_facilitador, criar_llm_facilitador
+        
+        try:
+            # Criar agente facilitador (o modelo LangChain fica aqui para o stream da síntese)
+            logger.debug("Criando agente facilitador")
+            llm_facilitador = criar_llm_facilitador()
+            facilitador = criar_facilitador(llm=llm_facilitador)
+            
+            # Compilar todo o debate
+            logger.debug("Compilando histórico do debate")
+            debate_completo = self.obter_historico_formatado()
+            logger.debug("Histórico compilado: %d caracteres", len(debate_completo))
+            
+            modelo, max_saida = self._modelo_llm(llm_facilitador)
+            orcamento = orcamento_modelo(modelo, max_saida)
+            tokens_transcricao = contar_tokens(debate_completo, modelo)
+            resumo_continuo, restantes = self._resumo_continuo.concluir() if self._resumo_continuo else ("", [])
+            hierarquica = not resumo_continuo and tokens_transcricao > min(
+                self.limiar_sintese_hierarquica, int(orcamento * FRACAO_JANELA_SINTESE_DIRETA)
+            )
+            metricas = {"modo": "hierarquica" if hierarquica else "direta", "tokens_transcricao": tokens_transcricao}
+            if resumo_continuo:
+                # O resumo já cobre o debate; só as falas que ele ainda não incorporou vão na íntegra
+                metricas_resumo = dict(self._resumo_continuo.metricas)
+                metricas_resumo["duracao_total"] = round(metricas_resumo["duracao_total"], 3)
+                metricas.update(modo="continua", falas_fora_do_resumo=len(restantes), resumo_continuo=metricas_resumo)
+                cabecalho_material = "RESUMO DO DEBATE (atualizado a cada turno):\n"
+                material = resumo_continuo
+                if restantes:
+                    material += "\n\nFALAS FINAIS AINDA NÃO INCLUÍDAS NO RESUMO:\n" + compactar_conteudo("\n\n".join(restantes))
+            elif hierarquica:
+                inicio = time.perf_counter()
+                resumos = self._resumir_participantes()
+                metricas["resumos"] = len(resumos)
+                metricas["duracao_resumos"] = round(time.perf_counter() - inicio, 3)
+                metricas["tokens_resumos"] = contar_tokens("\n\n".join(resumos), modelo)
+                cabecalho_material = "RESUMO DAS FALAS DE CADA PARTICIPANTE:\n"
+                material = "\n\n".join(resumos)
+            else:
+                cabecalho_material = "DEBATE COMPLETO:\n"
+                material = compactar_conteudo(debate_completo)
+            logger.info(
+                "Síntese %s (transcrição com %d tokens)", metricas["modo"], tokens_transcricao,
+                extra=campos(etapa="sintese", **metricas)
+            )
+            
+            montador = MontadorPrompt(detectar_provedor(llm_facilitador), modelo)
+            montador.adicionar(
+                "persona",
+                montar_persona(facilitador.role, facilitador.goal, facilitador.backstory),
+                ESTABILIDADE_PERSONA
+            )
+            montador.adicionar(
+                "instrucoes",
+                compactar_template(f"""
+                    Você é um facilitador experiente. Analise o seguinte debate e crie uma síntese final completa.
+                    
+                    PERGUNTA DO DEBATE: {self.pergunta}
+                """),
+                ESTABILIDADE_PERGUNTA
+            )
+            # No modo sintese o contexto do usuário é a própria transcrição (já resumida se hierárquica)
+            if self.contexto_usuario and not (hierarquica and self.should_generate_summary):
+                montador.adicionar(
+                    "contexto_usuario",
+                    "CONTEXTO ADICIONAL DO USUÁRIO:\n" + compactar_conteudo("\n".join(self.contexto_usuario)),
+                    ESTABILIDADE_CONTEXTO_USUARIO,
+                    prioridade=PRIORIDADE_CONTEXTO_USUARIO,
+                    min_tokens=MIN_TOKENS_SEGMENTO_OPCIONAL
+                )
+            montador.adicionar(
+                "transcricao",
+                material,
+                ESTABILIDADE_TRANSCRICAO,
+                prioridade=PRIORIDADE_TRANSCRICAO,
+                min_tokens=MIN_TOKENS_CONTEXTO,
+                manter_fim=True,
+                cabecalho=cabecalho_material
+            )
+            montador.adicionar(
+                "tarefa",
+                compactar_template("""
+                    Sua tarefa é criar uma síntese profissional que:
+                    1. Resuma os principais pontos levantados por cada participante
+                    2. Identifique áreas de consenso e divergência entre os participantes
+                    3. Destaque os argumentos mais relevantes e impactantes
+                    4. Apresente conclusões ou insights finais úteis para o usuário
+                    5. Seja clara, concisa e objetiva (3-4 parágrafos bem estruturados)
+                    
+                    Formate a síntese de forma profissional e estruturada, facilitando o entendimento
+                    do usuário sobre todos os aspectos discutidos no debate.
+                """),
+                ESTABILIDADE_TURNO
+            )
+            # A síntese não usa max_tokens_entrada: ela precisa do debate inteiro,
+            # limitado só pela janela do modelo do facilitador
+            ajustes = montador.ajustar_ao_orcamento(orcamento)
+            self._registrar_ajustes_prompt(ajustes, etapa="sintese")
+            
+            logger.debug("Executando síntese com o facilitador")
+            sintese_texto, uso = self._com_prazo(
+                lambda abortar: self._chamar_llm(facilitador, montador, "Facilitador", abortar, llm=llm_facilitador),
+                "Síntese do facilitador",
+                etapa="sintese"
+            )
+            if uso:
+                metricas.update(tokens_entrada=uso["tokens_entrada"], tokens_saida=uso["tokens_saida"])
+            self.metadados["sintese"] = metricas
+            
+            logger.debug("Síntese extraída: %d caracteres", len(sintese_texto))
+            return sintese_texto
+            
+        except Exception as e:
+            error_msg = f"Erro ao gerar síntese: {str(e)}"
+            logger.exception(error_msg, extra=campos(etapa="sintese"))
+            return error_msg
+    
+    def _obter_resumidor(self) -> Agent:
+        """Agente (modelo MODELO_RESUMOS) dos resumos da síntese, criado uma vez por debate"""
+        from agents import criar_facilitador
+        if self._resumidor is None:
+            self._resumidor = criar_facilitador(MODELO_RESUMOS)
+        return self._resumidor
+    
+    def _atualizar_resumo_continuo(self, resumo_atual: str, falas: List[str]) -> str:
+        """Callback do ResumoContinuo: incorpora as novas falas ao resumo (thread própria, modelo barato)"""
+        resumidor = self._obter_resumidor()
+        modelo, max_saida = self._modelo_llm(getattr(resumidor, "llm", None))
+        montador = MontadorPrompt(detectar_provedor(getattr(resumidor, "llm", None)), modelo)
+        montador.adicionar("instrucoes", f"Debate sobre: {self.pergunta}", ESTABILIDADE_PERGUNTA)
+        montador.adicionar(
+            "resumo",
+            "RESUMO ATÉ AGORA:\n" + (resumo_atual or "(o debate acabou de começar)"),
+            ESTABILIDADE_TRANSCRICAO
+        )
+        montador.adicionar(
+            "transcricao",
+            compactar_conteudo("\n\n".join(falas)),
+            ESTABILIDADE_RAG,
+            prioridade=PRIORIDADE_TRANSCRICAO,
+            min_tokens=MIN_TOKENS_CONTEXTO,
+            manter_fim=True,
+            cabecalho="NOVAS FALAS:\n"
+        )
+        montador.adicionar(
+            "tarefa",
+            compactar_template("""
+                Reescreva o resumo incorporando as novas falas, em até 300 palavras: por participante,
+                a posição e os argumentos mais fortes (e mudanças de posição), e depois os pontos de
+                consenso e de divergência. Responda só com o resumo atualizado.
+            """),
+            ESTABILIDADE_TURNO
+        )
+        self._registrar_ajustes_prompt(
+            montador.ajustar_ao_orcamento(orcamento_modelo(modelo, max_saida)), etapa="resumo_continuo"
+        )
+        try:
+            texto, _ = self._com_prazo(
+                lambda abortar: self._chamar_llm(resumidor, montador, "Facilitador", abortar, emitir_tokens=False),
+                "Atualização do resumo contínuo",
+                etapa="resumo_continuo"
+            )
+        except Exception as e:
+            logger.warning("Resumo contínuo não atualizado: %s", e, extra=campos(etapa="resumo_continuo"))
+            raise
+        return texto
+    
+    def _resumir_participantes(self) -> List[str]:
+        """
+        Etapa "map" da síntese hierárquica: um resumo por participante, em
+        paralelo (limitado pela concorrência do provedor, como no modo painel).
+        Se o resumo de alguém falhar, entra a última fala dele.
+        """
+        falas: Dict[str, List[str]] = {}  # agente -> falas na ordem do debate
+        for item in self.historico:
+            if item.tipo is TipoTurno.RESPOSTA:
+                falas.setdefault(item.agente, []).append(f"[Rodada {item.rodada or 1}] {item.conteudo}")
+        if not falas:
+            return []
+        resumidor = self._obter_resumidor()
+        semaforo = _semaforo_provedor(detectar_provedor(getattr(resumidor, "llm", None)))
+        
+        def _resumir_com_limite(nome: str, textos: List[str]) -> str:
+            with semaforo:
+                return self._resumir_falas(resumidor, nome, textos)
+        
+        with ThreadPoolExecutor(max_workers=len(falas), thread_name_prefix="resumo") as executor:
+            futuros = {nome: executor.submit(_resumir_com_limite, nome, textos) for nome, textos in falas.items()}
+            resumos = []
+            for nome, futuro in futuros.items():
+                try:
+                    resumo = futuro.result()
+                except TurnoCancelado:
+                    raise
+                except Exception as e:
+                    logger.warning("Resumo de %s falhou (%s) - usando a última fala", nome, e, extra=campos(etapa="resumo", agente=nome))
+                    resumo = falas[nome][-1]
+                resumos.append(f"**{nome}:**\n{resumo}")
+        return resumos
+    
+    def _resumir_falas(self, resumidor: Agent, nome: str, falas: List[str]) -> str:
+        """Resumo das falas de um participante, preservando a evolução da posição ao longo das rodadas"""
+        modelo, max_saida = self._modelo_llm(getattr(resumidor, "llm", None))
+        montador = MontadorPrompt(detectar_provedor(getattr(resumidor, "llm", None)), modelo)
+        montador.adicionar(
+            "instrucoes",
+            f"Debate sobre: {self.pergunta}\n\nFalas de {nome}, em ordem:",
+            ESTABILIDADE_PERGUNTA
+        )
+        montador.adicionar(
+            "transcricao",
+            compactar_conteudo("\n\n".join(falas)),
+            ESTABILIDADE_TRANSCRICAO,
+            prioridade=PRIORIDADE_TRANSCRICAO,
+            min_tokens=MIN_TOKENS_CONTEXTO,
+            manter_fim=True
+        )
+        montador.adicionar(
+            "tarefa",
+            compactar_template(f"""
+                Resuma as falas de {nome} em até 200 palavras: a posição central, os argumentos
+                e dados mais fortes, como a posição mudou entre as rodadas e com quais
+                participantes concordou ou discordou. Não acrescente opiniões próprias.
+            """),
+            ESTABILIDADE_TURNO
+        )
+        self._registrar_ajustes_prompt(
+            montador.ajustar_ao_orcamento(orcamento_modelo(modelo, max_saida)), etapa="resumo", agente=nome
+        )
+        texto, _ = self._com_prazo(
+            lambda abortar: self._chamar_llm(resumidor, montador, nome, abortar, emitir_tokens=False),
+            f"Resumo das falas de {nome}",
+            etapa="resumo", agente=nome
+        )
+        return texto
+    
+    def _obter_contexto_anterior(self, rodada_atual: int = 1, max_tokens: Optional[int] = None) -> str:
+        """Extrai o contexto das respostas anteriores, agrupadas por rodada (ver TranscricaoIncremental.contexto)"""
+        return self._transcricao.contexto(rodada_atual, max_tokens)
 
-    def _build_history_from_context(self) -> List[Dict]:
+    def _build_history_from_context(self) -> List[Turno]:
         historico = []
         for entry in self.contexto_usuario:
             agente, sep, conteudo = entry.partition(': ')
-            historico.append({
-                "tipo": "resposta",
-                "conteudo": conteudo if conteudo else entry,
-                "agente": agente if agente else "Contexto"
-            })
+            historico.append(Turno(
+                TipoTurno.RESPOSTA,
+                conteudo if conteudo else entry,
+                agente=agente if agente else "Contexto"
+            ))
         return historico
     
     def obter_historico_formatado(self) -> str:
@@ -335,17 +1415,6 @@ class DebateCrew:
         if not self.historico:
             return "Nenhum debate realizado ainda."
         
-        formato = []
-        for item in self.historico:
-            # Ignorar síntese no histórico formatado (será gerada separadamente)
-            if item["tipo"] in ["sintese", "sintese_conteudo"]:
-                continue
-            if item["tipo"] == "pergunta":
-                formato.append(f"**🤔 PERGUNTA:** {item['conteudo']}\n")
-            elif item["tipo"] == "resposta":
-                formato.append(f"**{item['agente']}:**\n{item['conteudo']}\n")
-            elif item["tipo"] == "erro":
-                formato.append(f"⚠️ {item['conteudo']}\n")
-        
-        return "\n".join(formato)
+        # Ignora a síntese (exibida separadamente)
+        return "\n".join(formatar_historico(self.historico))
 
@@ -0,0 +1,203 @@
+"""
+Execução de debates em segundo plano (jobs)
+
+A rota de debate enfileira o job e responde na hora com o job_id; o debate
+roda numa thread própria assim que o agendador de debates libera a vaga, e o
+estado do job é atualizado pelos mesmos eventos que o DebateCrew emite para o
+streaming (ao_evento).
+"""
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from debate_scheduler import AgendadorDebates, Vaga, VagaCancelada, agendador_debates
+from log_utils import campos, obter_logger
+
+logger = obter_logger("jobs")
+
+# Tempo (segundos) que jobs finalizados continuam disponíveis para consulta
+TTL_JOB_FINALIZADO = int(os.getenv("DEBATE_JOB_TTL", "3600"))
+
+STATUS_PENDENTE = "pendente"
+STATUS_EXECUTANDO = "executando"
+STATUS_CONCLUIDO = "concluido"
+STATUS_ERRO = "erro"
+STATUS_CANCELADO = "cancelado"
+STATUS_FINAIS = {STATUS_CONCLUIDO, STATUS_ERRO, STATUS_CANCELADO}
+
+
+class DebateJob:
+    """Estado de um debate em segundo plano, atualizado a partir dos eventos do DebateCrew"""
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = STATUS_PENDENTE
+        self.criado_em = time.time()
+        self.iniciado_em: Optional[float] = None
+        self.finalizado_em: Optional[float] = None
+        self.total_turnos: Optional[int] = None
+        self.turnos_concluidos = 0
+        self.rodada_atual: Optional[int] = None
+        self.agente_atual: Optional[str] = None
+        self.historico: List[Dict[str, Any]] = []  # Transcrição parcial (pergunta, turnos, síntese)
+        self.resultado: Optional[Dict[str, Any]] = None
+        self.erro: Optional[Dict[str, Any]] = None
+        self.cancelamento = threading.Event()
+        self.vaga: Optional[Vaga] = None
+        self.posicao_fila: Optional[int] = None
+        self.ao_finalizar: Optional[Callable[["DebateJob"], None]] = None
+        self._lock = threading.Lock()
+
+    def registrar_evento(self, tipo: str, dados: Dict[str, Any]) -> None:
+        """Callback ao_evento do DebateCrew"""
+        with self._lock:
+            if tipo == "inicio":
+                self.total_turnos = dados.get("num_rodadas", 0) * len(dados.get("agentes", []))
+            elif tipo == "turno_inicio":
+                self.rodada_atual = dados.get("rodada")
+                self.agente_atual = dados.get("agente")
+            elif tipo in ("turno", "erro"):
+                self.turnos_concluidos += 1
+                self.agente_atual = None
+                self.historico.append(dados)
+            elif tipo == "pergunta":
+                self.historico.append(dados)
+            elif tipo == "sintese_inicio":
+                self.agente_atual = "Facilitador"
+            elif tipo == "sintese":
+                self.agente_atual = None
+                self.historico.append(dados)
+
+    def historico_desde(self, inicio: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.historico[inicio:])
+
+    def para_dict(self) -> Dict[str, Any]:
+        """Resumo do status para a API (sem o histórico)"""
+        with self._lock:
+            fim = self.finalizado_em or time.time()
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "turnos_concluidos": self.turnos_concluidos,
+                "total_turnos": self.total_turnos,
+                "rodada_atual": self.rodada_atual,
+                "agente_atual": self.agente_atual,
+                "tempo_decorrido": round(fim - (self.iniciado_em or fim), 2),
+                "tempo_na_fila": round((self.iniciado_em or fim) - self.criado_em, 2),
+                "posicao_fila": self.posicao_fila if self.status == STATUS_PENDENTE else None,
+                "itens_historico": len(self.historico),
+                "resultado": self.resultado,
+                "erro": self.erro,
+            }
+
+
+class DebateJobManager:
+    """
+    Guarda o estado dos jobs e os executa conforme o agendador de debates libera vagas.
+
+    A função submetida recebe o DebateJob (para repassar job.registrar_evento
+    e job.cancelamento ao DebateCrew) e retorna o dicionário de resultado.
+    Os jobs disputam as mesmas vagas (e a mesma fila por cliente) que os
+    debates síncronos e por stream.
+    """
+
+    def __init__(self, agendador: AgendadorDebates = agendador_debates, ttl_finalizados: int = TTL_JOB_FINALIZADO):
+        self.agendador = agendador
+        self.ttl_finalizados = ttl_finalizados
+        self._jobs: Dict[str, DebateJob] = {}
+        self._lock = threading.Lock()
+
+    def submeter(
+        self,
+        funcao: Callable[[DebateJob], Dict[str, Any]],
+        cliente: str = "anonimo",
+        ao_finalizar: Optional[Callable[[DebateJob], None]] = None
+    ) -> DebateJob:
+        """
+        Reserva a vaga do cliente (FilaCheia se a fila está cheia) e cria o job.
+        ao_finalizar recebe o job ao chegar a um status final (inclusive cancelado na fila).
+        """
+        self._limpar_finalizados()
+        job = DebateJob(str(uuid.uuid4()))
+        job.ao_finalizar = ao_finalizar
+        job.vaga = self.agendador.reservar(cliente)
+        job.posicao_fila = self.agendador.posicao(job.vaga)
+        with self._lock:
+            self._jobs[job.id] = job
+        threading.Thread(target=self._executar, args=(job, funcao), name=f"debate-job-{job.id[:8]}", daemon=True).start()
+        logger.info("Job enfileirado", extra=campos(amostra=1.0, job_id=job.id, posicao_fila=job.posicao_fila))
+        return job
+
+    def obter(self, job_id: str) -> Optional[DebateJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancelar(self, job_id: str) -> Optional[DebateJob]:
+        """Pede o cancelamento; o debate para antes do próximo turno"""
+        job = self.obter(job_id)
+        if job and job.status not in STATUS_FINAIS:
+            logger.info("Cancelamento solicitado", extra=campos(amostra=1.0, job_id=job_id))
+            job.cancelamento.set()
+            if job.status == STATUS_PENDENTE:
+                # Ainda na fila: sai dela na hora (_executar vê a vaga encerrada e não executa)
+                self.agendador.encerrar(job.vaga)
+                self._finalizar(job, STATUS_CANCELADO)
+        return job
+
+    def _atualizar_posicao(self, job: DebateJob, posicao: int) -> None:
+        with job._lock:
+            job.posicao_fila = posicao
+
+    def _executar(self, job: DebateJob, funcao: Callable[[DebateJob], Dict[str, Any]]) -> None:
+        try:
+            self.agendador.aguardar(job.vaga, job.cancelamento, lambda posicao: self._atualizar_posicao(job, posicao))
+        except VagaCancelada:
+            # Cancelado ainda na fila: cancelar() já finalizou o job
+            return
+        if job.cancelamento.is_set():
+            self.agendador.encerrar(job.vaga)
+            return
+        with job._lock:
+            job.status = STATUS_EXECUTANDO
+            job.iniciado_em = time.time()
+            job.posicao_fila = None
+        try:
+            resultado = funcao(job)
+            with job._lock:
+                job.resultado = resultado
+            self._finalizar(job, STATUS_CANCELADO if job.cancelamento.is_set() else STATUS_CONCLUIDO)
+        except Exception as e:
+            logger.exception("Job falhou: %s", e, extra=campos(job_id=job.id))
+            with job._lock:
+                job.erro = {
+                    "status_code": getattr(e, "status_code", 500),
+                    "detail": getattr(e, "detail", None) or str(e),
+                }
+            self._finalizar(job, STATUS_ERRO)
+        finally:
+            self.agendador.encerrar(job.vaga)
+
+    def _finalizar(self, job: DebateJob, status: str) -> None:
+        with job._lock:
+            job.status = status
+            job.agente_atual = None
+            job.finalizado_em = time.time()
+        logger.info("Job finalizado", extra=campos(amostra=1.0, job_id=job.id, status=status))
+        if job.ao_finalizar:
+            try:
+                job.ao_finalizar(job)
+            except Exception as e:
+                logger.warning("Erro no ao_finalizar do job: %s", e, extra=campos(job_id=job.id))
+
+    def _limpar_finalizados(self) -> None:
+        limite = time.time() - self.ttl_finalizados
+        with self._lock:
+            expirados = [
+                job_id for job_id, job in self._jobs.items()
+                if job.status in STATUS_FINAIS and (job.finalizado_em or 0) < limite
+            ]
+            for job_id in expirados:
+                del self._jobs[job_id]
@@ -0,0 +1,221 @@
+"""
+Admissão de debates: limite de debates simultâneos, fila justa por cliente e descarte de carga
+
+Toda execução de debate (rota síncrona, stream SSE e jobs) pede uma vaga ao
+agendador antes de criar agentes e chamar LLMs:
+- até max_concurrent_debates (debate_config) debates rodam ao mesmo tempo;
+- os demais esperam numa fila atendida em rodízio entre clientes, para uma
+  rajada de um cliente não passar na frente de todos os outros;
+- com a fila em max_queue_size, ou o cliente já ocupando a sua parte dela,
+  o pedido é recusado (FilaCheia -> HTTP 429 com Retry-After estimado pela
+  duração média dos debates).
+"""
+import itertools
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional
+
+from log_utils import campos, obter_logger
+
+logger = obter_logger("admissao")
+
+MAX_SIMULTANEOS_PADRAO = 4
+MAX_FILA_PADRAO = 20
+# Duração (s) assumida para um debate até haver medições (usada no Retry-After)
+DURACAO_ESTIMADA_PADRAO = 60.0
+# Fração da fila que um único cliente pode ocupar (o resto fica para os outros clientes)
+FRACAO_FILA_POR_CLIENTE = 0.5
+PESO_MEDIA_MOVEL = 0.2
+# Frequência (s) com que quem espera na fila verifica o cancelamento
+INTERVALO_VERIFICACAO_FILA = 0.5
+
+
+class FilaCheia(Exception):
+    """Fila de debates cheia: o pedido foi descartado"""
+
+    def __init__(self, retry_after: int, na_fila: int, executando: int):
+        super().__init__(f"Fila de debates cheia ({na_fila} aguardando, {executando} em execução)")
+        self.retry_after = retry_after
+        self.na_fila = na_fila
+        self.executando = executando
+
+
+class VagaCancelada(Exception):
+    """O pedido foi cancelado enquanto aguardava na fila"""
+
+
+class Vaga:
+    """Pedido de execução de um debate: aguarda na fila até ser liberado"""
+
+    def __init__(self, cliente: str):
+        self.id = str(uuid.uuid4())
+        self.cliente = cliente
+        self.criada_em = time.monotonic()
+        self.liberada_em: Optional[float] = None
+        self.liberada = threading.Event()
+        self.encerrada = False
+
+    @property
+    def espera(self) -> float:
+        """Tempo (s) na fila até a liberação (ou até agora, se ainda aguarda)"""
+        return (self.liberada_em or time.monotonic()) - self.criada_em
+
+
+class AgendadorDebates:
+    """Vagas de execução e fila por cliente em rodízio (uma instância por processo)"""
+
+    def __init__(self, max_simultaneos: int = MAX_SIMULTANEOS_PADRAO, max_fila: int = MAX_FILA_PADRAO):
+        self.max_simultaneos = max(1, max_simultaneos)
+        self.max_fila = max(0, max_fila)
+        # cliente -> vagas aguardando; a ordem das chaves é a vez no rodízio
+        self._filas: "OrderedDict[str, deque]" = OrderedDict()
+        self._executando: Dict[str, Vaga] = {}
+        self._condicao = threading.Condition()
+        self._duracao_media = DURACAO_ESTIMADA_PADRAO
+        self._metricas = {"admitidos": 0, "recusados": 0, "cancelados_na_fila": 0, "espera_total": 0.0, "espera_maxima": 0.0}
+
+    def configurar(self, max_simultaneos: Optional[int] = None, max_fila: Optional[int] = None) -> None:
+        """Aplica os limites do debate_config (podem mudar pelo admin com o servidor no ar)"""
+        with self._condicao:
+            if max_simultaneos is not None:
+                self.max_simultaneos = max(1, int(max_simultaneos))
+            if max_fila is not None:
+                self.max_fila = max(0, int(max_fila))
+            self._despachar()
+
+    def _na_fila(self) -> int:
+        return sum(len(fila) for fila in self._filas.values())
+
+    def _ordem(self) -> List[Vaga]:
+        """Vagas na ordem em que serão liberadas: uma por cliente a cada volta do rodízio"""
+        filas = [list(fila) for fila in self._filas.values()]
+        return [
+            vaga
+            for volta in itertools.zip_longest(*filas)
+            for vaga in volta
+            if vaga is not None
+        ]
+
+    def _max_fila_cliente(self) -> int:
+        return max(1, math.ceil(self.max_fila * FRACAO_FILA_POR_CLIENTE))
+
+    def _retry_after(self) -> int:
+        voltas = (self._na_fila() + 1) / self.max_simultaneos
+        return max(1, math.ceil(self._duracao_media * voltas))
+
+    def _despachar(self) -> None:
+        # Chamado com self._condicao
+        while self._filas and len(self._executando) < self.max_simultaneos:
+            cliente, fila = next(iter(self._filas.items()))
+            vaga = fila.popleft()
+            # O cliente vai para o fim do rodízio (ou sai, se não tem mais pedidos)
+            del self._filas[cliente]
+            if fila:
+                self._filas[cliente] = fila
+            self._liberar(vaga)
+        self._condicao.notify_all()
+
+    def _liberar(self, vaga: Vaga) -> None:
+        vaga.liberada_em = time.monotonic()
+        self._executando[vaga.id] = vaga
+        self._metricas["admitidos"] += 1
+        self._metricas["espera_total"] += vaga.espera
+        self._metricas["espera_maxima"] = max(self._metricas["espera_maxima"], vaga.espera)
+        vaga.liberada.set()
+
+    def reservar(self, cliente: str) -> Vaga:
+        """
+        Pede uma vaga para o cliente. Retorna na hora: a vaga já liberada (há
+        capacidade e ninguém esperando) ou na fila. Lança FilaCheia se não cabe.
+        """
+        vaga = Vaga(cliente or "anonimo")
+        with self._condicao:
+            if not self._filas and len(self._executando) < self.max_simultaneos:
+                self._liberar(vaga)
+                return vaga
+            fila_cliente = len(self._filas.get(vaga.cliente, ()))
+            if self._na_fila() >= self.max_fila or fila_cliente >= self._max_fila_cliente():
+                self._metricas["recusados"] += 1
+                erro = FilaCheia(self._retry_after(), self._na_fila(), len(self._executando))
+                logger.warning(
+                    "Debate recusado: %s", erro,
+                    extra=campos(cliente=vaga.cliente, retry_after=erro.retry_after, na_fila=erro.na_fila)
+                )
+                raise erro
+            self._filas.setdefault(vaga.cliente, deque()).append(vaga)
+        logger.info(
+            "Debate na fila (posição %d)", self.posicao(vaga) or 0,
+            extra=campos(amostra=1.0, cliente=vaga.cliente, vaga=vaga.id)
+        )
+        return vaga
+
+    def posicao(self, vaga: Vaga) -> Optional[int]:
+        """Posição (1 = próxima) da vaga na ordem de liberação; None se já liberada ou encerrada"""
+        with self._condicao:
+            for indice, outra in enumerate(self._ordem(), start=1):
+                if outra is vaga:
+                    return indice
+        return None
+
+    def aguardar(
+        self,
+        vaga: Vaga,
+        cancelamento: Optional[threading.Event] = None,
+        ao_posicao: Optional[Callable[[int], None]] = None
+    ) -> None:
+        """Bloqueia até a vaga ser liberada; ao_posicao recebe cada nova posição na fila"""
+        ultima = None
+        while not vaga.liberada.is_set():
+            if vaga.encerrada or (cancelamento is not None and cancelamento.is_set()):
+                self.encerrar(vaga)
+                raise VagaCancelada("Debate cancelado enquanto aguardava na fila")
+            posicao = self.posicao(vaga)
+            if ao_posicao and posicao is not None and posicao != ultima:
+                ao_posicao(posicao)
+                ultima = posicao
+            with self._condicao:
+                if not vaga.liberada.is_set():
+                    self._condicao.wait(INTERVALO_VERIFICACAO_FILA)
+
+    def encerrar(self, vaga: Vaga) -> None:
+        """Devolve a vaga (debate terminou) ou tira o pedido da fila; pode ser chamado mais de uma vez"""
+        with self._condicao:
+            if vaga.encerrada:
+                return
+            vaga.encerrada = True
+            if self._executando.pop(vaga.id, None) is not None:
+                duracao = time.monotonic() - (vaga.liberada_em or vaga.criada_em)
+                self._duracao_media += PESO_MEDIA_MOVEL * (duracao - self._duracao_media)
+            else:
+                fila = self._filas.get(vaga.cliente)
+                if fila and vaga in fila:
+                    fila.remove(vaga)
+                    if not fila:
+                        del self._filas[vaga.cliente]
+                    self._metricas["cancelados_na_fila"] += 1
+            self._despachar()
+
+    def resumo(self) -> Dict[str, Any]:
+        """Ocupação, fila por cliente e esperas desde o início do processo"""
+        with self._condicao:
+            admitidos = self._metricas["admitidos"]
+            return {
+                "max_simultaneos": self.max_simultaneos,
+                "max_fila": self.max_fila,
+                "executando": len(self._executando),
+                "na_fila": self._na_fila(),
+                "fila_por_cliente": {cliente: len(fila) for cliente, fila in self._filas.items()},
+                "admitidos": admitidos,
+                "recusados": self._metricas["recusados"],
+                "cancelados_na_fila": self._metricas["cancelados_na_fila"],
+                "espera_media": round(self._metricas["espera_total"] / admitidos, 3) if admitidos else None,
+                "espera_maxima": round(self._metricas["espera_maxima"], 3),
+                "duracao_media": round(self._duracao_media, 2),
+            }
+
+
+# Instância do processo (compartilhada pelas rotas de debate e pelos jobs)
+agendador_debates = AgendadorDebates()
@@ -0,0 +1,260 @@
+"""
+Transcrição incremental do debate usada para montar o contexto de cada turno
+"""
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from log_utils import campos, obter_logger
+from token_utils import contar_tokens, truncar_para_tokens
+
+logger = obter_logger("transcricao")
+
+# Tamanho máximo (em caracteres) de cada resposta no resumo das rodadas antigas
+MAX_CARACTERES_RESUMO = 240
+
+INICIO_DEBATE = "Este é o início do debate. Seja o primeiro a dar sua opinião."
+CABECALHO_RESUMO = "RESUMO DAS RODADAS ANTERIORES:"
+# Rótulos das seções da transcrição (rodadas e resumo), cada um numa linha própria
+_RE_ROTULO_SECAO = re.compile(r"^(?:--- RODADA \d+ ---|" + re.escape(CABECALHO_RESUMO) + r")$", re.M)
+
+
+def _resumir_resposta(texto: str, max_caracteres: int = MAX_CARACTERES_RESUMO) -> str:
+    """Resumo extrativo: primeiras frases da resposta, sem quebras de linha"""
+    texto = re.sub(r"\s+", " ", str(texto)).strip()
+    if len(texto) <= max_caracteres:
+        return texto
+    corte = texto[:max_caracteres]
+    fim_frase = max(corte.rfind(". "), corte.rfind("! "), corte.rfind("? "))
+    if fim_frase > max_caracteres // 2:
+        return corte[:fim_frase + 1]
+    return corte.rsplit(" ", 1)[0] + "..."
+
+
+def truncar_transcricao(texto: str, max_tokens: int, modelo: Optional[str] = None) -> str:
+    """
+    Corta o início da transcrição (o fim é o mais recente) sem perder o rótulo
+    da seção em que o corte caiu: o rótulo da rodada (ou do resumo) é reposto
+    no início, para o agente saber de que rodada são as falas que sobraram.
+    """
+    cortado = truncar_para_tokens(texto, max_tokens, modelo, manter_fim=True)
+    rotulos = list(_RE_ROTULO_SECAO.finditer(texto))
+    if cortado == texto or not rotulos or rotulos[0].start() >= len(texto) - len(cortado):
+        return cortado
+    # Reservar os tokens do rótulo (mais a quebra de linha) e cortar de novo
+    reserva = max(contar_tokens(m.group(0), modelo) for m in rotulos) + 1
+    recortado = truncar_para_tokens(texto, max_tokens - reserva, modelo, manter_fim=True)
+    if not recortado:
+        return cortado
+    posicao = len(texto) - len(recortado)
+    rotulo = [m for m in rotulos if m.start() < posicao][-1]
+    if rotulo.end() > posicao:
+        # O corte caiu no meio do próprio rótulo: tirar o pedaço que sobrou dele
+        recortado = recortado[rotulo.end() - posicao:].lstrip("\n")
+    return rotulo.group(0) + "\n" + recortado
+
+
+class TranscricaoIncremental:
+    """
+    Transcrição append-only do debate.
+
+    Cada resposta é formatada, resumida e tem seus tokens contados uma única vez,
+    no momento em que entra na transcrição. Rodadas encerradas têm o texto
+    (e a contagem de tokens) guardados prontos, então montar o contexto de um
+    turno não depende do tamanho do histórico. Como os blocos já formatados
+    nunca mudam, o prefixo do contexto é idêntico byte a byte entre os turnos
+    de uma mesma rodada, o que permite o cache de prompt dos provedores.
+    """
+
+    def __init__(self, modelo_tokenizer: Optional[str] = None):
+        self.modelo_tokenizer = modelo_tokenizer
+        self._segmentos: List[str] = []  # Todas as respostas formatadas, em ordem
+        self._segmentos_por_rodada: Dict[int, List[str]] = {}
+        self._tokens_por_rodada: Dict[int, int] = {}
+        self._resumo_por_rodada: Dict[int, List[str]] = {}  # Linhas de resumo (com tokens) por rodada
+        self._tokens_resumo_por_rodada: Dict[int, List[int]] = {}
+        self._blocos_fechados: Dict[int, str] = {}  # rodada -> texto já unido da rodada encerrada
+        self._rodada_aberta: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._segmentos)
+
+    def adicionar(self, agente: str, conteudo: str, rodada: int) -> None:
+        """Adiciona uma resposta à transcrição (O(1) amortizado)"""
+        if self._rodada_aberta is not None and rodada != self._rodada_aberta:
+            self._fechar_rodada(self._rodada_aberta)
+        self._rodada_aberta = rodada
+
+        segmento = f"{agente}: {conteudo}"
+        self._segmentos.append(segmento)
+        self._segmentos_por_rodada.setdefault(rodada, []).append(segmento)
+        # +1 pela quebra de linha que une os segmentos
+        self._tokens_por_rodada[rodada] = (
+            self._tokens_por_rodada.get(rodada, contar_tokens(self._cabecalho_rodada(rodada), self.modelo_tokenizer))
+            + contar_tokens(segmento, self.modelo_tokenizer) + 1
+        )
+
+        linha_resumo = f"- {agente} (rodada {rodada}): {_resumir_resposta(conteudo)}"
+        self._resumo_por_rodada.setdefault(rodada, []).append(linha_resumo)
+        self._tokens_resumo_por_rodada.setdefault(rodada, []).append(
+            contar_tokens(linha_resumo, self.modelo_tokenizer) + 1
+        )
+
+    def _fechar_rodada(self, rodada: int) -> None:
+        if rodada not in self._blocos_fechados:
+            self._blocos_fechados[rodada] = self._unir_rodada(rodada)
+
+    @staticmethod
+    def _cabecalho_rodada(rodada: int) -> str:
+        return f"--- RODADA {rodada} ---"
+
+    def _unir_rodada(self, rodada: int) -> str:
+        return "\n".join([self._cabecalho_rodada(rodada)] + self._segmentos_por_rodada.get(rodada, []))
+
+    def _bloco_rodada(self, rodada: int) -> str:
+        bloco = self._blocos_fechados.get(rodada)
+        if bloco is None:
+            # Rodada em andamento: o join cobre só os segmentos desta rodada
+            bloco = self._unir_rodada(rodada)
+        return bloco
+
+    def contexto(self, rodada_atual: int, max_tokens: Optional[int] = None) -> str:
+        """
+        Contexto para um turno da rodada_atual.
+
+        Só a rodada atual e a anterior entram com o texto completo; rodadas mais
+        antigas viram um resumo compacto. Se ainda assim o contexto passar de
+        max_tokens, as linhas mais antigas do resumo são descartadas primeiro e
+        depois o início das rodadas completas é cortado (o final é o mais recente).
+        """
+        if not self._segmentos:
+            return INICIO_DEBATE
+
+        rodadas_completas = [
+            r for r in (rodada_atual - 1, rodada_atual) if r in self._segmentos_por_rodada
+        ]
+        rodadas_resumidas = sorted(
+            r for r in self._resumo_por_rodada if r < rodada_atual - 1
+        )
+
+        texto_rodadas = "\n\n".join(self._bloco_rodada(r) for r in rodadas_completas)
+
+        resumo: List[str] = []
+        tokens_resumo: List[int] = []
+        for r in rodadas_resumidas:
+            resumo.extend(self._resumo_por_rodada[r])
+            tokens_resumo.extend(self._tokens_resumo_por_rodada[r])
+
+        if max_tokens is not None:
+            tokens_rodadas = sum(self._tokens_por_rodada[r] for r in rodadas_completas)
+            if tokens_rodadas >= max_tokens:
+                return truncar_transcricao(texto_rodadas, max_tokens, self.modelo_tokenizer)
+            # Descartar as linhas mais antigas do resumo até caber no limite
+            orcamento_resumo = max_tokens - tokens_rodadas - contar_tokens(CABECALHO_RESUMO, self.modelo_tokenizer) - 2
+            total_resumo = sum(tokens_resumo)
+            inicio = 0
+            while inicio < len(resumo) and total_resumo > orcamento_resumo:
+                total_resumo -= tokens_resumo[inicio]
+                inicio += 1
+            resumo = resumo[inicio:]
+
+        if not resumo:
+            return texto_rodadas
+        texto_resumo = CABECALHO_RESUMO + "\n" + "\n".join(resumo)
+        if not texto_rodadas:
+            return texto_resumo
+        return texto_resumo + "\n\n" + texto_rodadas
+
+
+class ResumoContinuo:
+    """
+    Resumo do debate atualizado em segundo plano a cada turno.
+
+    `resumir(resumo_atual, novas_falas)` devolve o resumo com as falas
+    incorporadas. As atualizações rodam uma de cada vez numa thread própria,
+    em paralelo com o turno do próximo agente; falas que chegam enquanto uma
+    atualização está em andamento entram juntas na seguinte. Se uma
+    atualização falhar, o resumo anterior é mantido e as falas ficam pendentes.
+
+    `ao_atualizar(resumo, falas_no_resumo)` (opcional) recebe cada resumo
+    novo, na ordem, para ser gravado; uma falha ao gravar conta em
+    metricas["falhas"] e não interrompe o resumo. Com restaurar() um debate
+    retomado continua do resumo gravado.
+    """
+
+    def __init__(
+        self,
+        resumir: Callable[[str, List[str]], str],
+        ao_atualizar: Optional[Callable[[str, int], None]] = None
+    ):
+        self._resumir = resumir
+        self._ao_atualizar = ao_atualizar
+        self.resumo = ""
+        self.falas_no_resumo = 0  # Falas do debate já incorporadas, contando as de antes de uma retomada
+        self._pendentes: List[str] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._encerrado = False
+        self.metricas = {"atualizacoes": 0, "falhas": 0, "falas_incorporadas": 0, "duracao_total": 0.0}
+
+    def restaurar(self, resumo: str, falas_no_resumo: int) -> None:
+        """Parte de um resumo gravado que já cobre as primeiras falas_no_resumo falas (antes de adicionar)"""
+        with self._lock:
+            self.resumo = resumo
+            self.falas_no_resumo = falas_no_resumo
+
+    def adicionar(self, fala: str) -> None:
+        """Enfileira a fala e inicia uma atualização se nenhuma estiver em andamento"""
+        with self._lock:
+            if self._encerrado:
+                return
+            self._pendentes.append(fala)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._atualizar, name="resumo-continuo", daemon=True)
+                self._thread.start()
+
+    def _atualizar(self) -> None:
+        while True:
+            with self._lock:
+                lote = list(self._pendentes)
+                if not lote or self._encerrado:
+                    self._thread = None
+                    return
+                resumo_atual = self.resumo
+            inicio = time.perf_counter()
+            try:
+                novo = self._resumir(resumo_atual, lote)
+            except Exception:
+                with self._lock:
+                    self.metricas["falhas"] += 1
+                    self._thread = None
+                return
+            with self._lock:
+                self.resumo = novo
+                del self._pendentes[:len(lote)]
+                self.falas_no_resumo += len(lote)
+                falas_no_resumo = self.falas_no_resumo
+                self.metricas["atualizacoes"] += 1
+                self.metricas["falas_incorporadas"] += len(lote)
+                self.metricas["duracao_total"] += time.perf_counter() - inicio
+            if self._ao_atualizar is not None:
+                try:
+                    self._ao_atualizar(novo, falas_no_resumo)
+                except Exception as e:
+                    logger.warning("Falha ao gravar o resumo contínuo: %s", e, extra=campos(falas=falas_no_resumo))
+                    with self._lock:
+                        self.metricas["falhas"] += 1
+
+    def concluir(self) -> Tuple[str, List[str]]:
+        """
+        Espera a atualização em andamento (sem iniciar outra) e retorna o resumo
+        e as falas que ainda não foram incorporadas a ele.
+        """
+        with self._lock:
+            self._encerrado = True
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        with self._lock:
+            return self.resumo, list(self._pendentes)
@@ -0,0 +1,135 @@
+"""
+Item do histórico do debate (pergunta, turno, erro, síntese)
+
+O mesmo objeto circula pela orquestração (DebateCrew), pelos eventos (SSE,
+jobs, coalescência), pelo cache, pela resposta da API e pela gravação no
+banco. Turno guarda os campos em __slots__ (sem um dict por item) e o tipo
+como TipoTurno; as saídas são visões sobre os mesmos objetos, sem cópias
+intermediárias do histórico. O acesso como dicionário (item["tipo"],
+item.get("rodada"), dict(item)) continua valendo: campos None se comportam
+como chaves ausentes, igual aos dicts gravados antes.
+"""
+from collections.abc import Mapping
+from enum import Enum
+from typing import Any, Iterable, Iterator, Optional
+
+CAMPOS = ("tipo", "conteudo", "agente", "agente_role", "rodada", "timestamp", "agente_id", "agente_idx")
+
+
+class TipoTurno(str, Enum):
+    PERGUNTA = "pergunta"
+    RESPOSTA = "resposta"
+    ERRO = "erro"
+    SINTESE = "sintese"  # Formato antigo (título da síntese); só aparece em debates gravados
+    SINTESE_CONTEUDO = "sintese_conteudo"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+# Tipos que não entram na transcrição formatada (a síntese é exibida à parte).
+# Tupla e não set: o hash de um Enum roda em Python, a comparação por identidade não
+TIPOS_SINTESE = (TipoTurno.SINTESE, TipoTurno.SINTESE_CONTEUDO)
+
+
+class Turno(Mapping):
+    """
+    Registro de um item do histórico, com leitura compatível com o dict antigo.
+
+    Depois de registrado o item é compartilhado (eventos, cache, jobs): não é
+    alterado, só lido. agente_id (id do agente no banco) e agente_idx (posição
+    do agente no DebateCrew) identificam quem falou; agente é só o nome exibido.
+    """
+
+    __slots__ = CAMPOS
+
+    def __init__(
+        self,
+        tipo: Any,
+        conteudo: Any,
+        agente: Optional[str] = None,
+        agente_role: Optional[str] = None,
+        rodada: Optional[int] = None,
+        timestamp: Optional[str] = None,
+        agente_id: Optional[str] = None,
+        agente_idx: Optional[int] = None
+    ):
+        self.tipo = tipo if tipo.__class__ is TipoTurno else TipoTurno(tipo)
+        self.conteudo = conteudo
+        self.agente = agente
+        self.agente_role = agente_role
+        self.rodada = rodada
+        self.timestamp = timestamp
+        self.agente_id = agente_id
+        self.agente_idx = agente_idx
+
+    @classmethod
+    def de_dict(cls, dados: Mapping) -> "Turno":
+        """Turno a partir de um item no formato dict (o próprio objeto se já for um Turno)"""
+        if isinstance(dados, Turno):
+            return dados
+        return cls(**{campo: dados.get(campo) for campo in CAMPOS})
+
+    def substituir(self, **campos: Any) -> "Turno":
+        """Cópia com os campos informados trocados (o original continua igual)"""
+        valores = {campo: getattr(self, campo) for campo in CAMPOS}
+        valores.update(campos)
+        return Turno(**valores)
+
+    def __getitem__(self, chave: str) -> Any:
+        if chave in CAMPOS:
+            valor = getattr(self, chave)
+            if valor is not None:
+                return valor
+        raise KeyError(chave)
+
+    def get(self, chave: str, padrao: Any = None) -> Any:
+        valor = getattr(self, chave, None) if chave in CAMPOS else None
+        return padrao if valor is None else valor
+
+    def __contains__(self, chave: object) -> bool:
+        return chave in CAMPOS and getattr(self, chave) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (campo for campo in CAMPOS if getattr(self, campo) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for campo in CAMPOS if getattr(self, campo) is not None)
+
+    def __repr__(self) -> str:
+        return f"Turno({dict(self)!r})"
+
+    def para_dict(self) -> dict:
+        """Dict no formato antigo (sem os campos None)"""
+        dados = {"tipo": self.tipo, "conteudo": self.conteudo}
+        if self.agente is not None:
+            dados["agente"] = self.agente
+        if self.agente_role is not None:
+            dados["agente_role"] = self.agente_role
+        if self.rodada is not None:
+            dados["rodada"] = self.rodada
+        if self.timestamp is not None:
+            dados["timestamp"] = self.timestamp
+        if self.agente_id is not None:
+            dados["agente_id"] = self.agente_id
+        if self.agente_idx is not None:
+            dados["agente_idx"] = self.agente_idx
+        return dados
+
+
+def para_json(valor: Any) -> Any:
+    """default= do json.dumps: Turnos viram dicts, o resto vira texto"""
+    if isinstance(valor, Turno):
+        return valor.para_dict()
+    return str(valor)
+
+
+def formatar_historico(historico: Iterable[Turno]) -> Iterator[str]:
+    """Blocos de texto do histórico para exibição (sem a síntese), gerados sob demanda"""
+    for item in historico:
+        if item.tipo is TipoTurno.PERGUNTA:
+            yield f"**🤔 PERGUNTA:** {item.conteudo}\n"
+        elif item.tipo is TipoTurno.RESPOSTA:
+            yield f"**{item.agente}:**\n{item.conteudo}\n"
+        elif item.tipo is TipoTurno.ERRO:
+            yield f"⚠️ {item.conteudo}\n"
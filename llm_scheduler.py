@@ -0,0 +1,306 @@
+"""
+Agendador compartilhado das chamadas a LLMs e embeddings
+
+Todas as chamadas aos provedores (turnos do debate, síntese, embeddings do
+RAG, teste de conexão do admin) passam por aqui:
+- limites de requisições e de tokens por minuto por provedor e chave de API
+  (token buckets reabastecidos continuamente);
+- fila por prioridade em cada chave: debates (interativos) são atendidos
+  antes da ingestão de documentos;
+- chamadas recusadas por limite de taxa/sobrecarga (429, 503, 529) são
+  repetidas com backoff exponencial com jitter, respeitando o Retry-After;
+  enquanto isso a chave fica pausada para todas as chamadas do processo.
+
+Os SDKs dos LLMs criados pelo backend usam max_retries=0: quem repete é o agendador.
+"""
+import hashlib
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from log_utils import campos, obter_logger
+
+logger = obter_logger("scheduler")
+
+# Prioridades (menor = atendida antes)
+PRIORIDADE_INTERATIVA = 0
+PRIORIDADE_SEGUNDO_PLANO = 10
+
+# Limites padrão por provedor: (requisições por minuto, tokens por minuto).
+# Sobrescreva com LLM_RPM_<PROVEDOR> e LLM_TPM_<PROVEDOR> conforme o tier da conta.
+LIMITES_PADRAO = {
+    "openai": (500, 200000),
+    "anthropic": (50, 40000),
+    "google": (300, 1000000),
+}
+LIMITES_DESCONHECIDO = (60, 100000)
+
+# Status HTTP que indicam limite de taxa ou sobrecarga do provedor
+STATUS_REPETIVEIS = {429, 503, 529}
+MAX_TENTATIVAS = int(os.getenv("LLM_MAX_TENTATIVAS", "4"))
+BACKOFF_BASE = 1.0
+BACKOFF_MAXIMO = 60.0
+# Frequência (s) com que uma chamada na fila verifica o cancelamento
+INTERVALO_VERIFICACAO_FILA = 0.5
+# Esperas guardadas por provedor para os percentis
+AMOSTRAS_ESPERA = 1000
+
+
+class ChamadaCancelada(Exception):
+    """A chamada foi cancelada enquanto aguardava na fila ou no backoff"""
+
+
+def _limites(provedor: str) -> Tuple[int, int]:
+    rpm, tpm = LIMITES_PADRAO.get(provedor, LIMITES_DESCONHECIDO)
+    sufixo = provedor.upper()
+    return (
+        int(os.getenv(f"LLM_RPM_{sufixo}", rpm)),
+        int(os.getenv(f"LLM_TPM_{sufixo}", tpm)),
+    )
+
+
+def identificar_chave(api_key: Any) -> str:
+    """Identificador estável da chave de API (hash curto - a chave não fica em memória nem em métricas)"""
+    if api_key is None:
+        return "padrao"
+    obter = getattr(api_key, "get_secret_value", None)
+    valor = obter() if callable(obter) else str(api_key)
+    return hashlib.sha256(valor.encode()).hexdigest()[:12] if valor else "padrao"
+
+
+def chave_do_llm(llm: Any) -> str:
+    """Identificador da chave de API de um LLM/embeddings (LangChain ou crewai.LLM)"""
+    for atributo in ("openai_api_key", "anthropic_api_key", "google_api_key", "api_key"):
+        valor = getattr(llm, atributo, None)
+        if valor:
+            return identificar_chave(valor)
+    return "padrao"
+
+
+def status_http(erro: BaseException) -> Optional[int]:
+    """Status HTTP de um erro dos SDKs (openai/anthropic: status_code; google: code)"""
+    for valor in (
+        getattr(erro, "status_code", None),
+        getattr(getattr(erro, "response", None), "status_code", None),
+        getattr(erro, "code", None),
+    ):
+        if isinstance(valor, int):
+            return valor
+    return None
+
+
+def retry_after(erro: BaseException) -> Optional[float]:
+    """Segundos pedidos pelo provedor (retry-after-ms, Retry-After em segundos ou data HTTP)"""
+    cabecalhos = getattr(getattr(erro, "response", None), "headers", None)
+    if not cabecalhos:
+        return None
+    try:
+        if cabecalhos.get("retry-after-ms"):
+            return float(cabecalhos["retry-after-ms"]) / 1000
+        valor = cabecalhos.get("retry-after")
+        if not valor:
+            return None
+        try:
+            return float(valor)
+        except ValueError:
+            return max(0.0, (parsedate_to_datetime(valor) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class BaldeTokens:
+    """Token bucket com capacidade por minuto, reabastecido continuamente"""
+
+    def __init__(self, por_minuto: int):
+        self.capacidade = float(max(1, por_minuto))
+        self.disponivel = self.capacidade
+        self.atualizado = time.monotonic()
+
+    def _reabastecer(self, agora: float) -> None:
+        self.disponivel = min(self.capacidade, self.disponivel + (agora - self.atualizado) * self.capacidade / 60)
+        self.atualizado = agora
+
+    def espera(self, quantidade: float, agora: float) -> float:
+        """Segundos até haver `quantidade` disponível (pedidos maiores que a capacidade esperam o balde cheio)"""
+        self._reabastecer(agora)
+        falta = min(quantidade, self.capacidade) - self.disponivel
+        return max(0.0, falta * 60 / self.capacidade)
+
+    def consumir(self, quantidade: float) -> None:
+        self.disponivel -= min(quantidade, self.capacidade)
+
+
+class LimitadorChave:
+    """Baldes de requisições e tokens de um provedor + chave, com a fila de espera por prioridade"""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.requisicoes = BaldeTokens(rpm)
+        self.tokens = BaldeTokens(tpm)
+        self.fila: list = []  # heap de (prioridade, ordem de chegada)
+        self.pausado_ate = 0.0  # Retry-After/backoff vale para todas as chamadas da chave
+        self.condicao = threading.Condition()
+
+
+class AgendadorLLM:
+    """Limites, fila por prioridade e retry das chamadas aos provedores (uma instância por processo)"""
+
+    def __init__(self):
+        self._limitadores: Dict[Tuple[str, str], LimitadorChave] = {}
+        self._lock = threading.Lock()
+        self._ordem = itertools.count()
+        self._metricas: Dict[str, Dict[str, Any]] = {}
+
+    def _limitador(self, provedor: str, chave: str) -> LimitadorChave:
+        with self._lock:
+            if (provedor, chave) not in self._limitadores:
+                self._limitadores[(provedor, chave)] = LimitadorChave(*_limites(provedor))
+            return self._limitadores[(provedor, chave)]
+
+    def _metricas_provedor(self, provedor: str) -> Dict[str, Any]:
+        # Chamado com self._lock
+        if provedor not in self._metricas:
+            self._metricas[provedor] = {
+                "chamadas": 0,
+                "espera_total": 0.0,
+                "espera_maxima": 0.0,
+                "esperas": deque(maxlen=AMOSTRAS_ESPERA),
+                "limites_taxa": 0,
+                "repeticoes": 0,
+                "esgotadas": 0,
+            }
+        return self._metricas[provedor]
+
+    def adquirir(
+        self,
+        provedor: str,
+        chave: str = "padrao",
+        tokens: int = 0,
+        prioridade: int = PRIORIDADE_INTERATIVA,
+        cancelamento: Optional[threading.Event] = None
+    ) -> float:
+        """Bloqueia até ser a vez da chamada e haver capacidade nos baldes; retorna a espera na fila (s)"""
+        limitador = self._limitador(provedor, chave)
+        ticket = (prioridade, next(self._ordem))
+        inicio = time.monotonic()
+        with limitador.condicao:
+            heapq.heappush(limitador.fila, ticket)
+            try:
+                while True:
+                    if cancelamento is not None and cancelamento.is_set():
+                        raise ChamadaCancelada(f"Chamada a {provedor} cancelada na fila")
+                    espera = INTERVALO_VERIFICACAO_FILA
+                    if limitador.fila[0] == ticket:
+                        agora = time.monotonic()
+                        espera = max(
+                            limitador.pausado_ate - agora,
+                            limitador.requisicoes.espera(1, agora),
+                            limitador.tokens.espera(tokens, agora),
+                        )
+                        if espera <= 0:
+                            limitador.requisicoes.consumir(1)
+                            limitador.tokens.consumir(tokens)
+                            break
+                    limitador.condicao.wait(min(espera, INTERVALO_VERIFICACAO_FILA))
+            finally:
+                limitador.fila.remove(ticket)
+                heapq.heapify(limitador.fila)
+                limitador.condicao.notify_all()
+        esperado = time.monotonic() - inicio
+        with self._lock:
+            metricas = self._metricas_provedor(provedor)
+            metricas["chamadas"] += 1
+            metricas["espera_total"] += esperado
+            metricas["espera_maxima"] = max(metricas["espera_maxima"], esperado)
+            metricas["esperas"].append(esperado)
+        return esperado
+
+    def _pausar(self, provedor: str, chave: str, segundos: float) -> None:
+        limitador = self._limitador(provedor, chave)
+        with limitador.condicao:
+            limitador.pausado_ate = max(limitador.pausado_ate, time.monotonic() + segundos)
+            limitador.condicao.notify_all()
+
+    def executar(
+        self,
+        funcao: Callable[[], Any],
+        provedor: str,
+        chave: str = "padrao",
+        tokens: int = 0,
+        prioridade: int = PRIORIDADE_INTERATIVA,
+        cancelamento: Optional[threading.Event] = None
+    ) -> Any:
+        """
+        Executa funcao() respeitando os limites do provedor/chave.
+
+        Erros 429/503/529 são repetidos até MAX_TENTATIVAS: a espera é o
+        Retry-After do provedor (com um pouco de jitter) ou backoff exponencial
+        com jitter completo, e a chave fica pausada durante ela. Os demais
+        erros (e o último repetível) são propagados.
+        """
+        tentativa = 0
+        while True:
+            self.adquirir(provedor, chave, tokens, prioridade, cancelamento)
+            try:
+                return funcao()
+            except Exception as e:
+                status = status_http(e)
+                if status not in STATUS_REPETIVEIS:
+                    raise
+                tentativa += 1
+                pedido = retry_after(e)
+                with self._lock:
+                    metricas = self._metricas_provedor(provedor)
+                    metricas["limites_taxa"] += int(status == 429)
+                    if tentativa >= MAX_TENTATIVAS:
+                        metricas["esgotadas"] += 1
+                    else:
+                        metricas["repeticoes"] += 1
+                if tentativa >= MAX_TENTATIVAS:
+                    logger.error(
+                        "%s recusou a chamada %d vezes (HTTP %s) - desistindo", provedor, tentativa, status,
+                        extra=campos(provedor=provedor, status=status, tentativas=tentativa)
+                    )
+                    raise
+                if pedido is not None:
+                    espera = pedido + random.uniform(0, min(1.0, pedido * 0.1))
+                else:
+                    espera = random.uniform(0, min(BACKOFF_MAXIMO, BACKOFF_BASE * 2 ** tentativa))
+                logger.warning(
+                    "%s respondeu HTTP %s - nova tentativa (%d/%d) em %.1fs", provedor, status,
+                    tentativa + 1, MAX_TENTATIVAS, espera,
+                    extra=campos(provedor=provedor, status=status, espera=round(espera, 2), retry_after=pedido)
+                )
+                self._pausar(provedor, chave, espera)
+
+    def resumo(self) -> Dict[str, Dict[str, Any]]:
+        """Espera na fila (média, p50, p95, máxima), limites de taxa e repetições por provedor"""
+        with self._lock:
+            resumo = {}
+            for provedor, metricas in self._metricas.items():
+                esperas = sorted(metricas["esperas"])
+                percentil = lambda p: round(esperas[min(len(esperas) - 1, int(p * len(esperas)))], 3) if esperas else None
+                resumo[provedor] = {
+                    "chamadas": metricas["chamadas"],
+                    "espera_media": round(metricas["espera_total"] / metricas["chamadas"], 3) if metricas["chamadas"] else None,
+                    "espera_p50": percentil(0.5),
+                    "espera_p95": percentil(0.95),
+                    "espera_maxima": round(metricas["espera_maxima"], 3),
+                    "limites_taxa": metricas["limites_taxa"],
+                    "repeticoes": metricas["repeticoes"],
+                    "esgotadas": metricas["esgotadas"],
+                }
+            for (provedor, _), limitador in self._limitadores.items():
+                if provedor in resumo:
+                    resumo[provedor]["na_fila"] = resumo[provedor].get("na_fila", 0) + len(limitador.fila)
+            return resumo
+
+
+# Instância do processo (compartilhada pelos debates, RAG e admin)
+agendador_llm = AgendadorLLM()
@@ -0,0 +1,138 @@
+"""
+Logging do backend: perfil de execução, níveis e amostragem
+
+EXECUTION_PROFILE=production desliga a saída detalhada do CrewAI, emite logs
+em JSON (formato de log estruturado do Cloud Logging) e mantém só uma amostra
+dos logs INFO/DEBUG do caminho quente. WARNING e acima nunca são amostrados.
+"""
+import json
+import logging
+import os
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, TextIO
+
+PERFIL_DESENVOLVIMENTO = "development"
+PERFIL_PRODUCAO = "production"
+PERFIL_EXECUCAO = os.getenv("EXECUTION_PROFILE", PERFIL_DESENVOLVIMENTO).strip().lower()
+
+# Namespace dos loggers do backend (não propaga para o root do uvicorn/basicConfig)
+LOGGER_RAIZ = "billia"
+
+
+def em_producao(perfil: Optional[str] = None) -> bool:
+    return (perfil or PERFIL_EXECUCAO) == PERFIL_PRODUCAO
+
+
+def _env_bool(nome: str, padrao: bool) -> bool:
+    valor = os.getenv(nome)
+    if valor is None:
+        return padrao
+    return valor.strip().lower() in ("true", "1", "yes", "on")
+
+
+# Painéis e passos do CrewAI no console - desligados em produção (CREWAI_VERBOSE sobrescreve)
+CREWAI_VERBOSE = _env_bool("CREWAI_VERBOSE", not em_producao())
+
+
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro; severity/message são os campos que o Cloud Logging lê"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        registro: Dict[str, Any] = {
+            "severity": record.levelname,
+            "message": record.getMessage(),
+            "logger": record.name,
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+        }
+        registro.update(getattr(record, "campos", None) or {})
+        if record.exc_info:
+            registro["exception"] = self.formatException(record.exc_info)
+        return json.dumps(registro, ensure_ascii=False, default=str)
+
+
+class FormatadorTexto(logging.Formatter):
+    """Formato legível para desenvolvimento, com os campos estruturados no fim"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        texto = super().format(record)
+        campos = getattr(record, "campos", None)
+        if campos:
+            texto += " " + " ".join(f"{chave}={valor}" for chave, valor in campos.items())
+        return texto
+
+
+class FiltroAmostragem(logging.Filter):
+    """
+    Mantém uma fração dos registros abaixo de WARNING.
+
+    A taxa padrão vale para todos os registros; um registro pode definir a
+    sua com extra=campos(amostra=...) (ex.: 1.0 para eventos de ciclo de vida).
+    """
+
+    def __init__(self, taxa: float):
+        super().__init__()
+        self.taxa = taxa
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        taxa = getattr(record, "amostra", None)
+        taxa = self.taxa if taxa is None else taxa
+        return taxa >= 1.0 or random.random() < taxa
+
+
+_configuracao_lock = threading.Lock()
+_configurado = False
+
+
+def configurar_logging(
+    perfil: Optional[str] = None,
+    stream: Optional[TextIO] = None,
+    forcar: bool = False
+) -> logging.Logger:
+    """
+    Configura o logger raiz do backend (uma vez por processo, ou de novo com forcar=True).
+
+    Variáveis de ambiente: LOG_LEVEL (padrão INFO em produção, DEBUG fora) e
+    LOG_SAMPLE_RATE (fração de INFO/DEBUG mantida; padrão 0.1 em produção).
+    """
+    global _configurado
+    raiz = logging.getLogger(LOGGER_RAIZ)
+    with _configuracao_lock:
+        if _configurado and not forcar:
+            return raiz
+        producao = em_producao(perfil)
+        nivel = os.getenv("LOG_LEVEL", "INFO" if producao else "DEBUG").upper()
+        taxa = float(os.getenv("LOG_SAMPLE_RATE", "0.1" if producao else "1.0"))
+
+        handler = logging.StreamHandler(stream or sys.stdout)
+        handler.setFormatter(FormatadorJSON() if producao else FormatadorTexto())
+        handler.addFilter(FiltroAmostragem(taxa))
+
+        for antigo in list(raiz.handlers):
+            raiz.removeHandler(antigo)
+        raiz.addHandler(handler)
+        raiz.setLevel(getattr(logging, nivel, logging.INFO))
+        raiz.propagate = False
+        _configurado = True
+    return raiz
+
+
+def obter_logger(nome: str) -> logging.Logger:
+    """Logger do módulo (ex.: obter_logger("debate") -> billia.debate)"""
+    configurar_logging()
+    return logging.getLogger(f"{LOGGER_RAIZ}.{nome}")
+
+
+def campos(amostra: Optional[float] = None, **valores: Any) -> Dict[str, Any]:
+    """Monta o extra= de um log: campos estruturados e, opcionalmente, a taxa de amostragem"""
+    extra: Dict[str, Any] = {"campos": valores}
+    if amostra is not None:
+        extra["amostra"] = amostra
+    return extra
@@ -0,0 +1,90 @@
+"""
+Métricas de latência e de hedge das chamadas aos LLMs, agregadas por provedor
+
+Compartilhadas por todos os debates do processo (como os semáforos do modo
+painel) e expostas em /api/admin/metrics/providers.
+"""
+import threading
+from typing import Any, Dict, Optional
+
+# Peso da chamada mais recente na latência média móvel do provedor
+PESO_MEDIA_MOVEL = 0.2
+
+
+class MetricasProvedores:
+    """
+    Contadores por provedor (o do LLM principal do agente):
+
+    - chamadas e latência média móvel das chamadas concluídas;
+    - hedges: chamadas em que a reserva foi acionada (principal sem primeiro
+      token dentro do limiar, ou falhou) e quantas a reserva venceu;
+    - latência economizada estimada: média móvel do principal menos a
+      duração da chamada vencida pela reserva (o principal é abortado, então
+      a duração real dele não é conhecida).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._provedores: Dict[str, Dict[str, Any]] = {}
+
+    def _provedor(self, provedor: str) -> Dict[str, Any]:
+        if provedor not in self._provedores:
+            self._provedores[provedor] = {
+                "chamadas": 0,
+                "latencia_media": None,
+                "chamadas_com_reserva": 0,
+                "hedges": 0,
+                "vitorias_reserva": 0,
+                "latencia_economizada": 0.0,
+            }
+        return self._provedores[provedor]
+
+    def registrar_chamada(
+        self,
+        provedor: str,
+        duracao: float,
+        com_reserva: bool = False,
+        hedge: bool = False,
+        venceu_reserva: bool = False
+    ) -> Optional[float]:
+        """Registra uma chamada concluída; retorna a latência economizada estimada quando a reserva vence"""
+        with self._lock:
+            dados = self._provedor(provedor)
+            dados["chamadas"] += 1
+            dados["chamadas_com_reserva"] += int(com_reserva)
+            dados["hedges"] += int(hedge)
+            economia = None
+            if venceu_reserva:
+                dados["vitorias_reserva"] += 1
+                if dados["latencia_media"] is not None:
+                    economia = max(0.0, dados["latencia_media"] - duracao)
+                    dados["latencia_economizada"] += economia
+            else:
+                # Só a duração do próprio provedor entra na média dele
+                media = dados["latencia_media"]
+                dados["latencia_media"] = duracao if media is None else (
+                    PESO_MEDIA_MOVEL * duracao + (1 - PESO_MEDIA_MOVEL) * media
+                )
+            return economia
+
+    def resumo(self) -> Dict[str, Dict[str, Any]]:
+        """Métricas por provedor com as taxas calculadas"""
+        with self._lock:
+            resumo = {}
+            for provedor, dados in self._provedores.items():
+                hedges = dados["hedges"]
+                resumo[provedor] = {
+                    "chamadas": dados["chamadas"],
+                    "latencia_media": round(dados["latencia_media"], 3) if dados["latencia_media"] is not None else None,
+                    "chamadas_com_reserva": dados["chamadas_com_reserva"],
+                    "hedges": hedges,
+                    "taxa_hedge": round(hedges / dados["chamadas_com_reserva"], 3) if dados["chamadas_com_reserva"] else None,
+                    "vitorias_reserva": dados["vitorias_reserva"],
+                    "taxa_vitoria_reserva": round(dados["vitorias_reserva"] / hedges, 3) if hedges else None,
+                    "latencia_economizada": round(dados["latencia_economizada"], 3),
+                }
+            return resumo
+
+
+# Instância do processo (usada pelo DebateCrew e pela API de administração)
+metricas_provedores = MetricasProvedores()
@@ -0,0 +1,331 @@
+"""
+Montagem dos prompts do debate em segmentos ordenados por estabilidade
+
+Os provedores só reaproveitam o cache de prompt quando o início do prompt é
+idêntico entre chamadas. Por isso os segmentos são sempre emitidos do mais
+estável (persona, pergunta) para o menos estável (transcrição que cresce a
+cada turno, trechos do RAG, instrução do turno).
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from token_utils import contar_tokens, truncar_para_tokens
+
+# Ordem de estabilidade dos segmentos (menor = muda menos)
+ESTABILIDADE_PERSONA = 0
+ESTABILIDADE_PERGUNTA = 1
+ESTABILIDADE_CONTEXTO_USUARIO = 2
+ESTABILIDADE_TRANSCRICAO = 3
+ESTABILIDADE_RAG = 4
+ESTABILIDADE_TURNO = 5
+
+# Provedores que aceitam marcação explícita de breakpoints de cache.
+# OpenAI e Gemini fazem cache de prefixo automaticamente, sem marcação.
+PROVEDORES_COM_BREAKPOINT = {"anthropic"}
+# A Anthropic aceita no máximo 4 blocos com cache_control por requisição
+MAX_BREAKPOINTS_ANTHROPIC = 4
+
+# Prioridade de corte quando o prompt não cabe no orçamento (menor = cortado primeiro)
+PRIORIDADE_OBRIGATORIA = 100  # Nunca cortado (persona, instruções, vez do agente)
+PRIORIDADE_TRANSCRICAO = 60
+PRIORIDADE_CONTEXTO_USUARIO = 40
+PRIORIDADE_RAG = 20
+
+# Janela de contexto por prefixo de modelo (o prefixo mais longo que casar vence)
+JANELAS_CONTEXTO_MODELO = {
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4.1": 1047576,
+    "gpt-3.5-turbo": 16385,
+    "claude": 200000,
+    "gemini": 1048576,
+}
+JANELA_CONTEXTO_PADRAO = 8192
+# Folga para a formatação que o framework acrescenta em volta do prompt
+MARGEM_TOKENS_FRAMEWORK = 256
+
+
+def detectar_provedor(llm: Any) -> str:
+    """Identifica o provedor a partir do objeto LLM usado pelo agente"""
+    nome_classe = type(llm).__name__.lower()
+    modelo = str(getattr(llm, "model", "") or getattr(llm, "model_name", "")).lower()
+    if "anthropic" in nome_classe or modelo.startswith(("claude", "anthropic/")):
+        return "anthropic"
+    if "google" in nome_classe or "gemini" in nome_classe or modelo.startswith(("gemini", "google/")):
+        return "google"
+    return "openai"
+
+
+def compactar_template(texto: str) -> str:
+    """
+    Remove a indentação herdada do código-fonte (triple-quoted strings) e
+    linhas em branco repetidas. Só deve ser usado em textos escritos por nós:
+    conteúdo do usuário pode ter indentação com significado.
+    """
+    linhas = [linha.strip() for linha in str(texto).strip().splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(linhas))
+
+
+def compactar_conteudo(texto: str) -> str:
+    """Remove espaços no fim das linhas e linhas em branco repetidas, preservando a indentação"""
+    linhas = [linha.rstrip() for linha in str(texto).strip("\n").splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(linhas))
+
+
+def orcamento_modelo(modelo: Optional[str], max_tokens_saida: int = 1000, limite: Optional[int] = None) -> int:
+    """
+    Tokens de entrada disponíveis para o modelo: a janela de contexto menos a
+    saída reservada e a folga do framework, limitada por `limite` se informado.
+    """
+    nome = str(modelo or "").lower().split("/")[-1]
+    janela = JANELA_CONTEXTO_PADRAO
+    prefixo_casado = ""
+    for prefixo, tamanho in JANELAS_CONTEXTO_MODELO.items():
+        if nome.startswith(prefixo) and len(prefixo) > len(prefixo_casado):
+            janela, prefixo_casado = tamanho, prefixo
+    orcamento = janela - int(max_tokens_saida or 0) - MARGEM_TOKENS_FRAMEWORK
+    if limite:
+        orcamento = min(orcamento, int(limite))
+    return max(orcamento, 0)
+
+
+def montar_persona(role: str, goal: str, backstory: str) -> str:
+    """Texto de sistema equivalente ao que o CrewAI monta a partir do agente"""
+    return f"Você é {role}. {compactar_template(backstory)}\nSeu objetivo pessoal é: {goal}"
+
+
+class SegmentoPrompt:
+    """
+    Trecho do prompt com sua estabilidade, se fecha um breakpoint de cache e
+    como pode ser cortado para caber no orçamento de tokens.
+
+    texto já inclui o cabecalho; no corte só o corpo (o que vem depois dele)
+    é truncado, com truncar(corpo, max_tokens, modelo) quando informado.
+    """
+
+    __slots__ = (
+        "nome", "texto", "estabilidade", "ponto_cache", "prioridade", "min_tokens", "manter_fim",
+        "cabecalho", "truncar"
+    )
+
+    def __init__(
+        self,
+        nome: str,
+        texto: str,
+        estabilidade: int,
+        ponto_cache: bool = False,
+        prioridade: int = PRIORIDADE_OBRIGATORIA,
+        min_tokens: int = 0,
+        manter_fim: bool = False,
+        cabecalho: str = "",
+        truncar: Optional[Callable[[str, int, Optional[str]], str]] = None
+    ):
+        self.nome = nome
+        self.texto = texto
+        self.estabilidade = estabilidade
+        self.ponto_cache = ponto_cache
+        self.prioridade = prioridade
+        self.min_tokens = min_tokens
+        self.manter_fim = manter_fim
+        self.cabecalho = cabecalho
+        self.truncar = truncar
+
+
+class MontadorPrompt:
+    """
+    Junta os segmentos de um prompt do mais estável para o menos estável.
+
+    O segmento de persona vira a mensagem de sistema; os demais formam a
+    mensagem do usuário. Para provedores que suportam, os segmentos marcados
+    com ponto_cache recebem cache_control.
+    """
+
+    def __init__(self, provedor: str = "openai", modelo: Optional[str] = None):
+        self.provedor = provedor
+        self.modelo = modelo
+        self._segmentos: List[SegmentoPrompt] = []
+
+    def adicionar(
+        self,
+        nome: str,
+        texto: str,
+        estabilidade: int,
+        ponto_cache: bool = False,
+        prioridade: int = PRIORIDADE_OBRIGATORIA,
+        min_tokens: int = 0,
+        manter_fim: bool = False,
+        cabecalho: str = "",
+        truncar: Optional[Callable[[str, int, Optional[str]], str]] = None
+    ) -> "MontadorPrompt":
+        """
+        Adiciona um segmento (ignorado se texto for vazio). O cabecalho vai
+        antes do texto e nunca é cortado: com manter_fim o corte tira o início
+        do corpo, e o rótulo do segmento continua no lugar.
+        """
+        if texto:
+            self._segmentos.append(SegmentoPrompt(
+                nome, cabecalho + texto, estabilidade, ponto_cache, prioridade, min_tokens, manter_fim,
+                cabecalho, truncar
+            ))
+        return self
+
+    def contar_tokens(self) -> int:
+        """Tokens de todos os segmentos, incluindo a persona (+1 por separador)"""
+        return sum(contar_tokens(s.texto, self.modelo) + 1 for s in self._segmentos)
+
+    def ajustar_ao_orcamento(self, max_tokens: int) -> List[Dict[str, Any]]:
+        """
+        Corta segmentos, do de menor prioridade para o de maior, até o prompt
+        caber em max_tokens. Segmentos obrigatórios nunca são cortados e nenhum
+        segmento fica abaixo de min_tokens (abaixo disso ele é removido).
+
+        Retorna a lista de ajustes feitos: segmento, ação ("truncado" ou
+        "removido") e tokens antes/depois.
+        """
+        ajustes: List[Dict[str, Any]] = []
+        tokens = {id(s): contar_tokens(s.texto, self.modelo) + 1 for s in self._segmentos}
+        excesso = sum(tokens.values()) - max_tokens
+        if excesso <= 0:
+            return ajustes
+
+        cortaveis = sorted(
+            (s for s in self._segmentos if s.prioridade < PRIORIDADE_OBRIGATORIA),
+            key=lambda s: s.prioridade
+        )
+        for seg in cortaveis:
+            if excesso <= 0:
+                break
+            antes = tokens[id(seg)]
+            alvo = antes - excesso
+            alvo_corpo = alvo - 1 - (contar_tokens(seg.cabecalho, self.modelo) if seg.cabecalho else 0)
+            if alvo < max(seg.min_tokens, 1) or alvo_corpo < 1:
+                self._segmentos.remove(seg)
+                excesso -= antes
+                ajustes.append({"segmento": seg.nome, "acao": "removido", "tokens_antes": antes, "tokens_depois": 0})
+                continue
+            corpo = seg.texto[len(seg.cabecalho):]
+            if seg.truncar is not None:
+                corpo = seg.truncar(corpo, alvo_corpo, self.modelo)
+            else:
+                corpo = truncar_para_tokens(corpo, alvo_corpo, self.modelo, manter_fim=seg.manter_fim)
+            seg.texto = seg.cabecalho + corpo
+            depois = contar_tokens(seg.texto, self.modelo) + 1
+            excesso -= antes - depois
+            ajustes.append({"segmento": seg.nome, "acao": "truncado", "tokens_antes": antes, "tokens_depois": depois})
+        return ajustes
+
+    def segmentos(self) -> List[SegmentoPrompt]:
+        # sorted é estável: segmentos com a mesma estabilidade mantêm a ordem de inserção
+        return sorted(self._segmentos, key=lambda s: s.estabilidade)
+
+    def persona(self) -> str:
+        return "\n\n".join(
+            s.texto for s in self.segmentos() if s.estabilidade == ESTABILIDADE_PERSONA
+        )
+
+    def texto(self) -> str:
+        """Prompt do usuário como texto único (sem a persona, que o CrewAI injeta sozinho)"""
+        return "\n\n".join(
+            s.texto for s in self.segmentos() if s.estabilidade != ESTABILIDADE_PERSONA
+        )
+
+    def mensagens(self) -> List[Dict[str, Any]]:
+        """
+        Mensagens no formato de chat (role/content) para chamada direta ao LLM.
+
+        Na Anthropic cada segmento vira um bloco de texto e os breakpoints
+        recebem cache_control; nos demais provedores o conteúdo é texto simples.
+        """
+        segmentos = self.segmentos()
+        persona = [s for s in segmentos if s.estabilidade == ESTABILIDADE_PERSONA]
+        usuario = [s for s in segmentos if s.estabilidade != ESTABILIDADE_PERSONA]
+
+        if self.provedor not in PROVEDORES_COM_BREAKPOINT:
+            mensagens = []
+            if persona:
+                mensagens.append({"role": "system", "content": self.persona()})
+            mensagens.append({"role": "user", "content": self.texto()})
+            return mensagens
+
+        breakpoints_restantes = MAX_BREAKPOINTS_ANTHROPIC
+
+        def _blocos(segs: List[SegmentoPrompt]) -> List[Dict[str, Any]]:
+            nonlocal breakpoints_restantes
+            blocos = []
+            for seg in segs:
+                bloco: Dict[str, Any] = {"type": "text", "text": seg.texto}
+                if seg.ponto_cache and breakpoints_restantes > 0:
+                    bloco["cache_control"] = {"type": "ephemeral"}
+                    breakpoints_restantes -= 1
+                blocos.append(bloco)
+            return blocos
+
+        mensagens = []
+        if persona:
+            mensagens.append({"role": "system", "content": _blocos(persona)})
+        mensagens.append({"role": "user", "content": _blocos(usuario)})
+        return mensagens
+
+
+def extrair_uso_tokens(resultado: Any) -> Optional[Dict[str, int]]:
+    """
+    Lê o uso de tokens reportado pelo provedor.
+
+    Aceita a mensagem do LangChain (usage_metadata com input_token_details),
+    a saída do CrewAI (token_usage com cached_prompt_tokens) e o formato cru
+    de OpenAI/Anthropic (prompt_tokens_details / cache_read_input_tokens).
+    Retorna None quando o provedor não informou o uso.
+    """
+    uso = getattr(resultado, "usage_metadata", None)
+    if isinstance(uso, dict) and uso:
+        detalhes = uso.get("input_token_details") or {}
+        return {
+            "tokens_entrada": int(uso.get("input_tokens") or 0),
+            "tokens_cache": int(detalhes.get("cache_read") or 0),
+            "tokens_saida": int(uso.get("output_tokens") or 0),
+        }
+
+    uso = getattr(resultado, "token_usage", None)
+    if uso is not None and not isinstance(uso, dict):
+        return {
+            "tokens_entrada": int(getattr(uso, "prompt_tokens", 0) or 0),
+            "tokens_cache": int(getattr(uso, "cached_prompt_tokens", 0) or 0),
+            "tokens_saida": int(getattr(uso, "completion_tokens", 0) or 0),
+        }
+
+    metadados = getattr(resultado, "response_metadata", None) or {}
+    uso = metadados.get("usage") or metadados.get("token_usage") if isinstance(metadados, dict) else None
+    if isinstance(uso, dict) and uso:
+        detalhes = uso.get("prompt_tokens_details") or {}
+        cache_anthropic = int(uso.get("cache_read_input_tokens") or 0)
+        # Na Anthropic input_tokens não inclui os tokens lidos do cache
+        entrada = int(uso.get("prompt_tokens") or 0) or int(uso.get("input_tokens") or 0) + cache_anthropic
+        return {
+            "tokens_entrada": entrada,
+            "tokens_cache": int(detalhes.get("cached_tokens") or 0) or cache_anthropic,
+            "tokens_saida": int(uso.get("completion_tokens") or uso.get("output_tokens") or 0),
+        }
+    return None
+
+
+def diferenca_uso_tokens(antes: Any, depois: Any) -> Optional[Dict[str, int]]:
+    """
+    Uso de uma chamada a partir de dois resumos cumulativos do crewai.LLM
+    (UsageMetrics: prompt_tokens, cached_prompt_tokens, completion_tokens).
+    Retorna None se algum resumo faltar ou nenhuma chamada foi contabilizada.
+    """
+    if antes is None or depois is None:
+        return None
+
+    def _delta(campo: str) -> int:
+        return int(getattr(depois, campo, 0) or 0) - int(getattr(antes, campo, 0) or 0)
+
+    entrada = _delta("prompt_tokens")
+    if entrada <= 0:
+        return None
+    return {
+        "tokens_entrada": entrada,
+        "tokens_cache": max(_delta("cached_prompt_tokens"), 0),
+        "tokens_saida": max(_delta("completion_tokens"), 0),
+    }
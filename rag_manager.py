@@ -15,71 +15,103 @@ from dotenv import load_dotenv
 import json
 import numpy as np
 
+from llm_scheduler import PRIORIDADE_INTERATIVA, PRIORIDADE_SEGUNDO_PLANO, agendador_llm, identificar_chave
+from token_utils import contar_tokens
+
 # Carregar .env
 env_path = Path(__file__).parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
+VALORES_INVALIDOS = ["placeholder", "none", "", "null", "your_key_here", "sua_chave_aqui"]
+
+
+def obter_chave_embeddings(database=None, origem: str = "") -> str:
+    """
+    Chave da OpenAI para embeddings: 1) OPENAI_API_KEY_RAG / OPENAI_API_KEY,
+    2) tabela llm_providers (se database fornecido). Lança ValueError sem chave válida.
+    """
+    api_key = os.getenv("OPENAI_API_KEY_RAG") or os.getenv("OPENAI_API_KEY")
+    
+    # Validar se a chave da variável de ambiente é inválida
+    api_key_invalida = not api_key or str(api_key).strip().lower() in VALORES_INVALIDOS
+    
+    # Se a chave da variável de ambiente for inválida E database fornecido, buscar do banco
+    if api_key_invalida and database:
+        print(f"[RAG] Chave da variável de ambiente inválida ou não encontrada, buscando do banco de dados...")
+        try:
+            result = database.supabase.table("llm_providers").select("*").eq("provider", "openai").execute()
+            if result.data and len(result.data) > 0:
+                provider_data = result.data[0]
+                db_api_key = provider_data.get("api_key_encrypted")
+                if db_api_key and str(db_api_key).strip().lower() not in VALORES_INVALIDOS:
+                    api_key = db_api_key
+                    status = provider_data.get("status", "disconnected")
+                    print(f"[RAG] ✅ Chave recuperada do banco de dados (status: {status}) para embeddings ({origem})")
+                else:
+                    print(f"[RAG] ⚠️ Chave encontrada no banco mas é inválida ou placeholder")
+            else:
+                print(f"[RAG] ⚠️ Nenhum registro encontrado na tabela llm_providers para provider='openai'")
+        except Exception as e:
+            print(f"[RAG] ⚠️ Erro ao buscar API key do banco de dados: {str(e)}")
+            import traceback
+            traceback.print_exc()
+    
+    # Validar que temos uma chave válida
+    if not api_key or str(api_key).strip().lower() in VALORES_INVALIDOS:
+        raise ValueError(
+            "API key da OpenAI não encontrada para embeddings do RAG. "
+            "Configure a variável de ambiente OPENAI_API_KEY_RAG ou OPENAI_API_KEY "
+            "no Cloud Run ou no arquivo .env, ou configure no Admin -> LLMs no banco de dados."
+        )
+    
+    api_key = str(api_key).strip()
+    if len(api_key) < 20:
+        raise ValueError(
+            f"API key da OpenAI inválida para embeddings (muito curta: {len(api_key)} caracteres). "
+            "Configure uma chave válida no Cloud Run, no arquivo .env ou no Admin -> LLMs."
+        )
+    
+    # Log indicando a origem da chave (só se não foi logado antes)
+    if not api_key_invalida or not database:
+        print(f"[RAG] Usando chave da variável de ambiente para embeddings ({origem})")
+    return api_key
+
+
+class ClienteEmbeddings:
+    """Embeddings da OpenAI pelo agendador compartilhado (RAG, detecção de convergência e cache de debates)"""
+    
+    def __init__(self, api_key: str):
+        # Retries ficam com o agendador compartilhado
+        self.embeddings = OpenAIEmbeddings(
+            model="text-embedding-3-small",
+            api_key=api_key,
+            max_retries=0
+        )
+        self._chave_api = identificar_chave(api_key)
+    
+    def embed(self, texto: str, prioridade: int = PRIORIDADE_INTERATIVA) -> List[float]:
+        """Embedding de um texto passando pelo agendador (limites da chave OpenAI e retry em 429)"""
+        return agendador_llm.executar(
+            lambda: self.embeddings.embed_query(texto),
+            "openai",
+            self._chave_api,
+            tokens=contar_tokens(texto),
+            prioridade=prioridade
+        )
+
+
 class RAGManager:
     def __init__(self, agent_id: str, database=None):
         self.agent_id = agent_id
         self.database = database
         
         # Buscar chave da OpenAI para RAG (embeddings)
-        # Prioridade: 1) Variáveis de ambiente, 2) Banco de dados (se database fornecido)
-        api_key = os.getenv("OPENAI_API_KEY_RAG") or os.getenv("OPENAI_API_KEY")
-        
-        # Validar se a chave da variável de ambiente é inválida
-        VALORES_INVALIDOS = ["placeholder", "none", "", "null", "your_key_here", "sua_chave_aqui"]
-        api_key_invalida = not api_key or str(api_key).strip().lower() in VALORES_INVALIDOS
-        
-        # Se a chave da variável de ambiente for inválida E database fornecido, buscar do banco
-        if api_key_invalida and self.database:
-            print(f"[RAG] Chave da variável de ambiente inválida ou não encontrada, buscando do banco de dados...")
-            try:
-                result = self.database.supabase.table("llm_providers").select("*").eq("provider", "openai").execute()
-                if result.data and len(result.data) > 0:
-                    provider_data = result.data[0]
-                    db_api_key = provider_data.get("api_key_encrypted")
-                    if db_api_key and str(db_api_key).strip().lower() not in VALORES_INVALIDOS:
-                        api_key = db_api_key
-                        status = provider_data.get("status", "disconnected")
-                        print(f"[RAG] ✅ Chave recuperada do banco de dados (status: {status}) para embeddings (agente: {self.agent_id})")
-                    else:
-                        print(f"[RAG] ⚠️ Chave encontrada no banco mas é inválida ou placeholder")
-                else:
-                    print(f"[RAG] ⚠️ Nenhum registro encontrado na tabela llm_providers para provider='openai'")
-            except Exception as e:
-                print(f"[RAG] ⚠️ Erro ao buscar API key do banco de dados: {str(e)}")
-                import traceback
-                traceback.print_exc()
-        
-        # Validar que temos uma chave válida
-        if not api_key or str(api_key).strip().lower() in VALORES_INVALIDOS:
-            raise ValueError(
-                "API key da OpenAI não encontrada para embeddings do RAG. "
-                "Configure a variável de ambiente OPENAI_API_KEY_RAG ou OPENAI_API_KEY "
-                "no Cloud Run ou no arquivo .env, ou configure no Admin -> LLMs no banco de dados."
-            )
-        
-        api_key = str(api_key).strip()
-        if len(api_key) < 20:
-            raise ValueError(
-                f"API key da OpenAI inválida para embeddings (muito curta: {len(api_key)} caracteres). "
-                "Configure uma chave válida no Cloud Run, no arquivo .env ou no Admin -> LLMs."
-            )
-        
-        # Log indicando a origem da chave (só se não foi logado antes)
-        if not api_key_invalida or not self.database:
-            print(f"[RAG] Usando chave da variável de ambiente para embeddings (agente: {self.agent_id})")
+        api_key = obter_chave_embeddings(database, origem=f"agente: {self.agent_id}")
         
         # CRÍTICO: Setar env var com chave ANTES de criar embeddings
         os.environ["OPENAI_API_KEY"] = api_key
         
-        # Criar embeddings com a chave
-        self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            api_key=api_key
-        )
+        self.cliente_embeddings = ClienteEmbeddings(api_key)
         print(f"[RAG] Embeddings inicializados com sucesso")
         
         self.text_splitter = RecursiveCharacterTextSplitter(
@@ -89,6 +121,10 @@ class RAGManager:
         )
         # Não usa mais FAISS - tudo no Supabase
     
+    def embed(self, texto: str, prioridade: int = PRIORIDADE_INTERATIVA) -> List[float]:
+        """Embedding de um texto passando pelo agendador compartilhado (limites da chave OpenAI e retry em 429)"""
+        return self.cliente_embeddings.embed(texto, prioridade)
+    
     def add_document(self, content: str, knowledge_id: str, title: str = "", metadata: Optional[Dict] = None) -> bool:
         """Adiciona um documento à base de conhecimento do agente no Supabase"""
         if not self.database:
@@ -111,8 +147,8 @@ class RAGManager:
             
             # Gerar embeddings e salvar no Supabase
             for i, chunk in enumerate(chunks):
-                # Gerar embedding
-                embedding = self.embeddings.embed_query(chunk.page_content)
+                # Gerar embedding (ingestão: atrás das chamadas dos debates na fila do agendador)
+                embedding = self.embed(chunk.page_content, PRIORIDADE_SEGUNDO_PLANO)
                 
                 # Salvar chunk com embedding no Supabase
                 # O Supabase aceita lista Python diretamente e converte para vector
@@ -135,14 +171,15 @@ class RAGManager:
             traceback.print_exc()
             return False
     
-    def search(self, query: str, k: int = 3) -> List[Document]:
-        """Busca documentos relevantes usando busca vetorial no Supabase"""
+    def search(self, query: str, k: int = 3, query_embedding: Optional[List[float]] = None) -> List[Document]:
+        """Busca documentos relevantes usando busca vetorial no Supabase (query_embedding: embedding já calculado da query)"""
         if not self.database:
             return []
         
         try:
             # Gerar embedding da query
-            query_embedding = self.embeddings.embed_query(query)
+            if query_embedding is None:
+                query_embedding = self.embed(query, PRIORIDADE_INTERATIVA)
             
             # Tentar usar função RPC otimizada primeiro
             try:
@@ -245,9 +282,9 @@ class RAGManager:
             traceback.print_exc()
             return []
     
-    def get_context(self, query: str, k: int = 3) -> str:
+    def get_context(self, query: str, k: int = 3, query_embedding: Optional[List[float]] = None) -> str:
         """Retorna contexto formatado para usar no prompt do agente"""
-        docs = self.search(query, k=k)
+        docs = self.search(query, k=k, query_embedding=query_embedding)
         if not docs:
             return ""
         
@@ -12,6 +12,9 @@ CREATE TABLE IF NOT EXISTS agents (
   backstory TEXT NOT NULL,
   llm_provider VARCHAR(50) NOT NULL,
   llm_model VARCHAR(100) NOT NULL,
+  backup_llm_provider VARCHAR(50),
+  backup_llm_model VARCHAR(100),
+  hedge_after_ms INTEGER,
   temperature DECIMAL(3,2) DEFAULT 0.7,
   max_tokens INTEGER DEFAULT 1000,
   "verbose" BOOLEAN DEFAULT TRUE,
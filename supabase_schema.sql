@@ -8,6 +8,12 @@ CREATE TABLE IF NOT EXISTS debates (
   selected_agents TEXT[] NOT NULL,
   num_rodadas INTEGER NOT NULL,
   sintese TEXT,
+  status VARCHAR(20) NOT NULL DEFAULT 'completed', -- 'running', 'completed', 'failed', 'cancelled'
+  modo VARCHAR(20),
+  contexto TEXT[],
+  sintese_continua BOOLEAN,
+  resumo_continuo TEXT,
+  resumo_continuo_falas INTEGER,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
   updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -30,10 +36,14 @@ CREATE TABLE IF NOT EXISTS messages (
 CREATE INDEX IF NOT EXISTS idx_messages_debate_id ON messages(debate_id);
 CREATE INDEX IF NOT EXISTS idx_messages_order ON messages(debate_id, order_index);
 CREATE INDEX IF NOT EXISTS idx_debates_created_at ON debates(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_debates_status ON debates(status);
 
 -- Comentários nas tabelas
 COMMENT ON TABLE debates IS 'Armazena informações dos debates realizados';
 COMMENT ON TABLE messages IS 'Armazena todas as mensagens de um debate';
 COMMENT ON COLUMN messages.type IS 'Tipo da mensagem: user, agent, round, question, sintese, sintese_conteudo';
 COMMENT ON COLUMN messages.order_index IS 'Ordem da mensagem no debate';
+COMMENT ON COLUMN debates.sintese_continua IS 'Síntese a partir do resumo contínuo - usado ao retomar';
+COMMENT ON COLUMN debates.resumo_continuo IS 'Último resumo contínuo gravado; ao retomar o resumo continua dele';
+COMMENT ON COLUMN debates.resumo_continuo_falas IS 'Quantas respostas (na ordem do histórico) o resumo_continuo já cobre';
 
@@ -0,0 +1,20 @@
+-- Schema SQL para debates gravados turno a turno (status e dados para retomar)
+-- Execute este SQL no SQL Editor do Supabase
+
+ALTER TABLE debates ADD COLUMN IF NOT EXISTS status VARCHAR(20) NOT NULL DEFAULT 'completed';
+ALTER TABLE debates ADD COLUMN IF NOT EXISTS modo VARCHAR(20);
+ALTER TABLE debates ADD COLUMN IF NOT EXISTS contexto TEXT[];
+ALTER TABLE debates ADD COLUMN IF NOT EXISTS sintese_continua BOOLEAN;
+ALTER TABLE debates ADD COLUMN IF NOT EXISTS resumo_continuo TEXT;
+ALTER TABLE debates ADD COLUMN IF NOT EXISTS resumo_continuo_falas INTEGER;
+
+CREATE INDEX IF NOT EXISTS idx_debates_status ON debates(status);
+
+-- Comentários
+COMMENT ON COLUMN debates.status IS 'running (em andamento ou interrompido), completed, failed, cancelled; failed/cancelled (e running parado) podem ser retomados';
+COMMENT ON COLUMN debates.modo IS 'Modo do debate (debate, painel, sintese) - usado ao retomar';
+COMMENT ON COLUMN debates.contexto IS 'Contexto enviado pelo usuário - usado ao retomar';
+COMMENT ON COLUMN debates.sintese_continua IS 'Síntese a partir do resumo contínuo - usado ao retomar';
+COMMENT ON COLUMN debates.resumo_continuo IS 'Último resumo contínuo gravado; ao retomar o resumo continua dele';
+COMMENT ON COLUMN debates.resumo_continuo_falas IS 'Quantas respostas (na ordem do histórico) o resumo_continuo já cobre';
+COMMENT ON COLUMN messages.round_number IS 'Rodada do turno (NULL para pergunta e síntese)';
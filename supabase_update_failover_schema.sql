@@ -0,0 +1,11 @@
+-- Schema SQL para LLM de reserva (hedge/failover) por agente
+-- Execute este SQL no SQL Editor do Supabase
+
+ALTER TABLE agents ADD COLUMN IF NOT EXISTS backup_llm_provider VARCHAR(50);
+ALTER TABLE agents ADD COLUMN IF NOT EXISTS backup_llm_model VARCHAR(100);
+ALTER TABLE agents ADD COLUMN IF NOT EXISTS hedge_after_ms INTEGER;
+
+-- Comentários
+COMMENT ON COLUMN agents.backup_llm_provider IS 'Provider do LLM de reserva (openai, anthropic, google); NULL = sem hedge';
+COMMENT ON COLUMN agents.backup_llm_model IS 'Modelo do LLM de reserva; NULL = modelo padrão do provider de reserva';
+COMMENT ON COLUMN agents.hedge_after_ms IS 'Tempo sem primeiro token do LLM principal até acionar a reserva; NULL = debate_config.hedge_threshold_ms';
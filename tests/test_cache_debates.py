@@ -0,0 +1,62 @@
+from cache_debates import CacheDebates, chave_painel
+
+
+def _cache(**kwargs):
+    return CacheDebates(**{"limiar": 0.95, "ttl": 60, "max_entradas": 10, **kwargs})
+
+
+def test_pergunta_parecida_acima_do_limiar_e_acerto():
+    cache = _cache()
+    cache.guardar("painel", "Qual o futuro da energia?", [1.0, 0.0], {"sintese": "solar"})
+
+    acerto = cache.buscar("painel", [0.99, 0.1])
+    assert acerto["dados"] == {"sintese": "solar"}
+    assert acerto["similaridade"] >= 0.95
+    # Abaixo do limiar, ou em outro painel, não reaproveita
+    assert cache.buscar("painel", [0.8, 0.6]) is None
+    assert cache.buscar("outro", [1.0, 0.0]) is None
+
+    resumo = cache.resumo()
+    assert (resumo["acertos"], resumo["falhas"]) == (1, 2)
+
+
+def test_acerto_devolve_copia_dos_dados():
+    cache = _cache()
+    cache.guardar("painel", "p", [1.0], {"respostas": ["a"]})
+
+    cache.buscar("painel", [1.0])["dados"]["respostas"].append("b")
+    assert cache.buscar("painel", [1.0])["dados"] == {"respostas": ["a"]}
+
+
+def test_entrada_expirada_sai_na_busca():
+    cache = _cache(ttl=60)
+    cache.guardar("painel", "p", [1.0], {"sintese": "antiga"})
+    (entrada,) = cache._entradas.values()
+    entrada["criada_em"] -= 61
+
+    assert cache.buscar("painel", [1.0]) is None
+    resumo = cache.resumo()
+    assert (resumo["entradas"], resumo["expiradas"]) == (0, 1)
+
+
+def test_acima_do_limite_sai_a_usada_ha_mais_tempo():
+    cache = _cache(max_entradas=2)
+    cache.guardar("painel", "a", [1.0, 0.0], {"p": "a"})
+    cache.guardar("painel", "b", [0.0, 1.0], {"p": "b"})
+    cache.buscar("painel", [1.0, 0.0])  # "a" passa a ser a mais recente
+    cache.guardar("painel", "c", [-1.0, 0.0], {"p": "c"})
+
+    assert cache.buscar("painel", [0.0, 1.0]) is None
+    assert cache.buscar("painel", [1.0, 0.0])["dados"] == {"p": "a"}
+    assert cache.resumo()["despejadas"] == 1
+
+    cache.configurar(max_entradas=0)
+    assert cache.resumo()["entradas"] == 0
+
+
+def test_chave_muda_quando_o_agente_e_editado():
+    agentes = [{"id": "b", "updated_at": "1"}, {"id": "a", "updated_at": "1"}]
+    chave = chave_painel(agentes, "debate", 2, None)
+
+    assert chave == chave_painel(list(reversed(agentes)), "debate", 2, [])
+    assert chave != chave_painel([{"id": "b", "updated_at": "2"}, agentes[1]], "debate", 2, None)
@@ -0,0 +1,29 @@
+from coalescencia import CoalescedorDebates, chave_pedido
+
+
+def test_chave_separa_pedidos_que_gravam_dos_que_nao_gravam():
+    pedido = (["id-a", "id-b"], "Qual o  futuro da energia?", 2, "debate", None, False)
+
+    assert chave_pedido(*pedido, salvar=True) != chave_pedido(*pedido, salvar=False)
+    assert chave_pedido(*pedido, salvar=True) == chave_pedido(*pedido)
+
+
+def test_lider_de_job_sai_do_voo_sem_cancelar_depois_de_gravar_o_job_id():
+    coalescedor = CoalescedorDebates()
+    lider = coalescedor.entrar("job:abc")
+    lider.voo.job_id = "job-1"
+    lider.sair()
+
+    repetido = coalescedor.entrar("job:abc")
+    repetido.sair()
+
+    assert not repetido.lider and repetido.voo is lider.voo
+    assert not lider.voo.cancelamento.is_set()
+
+
+def test_voo_sem_job_e_sem_assinantes_e_cancelado():
+    coalescedor = CoalescedorDebates()
+    lider = coalescedor.entrar("stream:abc")
+    lider.sair()
+
+    assert lider.voo.cancelamento.is_set()
@@ -0,0 +1,39 @@
+import pytest
+
+from convergencia import RODADA_MINIMA, DetectorConvergencia, similaridade_cosseno
+
+
+def _detector(limiar=0.2):
+    return DetectorConvergencia(embed=lambda texto: [], limiar=limiar)
+
+
+def test_similaridade_cosseno():
+    assert similaridade_cosseno([1, 0], [2, 0]) == pytest.approx(1.0)
+    assert similaridade_cosseno([1, 0], [0, 3]) == pytest.approx(0.0)
+    assert similaridade_cosseno([0, 0], [1, 1]) == 0.0
+
+
+def test_repeticao_antes_da_rodada_minima_nao_e_convergencia():
+    detector = _detector()
+    detector.registrar(0, "A", RODADA_MINIMA - 1, [1.0, 0.0])
+    novidade = detector.registrar(1, "B", RODADA_MINIMA - 1, [1.0, 0.0])
+
+    assert novidade == pytest.approx(0.0)
+    assert not detector.convergidos
+    assert not detector.encerrar(2)
+
+
+def test_a_partir_da_rodada_minima_quem_fica_abaixo_do_limiar_converge():
+    detector = _detector(limiar=0.2)
+    detector.registrar(0, "A", 1, [1.0, 0.0])
+    detector.registrar(1, "B", 1, [0.0, 1.0])
+
+    # Turno quase igual ao anterior do próprio agente: novidade < limiar
+    assert detector.registrar(0, "A", RODADA_MINIMA, [0.99, 0.05]) < 0.2
+    # Turno novo em relação ao agente e à rodada: continua no debate
+    assert detector.registrar(1, "B", RODADA_MINIMA, [-1.0, 0.2]) >= 0.2
+
+    assert detector.convergidos == {0}
+    assert [n["convergiu"] for n in detector.novidades] == [False, False, True, False]
+    assert detector.encerrar(2)
+    assert not detector.encerrar(3)
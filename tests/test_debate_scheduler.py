@@ -0,0 +1,51 @@
+import pytest
+
+from debate_scheduler import AgendadorDebates, FilaCheia
+
+
+def _liberadas(vagas):
+    return [nome for nome, vaga in vagas.items() if vaga.liberada.is_set()]
+
+
+def test_fila_atende_os_clientes_em_rodizio():
+    agendador = AgendadorDebates(max_simultaneos=1, max_fila=10)
+    em_execucao = agendador.reservar("x")
+    vagas = {nome: agendador.reservar(nome[0]) for nome in ("a1", "a2", "a3", "b1")}
+
+    assert [agendador.posicao(vagas[nome]) for nome in ("a1", "b1", "a2", "a3")] == [1, 2, 3, 4]
+
+    ordem = []
+    atual = em_execucao
+    for _ in vagas:
+        agendador.encerrar(atual)
+        (nome,) = [nome for nome in _liberadas(vagas) if nome not in ordem]
+        ordem.append(nome)
+        atual = vagas[nome]
+
+    assert ordem == ["a1", "b1", "a2", "a3"]
+    assert agendador.resumo()["admitidos"] == 5
+
+
+def test_fila_cheia_estima_retry_after_pela_duracao_media():
+    agendador = AgendadorDebates(max_simultaneos=2, max_fila=2)
+    agendador._duracao_media = 10.0
+    for cliente in ("a", "b", "c", "d"):
+        agendador.reservar(cliente)
+
+    with pytest.raises(FilaCheia) as erro:
+        agendador.reservar("e")
+
+    # (2 na fila + o recusado) / 2 simultâneos = 1,5 volta de 10s
+    assert (erro.value.retry_after, erro.value.na_fila, erro.value.executando) == (15, 2, 2)
+    assert agendador.resumo()["recusados"] == 1
+
+
+def test_cliente_nao_ocupa_mais_que_a_sua_parte_da_fila():
+    agendador = AgendadorDebates(max_simultaneos=1, max_fila=4)
+    agendador.reservar("x")
+    agendador.reservar("a")
+    agendador.reservar("a")
+
+    with pytest.raises(FilaCheia):
+        agendador.reservar("a")
+    assert not agendador.reservar("b").liberada.is_set()
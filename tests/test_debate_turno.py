@@ -0,0 +1,53 @@
+import json
+from copy import deepcopy
+
+import pytest
+
+from debate_turno import TipoTurno, Turno, formatar_historico, para_json
+
+
+def _resposta():
+    return Turno("resposta", {"texto": "Energia solar"}, agente="Ana", rodada=1, agente_idx=0)
+
+
+def test_turno_se_comporta_como_o_dict_antigo():
+    turno = _resposta()
+
+    assert turno["tipo"] is TipoTurno.RESPOSTA and turno["tipo"] == "resposta"
+    assert turno.get("rodada") == 1
+    assert turno.get("agente_id", "sem id") == "sem id"
+    assert "agente_role" not in turno
+    with pytest.raises(KeyError):
+        turno["timestamp"]
+    assert dict(turno) == turno.para_dict() == {
+        "tipo": "resposta", "conteudo": {"texto": "Energia solar"}, "agente": "Ana", "rodada": 1, "agente_idx": 0
+    }
+    assert len(turno) == 5
+
+
+def test_substituir_e_de_dict_nao_alteram_o_original():
+    turno = _resposta()
+    copia = turno.substituir(rodada=2)
+
+    assert (turno["rodada"], copia["rodada"]) == (1, 2)
+    assert Turno.de_dict(turno) is turno
+    assert Turno.de_dict(dict(turno)) == turno
+
+
+def test_deepcopy_copia_os_campos():
+    turno = _resposta()
+    copia = deepcopy(turno)
+
+    assert isinstance(copia, Turno) and copia == turno
+    assert copia.conteudo is not turno.conteudo
+    assert copia.tipo is TipoTurno.RESPOSTA
+
+
+def test_ida_e_volta_em_json():
+    historico = [Turno(TipoTurno.PERGUNTA, "Qual o futuro?"), _resposta()]
+
+    recarregado = [Turno.de_dict(item) for item in json.loads(json.dumps(historico, default=para_json))]
+
+    assert recarregado == historico
+    assert [item.tipo for item in recarregado] == [TipoTurno.PERGUNTA, TipoTurno.RESPOSTA]
+    assert list(formatar_historico(recarregado))[0] == "**🤔 PERGUNTA:** Qual o futuro?\n"
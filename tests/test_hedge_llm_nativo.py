@@ -0,0 +1,63 @@
+"""Hedge com crewai.LLM nativo: stream é um campo bool e a chamada é por call()"""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from debate_crew import DebateCrew  # noqa: E402
+from prompt_builder import MontadorPrompt  # noqa: E402
+
+
+class LLMNativo:
+    """Imita o crewai.LLM que o Agent cria a partir do modelo LangChain"""
+
+    stream = False
+
+    def __init__(self, texto, demora=0.0):
+        self.model = "gpt-4o-mini"
+        self.max_tokens = 100
+        self.texto = texto
+        self.demora = demora
+        self.chamadas = 0
+
+    def call(self, mensagens):
+        self.chamadas += 1
+        time.sleep(self.demora)
+        return self.texto
+
+
+def _debate(principal, reserva, limiar=0.1):
+    agente = SimpleNamespace(role="Ana", goal="", backstory="", llm=principal, tools=[])
+    debate = DebateCrew(
+        agentes_crewai=[agente],
+        pergunta="Qual o futuro da energia?",
+        reservas_llm={0: {"llm": reserva, "limiar": limiar}}
+    )
+    montador = MontadorPrompt("openai", "gpt-4o-mini")
+    montador.adicionar("turno", "Agora é sua vez de falar.", 0)
+    return debate, agente, montador
+
+
+def test_principal_nativo_rapido_responde_sem_hedge():
+    principal, reserva = LLMNativo("principal"), LLMNativo("reserva")
+    debate, agente, montador = _debate(principal, reserva)
+
+    texto, _ = debate._chamar_agente(0, agente, montador)
+
+    assert texto == "principal"
+    assert principal.chamadas == 1
+    assert reserva.chamadas == 0
+    assert debate.metadados["hedges"] == []
+
+
+def test_principal_nativo_lento_aciona_reserva_pelo_limiar():
+    principal, reserva = LLMNativo("principal", demora=1.0), LLMNativo("reserva")
+    debate, agente, montador = _debate(principal, reserva)
+
+    texto, _ = debate._chamar_agente(0, agente, montador)
+
+    assert texto == "reserva"
+    assert reserva.chamadas == 1
+    assert debate.metadados["hedges"][0]["vencedor"] == "reserva"
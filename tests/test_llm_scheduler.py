@@ -0,0 +1,117 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+import llm_scheduler
+from llm_scheduler import (
+    PRIORIDADE_INTERATIVA, PRIORIDADE_SEGUNDO_PLANO, AgendadorLLM, BaldeTokens, retry_after
+)
+
+
+class _Resposta:
+    def __init__(self, cabecalhos):
+        self.headers = cabecalhos
+
+
+class _ErroProvedor(Exception):
+    def __init__(self, status_code, cabecalhos=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = _Resposta(cabecalhos or {})
+
+
+def test_balde_reabastece_proporcional_ao_tempo_ate_a_capacidade():
+    balde = BaldeTokens(60)  # 1 por segundo
+    inicio = balde.atualizado
+    balde.consumir(60)
+
+    assert balde.espera(1, inicio) == pytest.approx(1.0)
+    assert balde.espera(1, inicio + 0.5) == pytest.approx(0.5)
+    assert balde.espera(60, inicio + 120) == 0.0
+    assert balde.disponivel == balde.capacidade
+    # Pedidos maiores que a capacidade esperam só o balde cheio
+    balde.consumir(1000)
+    assert balde.espera(1000, inicio + 120) == pytest.approx(60.0)
+
+
+def test_chamada_interativa_passa_a_frente_do_segundo_plano():
+    agendador = AgendadorLLM()
+    limitador = agendador._limitador("teste", "padrao")
+    agendador._pausar("teste", "padrao", 0.3)
+    ordem = []
+
+    def chamar(prioridade, nome):
+        agendador.adquirir("teste", prioridade=prioridade)
+        ordem.append(nome)
+
+    segundo_plano = threading.Thread(target=chamar, args=(PRIORIDADE_SEGUNDO_PLANO, "rag"))
+    segundo_plano.start()
+    while len(limitador.fila) < 1:
+        time.sleep(0.01)
+    interativa = threading.Thread(target=chamar, args=(PRIORIDADE_INTERATIVA, "debate"))
+    interativa.start()
+    segundo_plano.join(5)
+    interativa.join(5)
+
+    assert ordem == ["debate", "rag"]
+    assert agendador.resumo()["teste"]["chamadas"] == 2
+
+
+@pytest.mark.parametrize("cabecalhos, esperado", [
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after": "7"}, 7.0),
+    ({"retry-after": "depois"}, None),
+    ({}, None),
+])
+def test_retry_after_em_milissegundos_e_segundos(cabecalhos, esperado):
+    assert retry_after(_ErroProvedor(429, cabecalhos)) == esperado
+
+
+def test_retry_after_em_data_http():
+    data = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 28 <= retry_after(_ErroProvedor(429, {"retry-after": data})) <= 30.5
+
+    passada = format_datetime(datetime.now(timezone.utc) - timedelta(seconds=30), usegmt=True)
+    assert retry_after(_ErroProvedor(429, {"retry-after": passada})) == 0.0
+
+
+def test_repeticoes_esgotadas_propagam_o_erro_e_contam_nas_metricas(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "MAX_TENTATIVAS", 3)
+    agendador = AgendadorLLM()
+    chamadas = []
+
+    def recusar():
+        chamadas.append(1)
+        raise _ErroProvedor(429, {"retry-after": "0"})
+
+    with pytest.raises(_ErroProvedor):
+        agendador.executar(recusar, "teste")
+
+    resumo = agendador.resumo()["teste"]
+    assert len(chamadas) == 3
+    assert (resumo["chamadas"], resumo["limites_taxa"], resumo["repeticoes"], resumo["esgotadas"]) == (3, 3, 2, 1)
+
+
+def test_sobrecarga_e_repetida_e_demais_erros_nao(monkeypatch):
+    monkeypatch.setattr(llm_scheduler.random, "uniform", lambda a, b: 0.0)
+    agendador = AgendadorLLM()
+    respostas = iter([_ErroProvedor(503), "ok"])
+
+    def responder():
+        resposta = next(respostas)
+        if isinstance(resposta, Exception):
+            raise resposta
+        return resposta
+
+    def invalida():
+        raise _ErroProvedor(400)
+
+    assert agendador.executar(responder, "teste") == "ok"
+    with pytest.raises(_ErroProvedor):
+        agendador.executar(invalida, "teste")
+
+    resumo = agendador.resumo()["teste"]
+    assert (resumo["chamadas"], resumo["limites_taxa"], resumo["repeticoes"], resumo["esgotadas"]) == (3, 0, 1, 0)
@@ -0,0 +1,46 @@
+from debate_transcript import TranscricaoIncremental, truncar_transcricao
+from prompt_builder import MontadorPrompt, PRIORIDADE_TRANSCRICAO
+
+CABECALHO = "Contexto do debate até agora:\n"
+
+
+def _transcricao_longa() -> str:
+    transcricao = TranscricaoIncremental()
+    for rodada in (1, 2):
+        for agente in ("Ana", "Bruno", "Carla"):
+            transcricao.adicionar(agente, f"Fala de {agente} na rodada {rodada}. " * 40, rodada)
+    return transcricao.contexto(2)
+
+
+def test_corte_pelo_fim_mantem_cabecalho_e_rotulo_da_rodada():
+    montador = MontadorPrompt("openai", "gpt-4o-mini")
+    montador.adicionar("turno", "Agora é sua vez de falar.", 5)
+    montador.adicionar(
+        "transcricao", _transcricao_longa(), 3,
+        prioridade=PRIORIDADE_TRANSCRICAO, manter_fim=True,
+        cabecalho=CABECALHO, truncar=truncar_transcricao
+    )
+
+    ajustes = montador.ajustar_ao_orcamento(200)
+
+    texto = montador.texto()
+    assert ajustes and ajustes[0]["acao"] == "truncado"
+    assert texto.startswith(CABECALHO + "--- RODADA 2 ---\n")
+    assert texto.rstrip().endswith("Agora é sua vez de falar.")
+    assert montador.contar_tokens() <= 200
+
+
+def test_corte_sem_truncar_proprio_mantem_so_o_cabecalho():
+    montador = MontadorPrompt("openai", "gpt-4o-mini")
+    montador.adicionar("falas", "palavra " * 500, 3, prioridade=PRIORIDADE_TRANSCRICAO, manter_fim=True, cabecalho="NOVAS FALAS:\n")
+
+    montador.ajustar_ao_orcamento(50)
+
+    assert montador.texto().startswith("NOVAS FALAS:\n")
+    assert montador.contar_tokens() <= 50
+
+
+def test_truncar_transcricao_nao_corta_quando_cabe():
+    texto = "--- RODADA 1 ---\nAna: oi"
+
+    assert truncar_transcricao(texto, 100) == texto
@@ -0,0 +1,128 @@
+"""Resumo contínuo (sintese_continua): atualização em segundo plano e síntese a partir dele"""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from debate_transcript import ResumoContinuo
+from debate_turno import TipoTurno, Turno
+
+
+def _esperar(condicao, prazo=5.0):
+    limite = time.monotonic() + prazo
+    while not condicao():
+        assert time.monotonic() < limite, "condição não atingida no prazo"
+        time.sleep(0.005)
+
+
+def test_falas_que_chegam_durante_uma_atualizacao_entram_juntas_na_seguinte():
+    lotes = []
+    liberar = threading.Event()
+
+    def resumir(atual, falas):
+        lotes.append(list(falas))
+        if len(lotes) == 1:
+            assert liberar.wait(5)
+        return (atual + " " + " ".join(falas)).strip()
+
+    resumo = ResumoContinuo(resumir)
+    resumo.adicionar("a")
+    _esperar(lambda: lotes)
+    resumo.adicionar("b")
+    resumo.adicionar("c")
+    liberar.set()
+    _esperar(lambda: resumo.falas_no_resumo == 3)
+
+    assert lotes == [["a"], ["b", "c"]]
+    assert resumo.concluir() == ("a b c", [])
+    assert resumo.metricas["atualizacoes"] == 2
+    assert resumo.metricas["falas_incorporadas"] == 3
+
+
+def test_concluir_espera_a_atualizacao_em_andamento_e_devolve_as_pendentes():
+    liberar = threading.Event()
+
+    def resumir(atual, falas):
+        assert liberar.wait(5)
+        return " ".join(falas)
+
+    resumo = ResumoContinuo(resumir)
+    resumo.adicionar("a")
+    resumo.adicionar("b")  # Pode entrar no primeiro lote ou ficar pendente
+    resultado = []
+    concluindo = threading.Thread(target=lambda: resultado.append(resumo.concluir()))
+    concluindo.start()
+    _esperar(lambda: resumo._encerrado)
+    resumo.adicionar("c")  # Depois de concluir: ignorada
+    liberar.set()
+    concluindo.join(5)
+
+    texto, pendentes = resultado[0]
+    assert texto.split() + pendentes == ["a", "b"]
+
+
+def test_falha_ao_resumir_mantem_o_resumo_anterior_e_as_falas_pendentes():
+    chamadas = []
+
+    def resumir(atual, falas):
+        chamadas.append(list(falas))
+        if len(chamadas) > 1:
+            raise RuntimeError("provedor fora do ar")
+        return "resumo de a"
+
+    resumo = ResumoContinuo(resumir)
+    resumo.adicionar("a")
+    _esperar(lambda: resumo.falas_no_resumo == 1)
+    resumo.adicionar("b")
+    _esperar(lambda: resumo.metricas["falhas"] == 1)
+
+    assert resumo.concluir() == ("resumo de a", ["b"])
+
+
+@pytest.fixture
+def debate_com_resumo(monkeypatch):
+    pytest.importorskip("crewai")
+    import agents
+    from debate_crew import DebateCrew
+
+    llm = SimpleNamespace(model_name="gpt-4.1", max_tokens=500)
+    monkeypatch.setattr(agents, "criar_llm_facilitador", lambda modelo="gpt-4.1": llm)
+    monkeypatch.setattr(
+        agents, "criar_facilitador",
+        lambda modelo="gpt-4.1", llm=None: SimpleNamespace(role="Facilitador", goal="", backstory="", llm=llm, tools=[])
+    )
+    agente = SimpleNamespace(role="Ana", goal="", backstory="", llm=llm, tools=[])
+    debate = DebateCrew(agentes_crewai=[agente], pergunta="Qual o futuro da energia?", sintese_continua=True)
+    debate.historico = [
+        Turno(TipoTurno.PERGUNTA, "Qual o futuro da energia?", agente="Moderador"),
+        Turno(TipoTurno.RESPOSTA, "Solar.", agente="Ana", rodada=1, agente_idx=0),
+    ]
+    prompts = []
+    monkeypatch.setattr(
+        debate, "_chamar_llm",
+        lambda agente, montador, nome, abortar=None, **kw: (prompts.append(montador.texto()), ("SÍNTESE", None))[1]
+    )
+    return debate, prompts
+
+
+def test_sintese_parte_do_resumo_continuo(debate_com_resumo):
+    debate, prompts = debate_com_resumo
+    debate._resumo_continuo._resumir = lambda atual, falas: "Ana defende a energia solar."
+    debate._resumo_continuo.adicionar("Ana (rodada 1): Solar.")
+    _esperar(lambda: debate._resumo_continuo.falas_no_resumo == 1)
+
+    assert debate.gerar_sintese_com_agente() == "SÍNTESE"
+    assert debate.metadados["sintese"]["modo"] == "continua"
+    assert "RESUMO DO DEBATE (atualizado a cada turno):\nAna defende a energia solar." in prompts[0]
+
+
+def test_sem_resumo_a_sintese_volta_para_a_transcricao(debate_com_resumo):
+    debate, prompts = debate_com_resumo
+    debate._resumo_continuo._resumir = lambda atual, falas: (_ for _ in ()).throw(RuntimeError("falhou"))
+    debate._resumo_continuo.adicionar("Ana (rodada 1): Solar.")
+    _esperar(lambda: debate._resumo_continuo.metricas["falhas"] == 1)
+
+    assert debate.gerar_sintese_com_agente() == "SÍNTESE"
+    assert debate.metadados["sintese"]["modo"] == "direta"
+    assert "DEBATE COMPLETO:" in prompts[0] and "Solar." in prompts[0]
@@ -0,0 +1,107 @@
+"""Retomada de debates gravados turno a turno"""
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from debate_transcript import ResumoContinuo
+from debate_turno import TipoTurno, Turno
+
+
+def test_resumo_continuo_restaurado_continua_do_resumo_gravado():
+    gravados = []
+    gravou = threading.Event()
+
+    def ao_atualizar(texto, falas):
+        gravados.append((texto, falas))
+        gravou.set()
+
+    resumo = ResumoContinuo(lambda atual, falas: atual + " + " + " + ".join(falas), ao_atualizar=ao_atualizar)
+    resumo.restaurar("Ana e Bruno", 2)
+
+    resumo.adicionar("Carla")
+    assert gravou.wait(5)
+    texto, pendentes = resumo.concluir()
+
+    assert texto == "Ana e Bruno + Carla"
+    assert pendentes == []
+    assert gravados == [("Ana e Bruno + Carla", 3)]
+
+
+def test_falha_ao_gravar_o_resumo_nao_para_as_atualizacoes():
+    gravados = []
+    gravou = threading.Semaphore(0)
+
+    def ao_atualizar(texto, falas):
+        gravou.release()
+        if not gravados:
+            gravados.append(None)
+            raise RuntimeError("supabase fora do ar")
+        gravados.append((texto, falas))
+
+    resumo = ResumoContinuo(lambda atual, falas: (atual + " " + " ".join(falas)).strip(), ao_atualizar=ao_atualizar)
+    resumo.adicionar("a")
+    assert gravou.acquire(timeout=5)
+    resumo.adicionar("b")
+    assert gravou.acquire(timeout=5)
+
+    assert resumo.concluir() == ("a b", [])
+    assert resumo.metricas["falhas"] == 1
+    assert gravados[-1] == ("a b", 2)
+
+
+def _historico():
+    return [
+        Turno(TipoTurno.PERGUNTA, "Qual o futuro da energia?", agente="Moderador"),
+        Turno(TipoTurno.RESPOSTA, "Solar.", agente="Ana", rodada=1, agente_idx=0),
+        Turno(TipoTurno.RESPOSTA, "Eólica.", agente="Bruno", rodada=1, agente_idx=1),
+    ]
+
+
+def _debate(resumo_retomado):
+    pytest.importorskip("crewai")
+    from debate_crew import DebateCrew
+
+    agentes = [SimpleNamespace(role=nome, goal="", backstory="", llm=None, tools=[]) for nome in ("Ana", "Bruno")]
+    debate = DebateCrew(
+        agentes_crewai=agentes,
+        pergunta="Qual o futuro da energia?",
+        sintese_continua=True,
+        resumo_continuo_retomado=resumo_retomado
+    )
+    return debate
+
+
+def test_retomada_nao_reenvia_ao_resumo_as_falas_que_ele_ja_cobre():
+    debate = _debate(("Ana defende solar; Bruno, eólica.", 2))
+
+    assert debate._restaurar_historico(_historico()) == 2
+    assert debate._resumo_continuo.concluir() == ("Ana defende solar; Bruno, eólica.", [])
+
+
+def test_resumo_gravado_alem_do_historico_e_refeito():
+    debate = _debate(("Resumo de falas que se perderam", 5))
+    debate._resumo_continuo._resumir = lambda atual, falas: "refeito: " + " ".join(falas)
+
+    debate._restaurar_historico(_historico())
+
+    resumo, pendentes = debate._resumo_continuo.concluir()
+    assert not resumo.startswith("Resumo de falas")
+    assert len(pendentes) + debate._resumo_continuo.falas_no_resumo == 2
+
+
+def test_retomada_descarta_o_que_vem_depois_de_um_buraco_no_order_index():
+    pytest.importorskip("fastapi")
+    import api_server_backup as api
+
+    apagados = []
+    database = SimpleNamespace(
+        messages_to_historico=lambda linhas: [linha["content"] for linha in linhas],
+        delete_messages_from=lambda debate_id, indice: apagados.append(indice)
+    )
+    mensagens = [{"order_index": i, "content": Turno(TipoTurno.RESPOSTA, str(i))} for i in (0, 1, 3, 4)]
+
+    historico = api._historico_para_retomar(database, {"id": "deb", "messages": mensagens})
+
+    assert [item.conteudo for item in historico] == ["0", "1"]
+    assert apagados == [2]
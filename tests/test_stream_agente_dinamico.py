@@ -0,0 +1,53 @@
+"""Stream de tokens de um agente do banco, cujo Agent converte o LLM LangChain para crewai.LLM"""
+import pytest
+
+pytest.importorskip("crewai")
+
+from agents import criar_agente_dinamico  # noqa: E402
+from debate_crew import DebateCrew  # noqa: E402
+
+
+class Pedaco:
+    def __init__(self, content):
+        self.content = content
+
+    def __add__(self, outro):
+        return Pedaco(self.content + outro.content)
+
+
+class ModeloLangChain:
+    """Modelo de chat no formato LangChain (invoke/stream), sem rede"""
+
+    model_name = "gpt-4o-mini"
+    temperature = 0.7
+    max_tokens = 100
+
+    def invoke(self, mensagens):
+        return Pedaco("Olá mundo")
+
+    def stream(self, mensagens):
+        yield Pedaco("Olá")
+        yield Pedaco(" mundo")
+
+
+def test_turno_de_agente_dinamico_emite_tokens(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-teste")
+    modelo = ModeloLangChain()
+    agente = criar_agente_dinamico(
+        {"name": "Ana", "role": "Economista", "goal": "Debater", "backstory": "", "llm_provider": "openai"},
+        use_rag=False,
+        llm=modelo
+    )
+    eventos = []
+    debate = DebateCrew(
+        agentes_crewai=[agente],
+        pergunta="Qual o futuro da energia?",
+        ao_evento=lambda tipo, dados: eventos.append((tipo, dados)),
+        llms_diretos={0: modelo}
+    )
+    montador = debate._montar_prompt_turno(0, agente, "", "", 1, 1)
+
+    texto, _ = debate._chamar_agente(0, agente, montador)
+
+    assert texto == "Olá mundo"
+    assert [dados["conteudo"] for tipo, dados in eventos if tipo == "token"] == ["Olá", " mundo"]
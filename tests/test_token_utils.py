@@ -0,0 +1,38 @@
+import token_utils
+
+
+class _EncodingFalso:
+    def __init__(self):
+        self.chamadas = 0
+
+    def encode(self, texto, disallowed_special=()):
+        self.chamadas += 1
+        return texto.split()
+
+
+def test_cache_de_contagem_guarda_digest_e_respeita_o_limite(monkeypatch):
+    encoding = _EncodingFalso()
+    monkeypatch.setattr(token_utils, "_obter_encoding", lambda modelo: encoding)
+    monkeypatch.setattr(token_utils, "MAX_CONTAGENS_CACHE", 2)
+    token_utils._contagens_cache.clear()
+
+    texto = "persona fixa do agente " * 50
+    assert token_utils.contar_tokens(texto) == 200
+    assert token_utils.contar_tokens(texto) == 200
+    assert encoding.chamadas == 1
+    assert all(texto not in chave for chave in token_utils._contagens_cache)
+    assert all(len(chave[0]) == 16 for chave in token_utils._contagens_cache)
+
+    token_utils.contar_tokens("a b")
+    token_utils.contar_tokens("c d e")
+    assert len(token_utils._contagens_cache) == 2
+    assert token_utils.contar_tokens(texto) == 200
+    assert encoding.chamadas == 4
+    token_utils._contagens_cache.clear()
+
+
+def test_sem_tiktoken_usa_aproximacao_sem_cache(monkeypatch):
+    monkeypatch.setattr(token_utils, "_obter_encoding", lambda modelo: None)
+    token_utils._contagens_cache.clear()
+    assert token_utils.contar_tokens("x" * 40) == 10
+    assert not token_utils._contagens_cache
@@ -0,0 +1,81 @@
+"""
+Utilitários para contagem e corte de texto por tokens
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# Modelo usado quando o chamador não informa qual tokenizer usar
+MODELO_TOKENIZER_PADRAO = "gpt-4"
+
+# Aproximação usada quando o tiktoken não está instalado (~4 caracteres por token)
+CARACTERES_POR_TOKEN = 4
+
+
+@lru_cache(maxsize=32)
+def _obter_encoding(modelo: str):
+    """Retorna o encoding do tiktoken para o modelo (ou None se indisponível)"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(modelo)
+    except KeyError:
+        # Modelos de outros provedores (Claude, Gemini): usar encoding genérico
+        return tiktoken.get_encoding("cl100k_base")
+
+
+# Contagens memorizadas: persona, instruções e blocos de rodadas encerradas se
+# repetem a cada turno. A chave é um digest do texto (e não o texto), para o
+# cache não segurar prompts e transcrições inteiros na memória do servidor
+MAX_CONTAGENS_CACHE = 1024
+_contagens_cache: "OrderedDict[Tuple[bytes, str], int]" = OrderedDict()
+_contagens_lock = threading.Lock()
+
+
+def contar_tokens(texto: str, modelo: Optional[str] = None) -> int:
+    """Conta os tokens de um texto para o modelo informado"""
+    if not texto:
+        return 0
+    modelo = modelo or MODELO_TOKENIZER_PADRAO
+    encoding = _obter_encoding(modelo)
+    if encoding is None:
+        return max(1, len(texto) // CARACTERES_POR_TOKEN)
+    chave = (hashlib.blake2b(texto.encode("utf-8", "surrogatepass"), digest_size=16).digest(), modelo)
+    with _contagens_lock:
+        tokens = _contagens_cache.get(chave)
+        if tokens is not None:
+            _contagens_cache.move_to_end(chave)
+            return tokens
+    tokens = len(encoding.encode(texto, disallowed_special=()))
+    with _contagens_lock:
+        _contagens_cache[chave] = tokens
+        if len(_contagens_cache) > MAX_CONTAGENS_CACHE:
+            _contagens_cache.popitem(last=False)
+    return tokens
+
+
+def truncar_para_tokens(texto: str, max_tokens: int, modelo: Optional[str] = None, manter_fim: bool = False) -> str:
+    """
+    Corta o texto para caber em max_tokens.
+
+    Args:
+        manter_fim: Se True, preserva o final do texto (útil para transcrições,
+            onde o trecho mais recente é o mais relevante)
+    """
+    if max_tokens <= 0 or not texto:
+        return ""
+    encoding = _obter_encoding(modelo or MODELO_TOKENIZER_PADRAO)
+    if encoding is None:
+        max_chars = max_tokens * CARACTERES_POR_TOKEN
+        if len(texto) <= max_chars:
+            return texto
+        return texto[-max_chars:] if manter_fim else texto[:max_chars]
+    tokens = encoding.encode(texto, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return texto
+    tokens = tokens[-max_tokens:] if manter_fim else tokens[:max_tokens]
+    return encoding.decode(tokens)